@@ -1,13 +1,70 @@
 import os
 import argparse
 import datetime
+import pickle
+import shutil
+import signal
+import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from codes.input.InputDealer import InputDealer
 from codes.search_algs.allAlgs import get_search_algorithm
 from codes.runners.C_runner import CRunner
+from codes.runners.BuildCache import BuildCache
+from codes.runners.BuildSpec import BuildSpec
+from codes.runners.Measurement import MeasurementPolicy
+from codes.runners.ResultCache import ResultCache
 from codes.utils.Database import Database
+from codes.utils.History import History, config_key
+from codes.utils.ConfigSpace import ConfigSpace
+from codes.utils.Checkpoint import Checkpoint
+from codes.utils.Telemetry import Telemetry, span, drain
 from codes.utils.Logger import Logger
+from codes.utils.CoreScheduler import CoreScheduler
+
+
+# 本进程（进程池 worker）是否收到过 Ctrl-C（由 init_worker 安装的信号处理函数设置）
+_interrupted = False
+
+
+def init_worker(log_queue):
+    """
+    进程池 initializer
+    ------------------------------------------------
+    1. 本进程的日志事件发往父进程的写者；
+    2. Ctrl-C 只由主进程处理（保存快照后退出）。worker 只记下中断，不在任意位置抛出
+       KeyboardInterrupt（落在日志队列启动后台线程的中途时，worker 退出时会一直挂起）；
+       被测程序与编译器仍随 Ctrl-C 终止（信号处理函数在 exec 时复位），
+       被中断的测量不写入数据库，恢复时作为在途配置重新测量。
+    """
+    Logger.init_worker(log_queue)
+    signal.signal(signal.SIGINT, _on_interrupt)
+
+
+def _on_interrupt(signum, frame):
+    global _interrupted
+    _interrupted = True
+
+
+@contextmanager
+def deferred_interrupt():
+    """
+    主进程临界区：其中收到的 Ctrl-C 推迟到离开临界区时再抛出 KeyboardInterrupt，
+    保证快照中算法状态、seen 与 in_flight 一致（已提议的配置一定在途或已记录）
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    received = []
+    previous = signal.signal(signal.SIGINT, lambda signum, frame: received.append(signum))
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    if received:
+        raise KeyboardInterrupt
 
 
 def evaluate(task):
@@ -15,23 +72,106 @@ def evaluate(task):
     单个调优任务执行函数（在子进程中运行）
     ------------------------------------------------
     输入：
-        task: 三元组 (target_program, config, db_path)
+        task: 七元组 (spec, config, db_path, policy, limit, pinning, tags)
+              spec 为 BuildSpec 编译 / 运行模板
+              limit 为竞速上限（秒），None 表示不限时
+              pinning 为 (测量 CPU, 编译 CPU) 绑定信息，None 表示不绑定
+              tags 为搜索算法附加到数据库记录上的字段（如保真度）
     功能：
-        1. 调用 Runner 编译并运行目标程序；
+        1. 调用 Runner 编译并按测量策略重复运行目标程序；
         2. 将运行结果写入数据库；
-        3. 返回配置与结果。
+        3. 返回配置与测量结果。
     异常处理：
         如果运行出错（例如编译失败），返回无穷大时间。
     """
-    target_program, config, db_path = task
-    runner = CRunner(target_program)
+    spec, config, db_path, policy, limit, pinning, tags = task
+    cpus, compile_cpus = pinning or (None, None)
+    runner = CRunner(spec.target_program, spec=spec, policy=policy, compile_cpus=compile_cpus)
+    db = Database(db_path)
+    start = time.perf_counter()
+    with span("evaluate", config=config):
+        try:
+            measurement = runner.measure(config, limit, cpus)
+            if not _interrupted:
+                db.save(config, measurement["time"], measurement_extra(measurement, tags))
+        except Exception as e:
+            measurement = Autotuner.failed_measurement()
+            Logger("worker").event("error", config=config, error=repr(e))
+    Logger("worker").event("measure", config=config, seconds=time.perf_counter() - start,
+                           time=measurement["time"], censored=measurement["censored"],
+                           runs=len(measurement["samples"]))
+    measurement["spans"] = drain()
+    return config, measurement
+
+
+def evaluate_batch(task):
+    """
+    批量调优任务执行函数（在子进程中运行）
+    ------------------------------------------------
+    输入：
+        task: 与 evaluate 相同，但 config 与 tags 换成等长的列表；
+              列表中的配置只在 batch_param 上不同，在同一次进程调用中测量
+    输出：
+        [(config, measurement), ...]
+    """
+    spec, configs, db_path, policy, limit, pinning, tags_list = task
+    cpus, compile_cpus = pinning or (None, None)
+    runner = CRunner(spec.target_program, spec=spec, policy=policy, compile_cpus=compile_cpus)
     db = Database(db_path)
+    start = time.perf_counter()
+    with span("evaluate", configs=configs):
+        try:
+            measurements = runner.measure_batch(configs, limit, cpus)
+        except Exception as e:
+            measurements = [Autotuner.failed_measurement() for _ in configs]
+            Logger("worker").event("error", configs=configs, error=repr(e))
+        for config, measurement, tags in zip(configs, measurements, tags_list):
+            if not _interrupted:
+                db.save(config, measurement["time"], measurement_extra(measurement, tags))
+    Logger("worker").event("measure_batch", configs=configs, seconds=time.perf_counter() - start,
+                           times=[m["time"] for m in measurements])
+    # 整批共用一组时间片段，挂在第一个结果上
+    measurements[0]["spans"] = drain()
+    return list(zip(configs, measurements))
+
+
+def compile_binary(task):
+    """
+    流水线编译级任务（在编译进程池中运行）
+    ------------------------------------------------
+    输入：
+        task: 三元组 (spec, config, compile_cpus)
+    输出：
+        (是否编译成功, 编译耗时秒数, 时间片段)
+    """
+    spec, config, compile_cpus = task
+    start = time.perf_counter()
     try:
-        result = runner.run(config)
-        db.save(config, result)
-        return config, result
+        CRunner(spec.target_program, spec=spec, compile_cpus=compile_cpus).build(config)
+        ok = True
     except Exception:
-        return config, float("inf")
+        ok = False
+    seconds = time.perf_counter() - start
+    Logger("worker").event("compile", config=config, ok=ok, seconds=seconds)
+    return ok, seconds, drain()
+
+
+def restored_measurement(rec):
+    """把数据库记录还原为测量结果（恢复模式回放用）"""
+    return {"time": rec["time"], "samples": rec.get("samples", []), "stats": rec.get("stats"),
+            "censored": rec.get("censored", False), "rusage": rec.get("rusage", []), "restored": True}
+
+
+def measurement_extra(measurement, tags=None):
+    """提取需要写入数据库的测量附加信息（样本向量、统计量、资源使用、删失标记与算法标签）"""
+    extra = {"samples": measurement["samples"], "stats": measurement["stats"], "rusage": measurement["rusage"]}
+    if measurement["censored"]:
+        extra["censored"] = True
+    if measurement.get("cached"):
+        extra["cached"] = True
+    if tags:
+        extra.update(tags)
+    return extra
 
 
 class Autotuner:
@@ -46,27 +186,68 @@ class Autotuner:
         5. 输出最优配置与实验摘要。
     """
 
-    def __init__(self, input_file="input.txt", max_workers=4, exp_name=None):
+    DUPLICATE_RETRIES = 8   # 异步模式下算法连续提议在途配置时，每轮补位最多重新索取的次数
+
+    def __init__(self, input_file="input.txt", max_workers=4, exp_name=None, resume=None):
+        # 恢复模式：沿用实验目录中保存的 input.txt 副本
+        if resume:
+            input_file = os.path.join(resume, "input.txt")
+
         # 解析输入文件
         self.inputDealer = InputDealer(input_file)
-        self.target_program, self.params, self.algorithm_name = self.inputDealer.parse_input()
+        self.target_program, params, self.algorithm_name = self.inputDealer.parse_input()
+        self.params = ConfigSpace(params, self.inputDealer.constraints)
+        self.policy = MeasurementPolicy.from_settings(self.inputDealer.settings)
+        self.spec = BuildSpec(self.target_program, self.params, self.inputDealer.settings, self.inputDealer.bindings)
 
-        # 生成实验目录（算法名 + 时间戳）
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        exp_folder = exp_name if exp_name else f"{self.algorithm_name}_{timestamp}"
-        self.exp_dir = os.path.join("results", self.algorithm_name, exp_folder)
-        os.makedirs(self.exp_dir, exist_ok=True)
+        # 生成实验目录（算法名 + 时间戳），并保存 input.txt 副本供 --resume 使用
+        if resume:
+            self.exp_dir = resume
+        else:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            exp_folder = exp_name if exp_name else f"{self.algorithm_name}_{timestamp}"
+            self.exp_dir = os.path.join("results", self.algorithm_name, exp_folder)
+            os.makedirs(self.exp_dir, exist_ok=True)
+            shutil.copyfile(input_file, os.path.join(self.exp_dir, "input.txt"))
 
         # 初始化数据库和日志系统
         self.db_path = os.path.join(self.exp_dir, "best_config.json")
         self.db = Database(self.db_path)
-        self.logger = Logger("Autotuner", log_dir=self.exp_dir)
+        self.history = History(self.params)
+        self.logger = Logger("Autotuner", log_dir=self.exp_dir, append=bool(resume))
 
         # 初始化搜索算法
-        self.search_algorithm = get_search_algorithm(self.algorithm_name, self.params)
+        self.search_algorithm = get_search_algorithm(self.algorithm_name, self.params, self.inputDealer.options)
         self.max_workers = max_workers
 
+        # 快照与恢复：seen 为已反馈给算法的配置计数，replay 为待回放的数据库记录
+        self.checkpoint = Checkpoint(self.exp_dir)
+        self.checkpoint_every = int(self.inputDealer.settings.get("checkpoint_every", 1))
+        self.seen = {}
+        self.replay = {}
+        self.in_flight = {}   # 异步模式下已提议、结果未返回的配置（随快照保存）
+        self.resubmit = []    # 恢复时需要重新提交的在途配置
+        self.recorded = 0
+        self.pruned_logged = 0
+
+        # 核绑定调度（并行测量模式使用）
+        self.scheduler = None
+        if self.inputDealer.flag("pin_cores"):
+            self.scheduler = CoreScheduler(max_workers, one_per_llc=self.inputDealer.flag("one_per_llc"))
+        self.result_cache = ResultCache.from_settings(self.spec, self.policy, self.inputDealer.settings,
+                                                      workers=self.worker_count())
+
         self.logger.log(f"Experiment initialized in {self.exp_dir}")
+        self.logger.log(f"Parameter space: {self.params.describe()}")
+        if resume:
+            self.restore()
+        if self.scheduler:
+            self.logger.log(f"Core pinning: {self.scheduler.describe()}")
+        self.logger.log(
+            f"Measurement policy: {self.policy.warmup_runs} warmup, {self.policy.timed_runs}-{self.policy.max_runs} "
+            f"timed runs, ci_target={self.policy.ci_target}, statistic={self.policy.statistic}, "
+            f"race_factor={self.policy.race_factor}"
+        )
 
     def run(self):
         """
@@ -74,24 +255,28 @@ class Autotuner:
         ------------------------------------------------
         根据算法类型自动选择执行模式：
         - 静态算法：一次性并行（Grid、Random）
-        - 动态算法：循环反馈式（Greedy、HillClimb）
+        - 动态算法：异步 ask / tell，多个评估同时在途（Greedy、SimulatedAnnealing）
+        - 批量动态算法：逐批并行、批间反馈（Hyperband）
         - 并行算法：多算法协同（ParallelSearch）
         """
         self.logger.log("Starting autotuning process...")
         start_time = time.time()
-        
-        if hasattr(self.search_algorithm, "custom_run"):
-            self.logger.log("Detected custom algorithm. Delegating execution to algorithm.")
-            self.search_algorithm.custom_run(self.target_program, self.db, self.logger)
+        cache_before = BuildCache(os.path.join("tmp", "build_cache")).stats()
 
-        elif hasattr(self.search_algorithm, "next_config"):
-            self.logger.log("Detected dynamic search algorithm. Switching to iterative mode.")
-            self.run_dynamic()
+        total = len(self.search_algorithm) if hasattr(self.search_algorithm, "__len__") else None
+        self.telemetry = Telemetry(self.worker_count(), total,
+                                   float(self.inputDealer.settings.get("progress_interval", 5)))
+
+        # 初始快照：中断发生在第一个结果之前时也能恢复同一随机数状态（如随机采样集合）
+        self.save_checkpoint()
+        try:
+            self.dispatch_mode()
+        except KeyboardInterrupt:
+            self.save_checkpoint()
+            self.logger.log(f"Interrupted. Resume with: python autotuner.py --resume {self.exp_dir}")
+            raise
+        self.save_checkpoint()
 
-        else:
-            self.logger.log("Detected static search algorithm. Using parallel batch mode.")
-            self.run_static()
-        
         best = {
                 "config": self.search_algorithm.best_config,
                 "time": self.search_algorithm.best_result
@@ -99,6 +284,12 @@ class Autotuner:
 
         total_time = time.time() - start_time
         self.db.add_summary(self.algorithm_name, total_time)
+        self.log_build_cache(cache_before)
+        if self.result_cache:
+            self.logger.log(f"Result cache: {self.result_cache.describe()}")
+        self.log_prescreen()
+        self.log_summary()
+        self.log_telemetry()
         self.logger.log(f"Best Configuration: {best}")
         self.logger.log(f"Total runtime: {total_time:.2f}s")
 
@@ -106,34 +297,449 @@ class Autotuner:
         print("Best configuration:", best)
         print(f"Total runtime: {total_time:.2f}s")
 
+    def dispatch_mode(self):
+        """按搜索算法提供的接口选择执行模式"""
+        if hasattr(self.search_algorithm, "custom_run"):
+            self.logger.log("Detected custom algorithm. Delegating execution to algorithm.")
+            self.search_algorithm.custom_run(self.target_program, self.db, self.logger)
+
+        elif hasattr(self.search_algorithm, "next_batch"):
+            self.logger.log("Detected batch search algorithm. Evaluating batches in parallel.")
+            self.run_batched()
+
+        elif hasattr(self.search_algorithm, "next_config"):
+            self.logger.log("Detected dynamic search algorithm. Switching to asynchronous ask / tell mode.")
+            self.run_dynamic()
+
+        elif self.inputDealer.flag("pipeline"):
+            self.logger.log("Detected static search algorithm. Using compile / measure pipeline.")
+            self.run_pipeline()
+
+        else:
+            self.logger.log("Detected static search algorithm. Using parallel batch mode.")
+            self.run_static()
+
     # ---------------------------------------------------------
     # 静态调优（一次性并行执行）
     # ---------------------------------------------------------
     def run_static(self):
-        configs = self.search_algorithm.all_configs()
-        tasks = [(self.target_program, config, self.db_path) for config in configs]
+        """
+        有界提交：同时在途的任务不超过 worker 数，
+        这样后提交的任务可以使用最新的最优解作为竞速上限。
+        开启核绑定时 worker 数等于测量槽数，每个在途任务独占一个槽。
+        """
+        workers = self.worker_count()
+        with self.pool(workers) as executor:
+            self.dispatch(executor, workers, self.search_algorithm.all_configs(), skip_known=True)
+
+    # ---------------------------------------------------------
+    # 批量动态调优（逐批并行，批间反馈）
+    # ---------------------------------------------------------
+    def run_batched(self):
+        workers = self.worker_count()
+        with self.pool(workers) as executor:
+            while not self.search_algorithm.stop():
+                batch = self.search_algorithm.next_batch(self.history)
+                if not batch:
+                    break
+                self.logger.log(f"Dispatching batch of {len(batch)} configs")
+                self.dispatch(executor, workers, batch)
+
+    def pool(self, workers):
+        """进程池；worker 的结构化日志事件经队列交给本进程的单一写者，Ctrl-C 只由本进程处理（见 init_worker）"""
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(self.logger.queue,))
+
+    def worker_count(self):
+        """并行 worker 数；开启核绑定时等于测量槽数"""
+        return len(self.scheduler.slots) if self.scheduler else self.max_workers
+
+    def dispatch(self, executor, workers, configs, skip_known=False):
+        """
+        在进程池中评估一组配置，在途任务数不超过 workers。
+        设置了 batch_param 时，先把兼容的配置分组，每组在一次进程调用中测量。
+        skip_known=True 时跳过已反馈给算法的配置（静态算法恢复时从头遍历配置）。
+        """
+        batching = bool(self.spec.batch_param)
+        configs = self.uncached(configs, skip_known)
+        units = self.batch_units(configs) if batching else ([c] for c in configs)
+        pending = {}  # future -> (槽编号, 提交时间)
+
+        def submit_next():
+            unit = next(units, None)
+            if unit is None:
+                return
+            slot_id, pinning = self.reserve_slot()
+            if batching:
+                task = (self.spec, unit, self.db_path, self.policy, self.race_limit(), pinning,
+                        [self.record_tags(c) for c in unit])
+                future = executor.submit(evaluate_batch, task)
+            else:
+                future = executor.submit(evaluate, self.make_task(unit[0], pinning))
+            pending[future] = (slot_id, time.time())
+            self.telemetry.in_flight = len(pending)
+
+        for _ in range(workers):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                slot_id, submitted = pending.pop(future)
+                self.telemetry.in_flight = len(pending)
+                self.release_slot(slot_id)
+                results = future.result() if batching else [future.result()]
+                for config, measurement in results:
+                    self.record(config, measurement, submitted)
+                submit_next()
+
+    def batch_units(self, configs):
+        """
+        把只在 batch_param 上不同的配置归为一组（保持首次出现的顺序），
+        每组最多 batch_size 个配置
+        """
+        groups = {}
+        for config in configs:
+            groups.setdefault(self.spec.batch_group(config), []).append(config)
+        size = int(self.inputDealer.settings.get("batch_size", 0)) or None
+        for group in groups.values():
+            step = size or len(group)
+            for i in range(0, len(group), step):
+                yield group[i:i + step]
+
+    # ---------------------------------------------------------
+    # 两级流水线（宽编译级 + 窄测量级）
+    # ---------------------------------------------------------
+    def run_pipeline(self):
+        """
+        编译级：进程池较宽，按编译缓存键去重，提前为测量游标之后的配置编译；
+        测量级：进程池较窄（默认 1，开启核绑定时等于测量槽数），只运行已编译好的程序。
+        两级之间是一个有界的就绪队列，预取深度由 prefetch 控制。
+        """
+        settings = self.inputDealer.settings
+        configs = self.uncached(self.search_algorithm.all_configs(), skip_known=True)
+        runner = CRunner(self.target_program, spec=self.spec)
+
+        compile_cpus = self.scheduler.compile_cpus if self.scheduler else None
+        if self.scheduler:
+            measure_workers = len(self.scheduler.slots)
+        else:
+            measure_workers = int(settings.get("measure_workers", 1))
+        compile_workers = int(settings.get("compile_workers", len(compile_cpus) if compile_cpus else self.max_workers))
+        prefetch = int(settings.get("prefetch", 2 * measure_workers + compile_workers))
+
+        built, broken = set(), set()   # 已编译成功 / 失败的缓存键
+        waiting = {}                   # 编译中的缓存键 -> 等待该程序的配置
+        ready = deque()                # 就绪队列（程序已编译好）
+        compiling = {}                 # future -> 缓存键
+        measuring = {}                 # future -> (槽编号, 提交时间)
+        exhausted = False
+        compile_busy = measure_busy = stall = 0.0
+        builds = 0
+        start = time.perf_counter()
+        self.telemetry.workers = compile_workers + measure_workers
+
+        with self.pool(compile_workers) as compile_pool, self.pool(measure_workers) as measure_pool:
+            while True:
+                # 1. 预取：保持测量游标前方有 prefetch 个已编译或编译中的配置
+                while not exhausted and len(ready) + sum(map(len, waiting.values())) < prefetch:
+                    config = next(configs, None)
+                    if config is None:
+                        exhausted = True
+                        break
+                    key = runner.build_key(config)
+                    if key in built or key in broken:
+                        # 编译失败的配置也交给测量级，由 evaluate 记录为无穷大
+                        ready.append(config)
+                    elif key in waiting:
+                        waiting[key].append(config)
+                    else:
+                        waiting[key] = [config]
+                        task = (self.spec, config, compile_cpus)
+                        compiling[compile_pool.submit(compile_binary, task)] = key
+
+                # 2. 派发：有空闲测量槽就从就绪队列取配置
+                while ready and len(measuring) < measure_workers:
+                    config = ready.popleft()
+                    slot_id, pinning = self.reserve_slot()
+                    future = measure_pool.submit(evaluate, self.make_task(config, pinning))
+                    measuring[future] = (slot_id, time.perf_counter(), time.time())
+                    self.telemetry.in_flight = len(measuring)
+
+                if not compiling and not measuring:
+                    break
+
+                # 3. 等待任一阶段完成；记录测量槽因等待编译而空闲的时间
+                starved = measure_workers - len(measuring) if waiting else 0
+                wait_start = time.perf_counter()
+                done, _ = wait(list(compiling) + list(measuring), return_when=FIRST_COMPLETED)
+                stall += starved * (time.perf_counter() - wait_start)
 
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(evaluate, task) for task in tasks]
-            for future in as_completed(futures):
-                config, result = future.result()
-                self.logger.log(f"Finished: {config} -> {result:.6f}s")
-                self.search_algorithm.update(config, result)
+                for future in done:
+                    if future in compiling:
+                        key = compiling.pop(future)
+                        ok, seconds, spans = future.result()
+                        self.telemetry.add_spans(spans)
+                        compile_busy += seconds
+                        builds += 1
+                        (built if ok else broken).add(key)
+                        ready.extend(waiting.pop(key))
+                    else:
+                        slot_id, submitted, submitted_at = measuring.pop(future)
+                        self.telemetry.in_flight = len(measuring)
+                        measure_busy += time.perf_counter() - submitted
+                        self.release_slot(slot_id)
+                        config, measurement = future.result()
+                        self.record(config, measurement, submitted_at)
+
+        wall = time.perf_counter() - start
+        self.logger.log(
+            f"Pipeline utilisation: compile {compile_busy / (compile_workers * wall):.1%} "
+            f"({compile_workers} workers, {builds} builds), "
+            f"measure {measure_busy / (measure_workers * wall):.1%} ({measure_workers} workers), "
+            f"measure stalled on compile {stall:.2f}s"
+        )
 
     # ---------------------------------------------------------
     # 动态调优（边运行边更新）
     # ---------------------------------------------------------
     def run_dynamic(self):
-        while not self.search_algorithm.stop():
-            config = self.search_algorithm.next_config(self.db.get_all())
-            result = CRunner(self.target_program).run(config)
-            self.logger.log(f"Finished: {config} -> {result:.6f}s")
-            self.db.save(config, result)
-            self.search_algorithm.update(config, result)
+        """
+        异步 ask / tell：保持最多 workers 个评估在途，
+        每完成一个结果就反馈给算法（update），再向算法索取新配置（next_config）补满。
+        在途配置以 pending（config_key -> config）传给 next_config，算法据此避免重复提议；
+        next_config 返回 None 表示需要等待在途结果后才能继续提议；
+        提议了在途配置时跳过并重新索取（每轮最多 DUPLICATE_RETRIES 次），不会测两次，也不让 worker 空等。
+        恢复实验时，快照中的在途配置先重新提交，算法收到这些结果后才会继续提议。
+        """
+        workers = self.worker_count()
+        in_flight = self.in_flight  # config_key -> config
+        futures = {}    # future -> (config_key, 槽编号, 提交时间)
+
+        with self.pool(workers) as executor:
+            while True:
+                duplicates = 0
+                with deferred_interrupt():  # 提议到登记为在途之间不能被 Ctrl-C 打断
+                    while len(futures) < workers and (self.resubmit or not self.search_algorithm.stop()):
+                        if self.resubmit:
+                            config = self.resubmit.pop(0)
+                        else:
+                            config = self.search_algorithm.next_config(self.history, pending=in_flight)
+                        if config is None:
+                            break
+                        key = config_key(config)
+                        if key in in_flight:
+                            duplicates += 1  # 与在途配置重复：等它的结果，而不是测两次
+                            if duplicates >= self.DUPLICATE_RETRIES:
+                                break
+                            continue
+                        if self.resolve(config):
+                            continue
+                        slot_id, pinning = self.reserve_slot()
+                        future = executor.submit(evaluate, self.make_task(config, pinning))
+                        futures[future] = (key, slot_id, time.time())
+                        in_flight[key] = config
+                        self.telemetry.in_flight = len(futures)
+
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                with deferred_interrupt():  # 反馈给算法与计入 seen 之间不能被打断
+                    for future in done:
+                        key, slot_id, submitted = futures.pop(future)
+                        self.telemetry.in_flight = len(futures)
+                        self.release_slot(slot_id)
+                        config, measurement = future.result()
+                        self.record(config, measurement, submitted)
 
     # ---------------------------------------------------------
-    # 自定义运行
+    # 公共辅助函数
     # ---------------------------------------------------------
+    def race_limit(self):
+        """当前竞速上限（基于搜索算法已知的最优解）"""
+        return self.policy.limit(self.search_algorithm.best_result)
+
+    def reserve_slot(self):
+        """开启核绑定时占用一个测量槽，返回 (槽编号, 绑定信息)；否则返回 (None, None)"""
+        if not self.scheduler:
+            return None, None
+        slot_id = self.scheduler.acquire()
+        return slot_id, self.scheduler.pinning(slot_id)
+
+    def release_slot(self, slot_id):
+        if self.scheduler:
+            self.scheduler.release(slot_id)
+
+    def make_task(self, config, pinning=None):
+        """构造子进程任务"""
+        return (self.spec, config, self.db_path, self.policy, self.race_limit(), pinning, self.record_tags(config))
+
+    def record_tags(self, config):
+        """搜索算法希望附加到数据库记录上的字段（可选接口 record_tags）"""
+        if hasattr(self.search_algorithm, "record_tags"):
+            return self.search_algorithm.record_tags(config)
+        return None
+
+    def resolve(self, config, skip_known=False):
+        """
+        不需要实际测量时返回 True：
+            1. 恢复模式下数据库中已有、但快照之后才完成的结果，直接回放给算法；
+            2. skip_known=True 且算法已经收到过该配置的结果；
+            3. 跨实验结果缓存命中，记录缓存结果。
+        """
+        key = config_key(config)
+        if key in self.replay:
+            rec = self.replay[key].pop(0)
+            if not self.replay[key]:
+                del self.replay[key]
+            self.record(config, restored_measurement(rec))
+            return True
+        if skip_known and key in self.seen:
+            return True
+
+        measurement = self.result_cache.lookup(config) if self.result_cache else None
+        if measurement is None:
+            return False
+        self.db.save(config, measurement["time"], measurement_extra(measurement, self.record_tags(config)))
+        self.record(config, measurement)
+        return True
+
+    def uncached(self, configs, skip_known=False):
+        """过滤配置流：回放、已知与缓存命中的配置就地处理，只产出需要实际测量的配置"""
+        for config in configs:
+            self.log_pruned()
+            if not self.resolve(config, skip_known):
+                yield config
+        self.log_pruned()
+
+    def log_pruned(self):
+        """逐条记录搜索算法预筛选跳过的配置（可选接口 pruned：(配置, 预测时间, 预测下界, 当时最优) 列表）"""
+        pruned = getattr(self.search_algorithm, "pruned", None)
+        if not pruned:
+            return
+        for config, predicted, lower, incumbent in pruned[self.pruned_logged:]:
+            self.logger.log(
+                f"Pruned: {config} -> predicted {predicted:.6f}s (lower bound {lower:.6f}s > best {incumbent:.6f}s)",
+                status="pruned", config=config, predicted=predicted, lower=lower, incumbent=incumbent,
+            )
+        self.pruned_logged = len(pruned)
+
+    @staticmethod
+    def failed_measurement():
+        """编译或运行失败时的测量结果"""
+        return {"time": float("inf"), "samples": [], "stats": None, "censored": False, "rusage": []}
+
+    def record(self, config, measurement, submitted=None):
+        """
+        输出日志，更新内存历史索引、结果缓存与遥测，并把结果反馈给搜索算法
+        submitted: 任务提交到进程池的时间（用于统计排队时间）
+        """
+        result = measurement["time"]
+        self.telemetry.observe(measurement, submitted)
+        self.telemetry.add_spans(drain())  # 主进程中的片段（顺序模式的测量、缓存命中的写库）
+        self.history.add(config, result, censored=measurement["censored"])
+        if self.result_cache and not measurement.get("restored"):
+            self.result_cache.store(config, measurement)
+        if measurement.get("restored"):
+            self.logger.log(f"Restored: {config} -> {result:.6f}s (measured before resume)",
+                            status="restored", config=config, time=result)
+        elif measurement["censored"]:
+            self.logger.log(f"Killed: {config} -> >{result:.6f}s (censored by race limit)",
+                            status="censored", config=config, time=result)
+        elif measurement.get("cached"):
+            self.logger.log(f"Cached: {config} -> {result:.6f}s", status="cached", config=config, time=result)
+        else:
+            self.logger.log(f"Finished: {config} -> {result:.6f}s", status="finished", config=config, time=result)
+        self.search_algorithm.update(config, result, censored=measurement["censored"])
+
+        key = config_key(config)
+        self.seen[key] = self.seen.get(key, 0) + 1
+        self.in_flight.pop(key, None)  # 计入 seen 之后才移出在途：中断时的快照不会丢失尚未反馈的配置
+        self.recorded += 1
+        if self.recorded % self.checkpoint_every == 0:
+            self.save_checkpoint()
+
+        progress = self.telemetry.progress()
+        if progress:
+            self.logger.log(progress)
+
+    # ---------------------------------------------------------
+    # 快照与恢复
+    # ---------------------------------------------------------
+    def save_checkpoint(self):
+        """保存算法状态快照；算法对象无法序列化时关闭快照并记录日志"""
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.save(self.search_algorithm, self.seen, self.in_flight)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            self.logger.log(f"Checkpointing disabled: search algorithm state is not picklable ({e})")
+            self.checkpoint = None
+
+    def restore(self):
+        """
+        从快照恢复算法状态与随机数状态：
+        快照已包含的结果只写入历史索引，快照之后才写入数据库的结果放入回放队列，
+        算法再次提出这些配置时直接回放，只有中断时仍在途的配置需要重新测量
+        （异步模式的在途配置随快照保存，恢复后由 run_dynamic 优先重新提交）。
+        """
+        state = self.checkpoint.load()
+        if state is not None:
+            self.search_algorithm = state["algorithm"]
+            self.seen = dict(state["seen"])
+            self.resubmit = list(state.get("in_flight", []))
+
+        remaining = dict(self.seen)
+        records = self.db.get_records()
+        for rec in records:
+            config = self.params.coerce(rec["config"])  # 类型化参数之前的记录把数值保存为字符串
+            key = config_key(config)
+            if remaining.get(key):
+                remaining[key] -= 1
+                self.history.add(config, rec["time"], censored=rec.get("censored", False))
+            else:
+                self.replay.setdefault(key, []).append(dict(rec, config=config))
+
+        replayed = sum(len(recs) for recs in self.replay.values())
+        snapshot = "snapshot found" if state is not None else "no snapshot, replaying all records"
+        self.logger.log(f"Resuming {self.exp_dir}: {len(records)} records, {replayed} to replay ({snapshot})")
+
+    # ---------------------------------------------------------
+    # 编译缓存统计与遥测报告
+    # ---------------------------------------------------------
+    def log_telemetry(self):
+        """输出最终进度、耗时分解，并导出 Chrome Trace 时间线"""
+        self.logger.log(self.telemetry.progress(force=True))
+        for line in self.telemetry.report():
+            self.logger.log(line)
+        trace_path = os.path.join(self.exp_dir, "trace.json")
+        self.telemetry.write_trace(trace_path)
+        self.logger.log(f"Timeline written to {trace_path} (open in chrome://tracing or Perfetto)")
+
+    def log_prescreen(self):
+        """汇总预筛选：跳过的配置数与按预测时间估算节省的测量时间"""
+        pruned = getattr(self.search_algorithm, "pruned", None)
+        if not pruned:
+            return
+        runs = self.policy.warmup_runs + self.policy.timed_runs
+        saved = sum(predicted for _, predicted, _, _ in pruned) * runs
+        self.logger.log(f"Pre-screening: skipped {len(pruned)} configs, "
+                        f"estimated {saved:.2f}s of program runs saved ({runs} runs per config, excluding compile)")
+
+    def log_summary(self):
+        """搜索算法的附加汇总（可选接口 summary）"""
+        if hasattr(self.search_algorithm, "summary"):
+            self.logger.log(self.search_algorithm.summary())
+
+    def log_build_cache(self, before):
+        """输出本次实验期间编译缓存的命中 / 未命中次数"""
+        after = BuildCache(os.path.join("tmp", "build_cache")).stats()
+        hits = after.get("hits", 0) - before.get("hits", 0)
+        misses = after.get("misses", 0) - before.get("misses", 0)
+        evictions = after.get("evictions", 0) - before.get("evictions", 0)
+        self.logger.log(f"Build cache: {hits} hits, {misses} misses, {evictions} evictions")
+
     # ---------------------------------------------------------
     # 自定义调优（算法自带执行逻辑）
     # ---------------------------------------------------------
@@ -156,7 +762,9 @@ if __name__ == "__main__":
     parser.add_argument("--input", type=str, default="input.txt", help="Path to input configuration file")
     parser.add_argument("--workers", type=int, default=4, help="Number of parallel worker processes")
     parser.add_argument("--exp_name", type=str, default=None, help="Custom experiment name")
+    parser.add_argument("--resume", type=str, default=None, metavar="EXP_DIR",
+                        help="Resume an interrupted experiment from its directory")
     args = parser.parse_args()
 
-    tuner = Autotuner(args.input, max_workers=args.workers, exp_name=args.exp_name)
+    tuner = Autotuner(args.input, max_workers=args.workers, exp_name=args.exp_name, resume=args.resume)
     tuner.run()
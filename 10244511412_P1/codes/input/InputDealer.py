@@ -1,8 +1,60 @@
+from codes.input.Parameter import Parameter
+
+
 class InputDealer:
+    # 保留的运行设置项（不属于参数空间）
+    SETTING_KEYS = {
+        "warmup_runs",      # 预热运行次数（不计入统计）
+        "timed_runs",       # 计时运行次数
+        "max_runs",         # 自适应重复的最大运行次数
+        "ci_target",        # 置信区间半宽 / 中心值 的目标（如 0.02 表示 2%）
+        "statistic",        # 搜索算法比较所用的统计量：median / mean / min
+        "race_factor",      # 竞速模式：运行超过 race_factor × 当前最优 即被终止
+        "race_grace",       # 竞速超时的额外宽限秒数（覆盖程序初始化开销）
+        "pin_cores",        # 静态并行模式下把计时运行绑定到独占的物理核（true / false）
+        "one_per_llc",      # 每个末级缓存域只允许一个计时运行（true / false）
+        "pipeline",         # 静态模式使用 编译 / 测量 两级流水线（true / false）
+        "compile_workers",  # 流水线编译级的并行度
+        "measure_workers",  # 流水线测量级的并行度（未开启核绑定时使用，默认 1）
+        "prefetch",         # 测量游标前方预取（已编译或编译中）的配置数上限
+        "compiler",         # 编译器命令（默认 clang）
+        "sources",          # 额外的源文件（逗号分隔）
+        "extra_flags",      # 额外的编译参数
+        "link_flags",       # 链接参数（放在源文件之后）
+        "build_mode",       # compile（直接调用编译器）/ make（调用 Makefile）
+        "make_target",      # make 模式下的目标名
+        "executable",       # make 模式下生成的可执行文件（相对 Makefile 目录）
+        "run_args",         # 运行时追加的固定命令行参数
+        "output_pattern",   # 从程序输出中提取时间的正则（一个捕获组）
+        "batch_param",      # 批量协议：一次进程调用中依次测量多个取值的 argv 参数（如 block_size）
+        "batch_size",       # 批量协议：每次进程调用最多测量的配置数
+        "result_cache",     # 跨实验测量结果缓存（true / false，默认 false）
+        "result_cache_max_age",  # 缓存结果的最长有效期（小时），超过即重新测量
+        "force_remeasure",  # 忽略缓存结果，全部重新测量（true / false）
+        "checkpoint_every", # 每收到多少个结果保存一次算法快照（默认 1）
+        "progress_interval",  # 进度行的输出间隔（秒，默认 5）
+    }
+
     def __init__(self, input_file):
         self.input_file = input_file
+        self.settings = {}
+        self.bindings = {}   # 参数 -> 绑定方式（bind.<参数> = 方式[:参数]）
+        self.options = {}    # 搜索算法构造参数（option.<名称> = 值）
+        self.constraints = []  # 配置有效性约束（constraint = 表达式，可写多行）
+        self.conditions = {}   # 条件参数（when.<参数> = 表达式）
+
+    def flag(self, key, default=False):
+        """读取布尔型设置项"""
+        value = self.settings.get(key)
+        if value is None:
+            return default
+        return value.lower() in ("1", "true", "yes", "on")
 
     def parse_input(self):
+        """
+        解析 input.txt，返回 (目标程序, 参数字典, 算法名)；
+        参数字典的值为 Parameter（类型化取值，语法见 Parameter）
+        """
         target_program = None
         algorithm = None
         params = {}
@@ -12,15 +64,49 @@ class InputDealer:
                 line = line.strip()
                 if not line or line.startswith("#"):
                     continue
-                key, value = [x.strip() for x in line.split("=")]
+                key, value = [x.strip() for x in line.split("=", 1)]
                 if key == "target_program":
                     target_program = value
                 elif key == "search_algorithm":
                     algorithm = value
+                elif key == "constraint":
+                    self.constraints.append(value)
+                elif key in self.SETTING_KEYS:
+                    self.settings[key] = value
+                elif key.startswith("bind."):
+                    self.bindings[key[len("bind."):]] = value
+                elif key.startswith("option."):
+                    self.options[key[len("option."):]] = parse_option(value)
+                elif key.startswith("when."):
+                    self.conditions[key[len("when."):]] = value
                 else:
-                    params[key] = [v.strip() for v in value.split(",")]
+                    params[key] = Parameter.parse(key, value)
 
         if not target_program or not algorithm:
             raise ValueError("Missing required configuration fields in input.txt")
+        for name, condition in self.conditions.items():
+            if name not in params:
+                raise ValueError(f"Condition given for unknown parameter: {name}")
+            params[name].condition = condition
+        if self.flag("pipeline") and self.settings.get("batch_param"):
+            # 流水线模式逐个配置测量，不支持批量协议
+            raise ValueError("pipeline = true cannot be combined with batch_param")
+
+        return target_program, params, algorithm
+
 
-        return target_program, params, algorithm
\ No newline at end of file
+def parse_option(value):
+    """
+    解析算法参数值：逗号分隔时返回列表，
+    数字转换为 int / float，true / false 转换为布尔值，其余保留字符串
+    """
+    if "," in value:
+        return [parse_option(v.strip()) for v in value.split(",") if v.strip()]
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
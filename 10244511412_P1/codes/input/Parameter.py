@@ -0,0 +1,170 @@
+import math
+import re
+
+
+class Parameter:
+    """
+    Parameter 类型化参数
+    ------------------------------------------------
+    input.txt 中参数行的取值语法：
+        a, b, c                    取值列表：全为整数 / 数字时为数值参数（按数值排序，
+                                   等比数列按对数尺度度量距离），否则为无序类别参数
+        range(起点, 终点[, 步长])     整数或浮点等差序列（包含终点）
+        pow2(起点, 终点)             起点与终点之间的全部 2 的幂（对数尺度）
+        log(起点, 终点, 个数)         对数均匀分布的若干取值（端点为整数时取整并去重）
+        categorical(a, b, ...)     无序类别：邻域为其他全部取值，模型只比较是否相同
+        ordered(a, b, ...)         有序类别：按列出顺序，邻域为前后相邻的取值
+    条件参数：when.<参数> = 表达式（如 when.unroll_inner = unroll > 1），
+    表达式为假时该参数不起作用，固定取默认值（取值列表中的第一个）。
+    类型：int / float（数值）、ordered（有序类别）、categorical（无序类别）。
+    """
+
+    KINDS = ("int", "float", "ordered", "categorical")
+
+    def __init__(self, name, values, kind=None, log=False, condition=None):
+        if not values:
+            raise ValueError(f"Parameter '{name}' has no values")
+        kind = kind or _infer_kind(values)
+        if kind not in self.KINDS:
+            raise ValueError(f"Unsupported parameter kind for '{name}': {kind}")
+        self.name = name
+        self.kind = kind
+        self.values = sorted(values) if kind in ("int", "float") else list(values)
+        self.log = log and all(v > 0 for v in self.values) if kind in ("int", "float") else False
+        self.condition = condition
+
+    @classmethod
+    def parse(cls, name, text):
+        """按上述语法解析 input.txt 中参数行的取值部分"""
+        match = re.fullmatch(r"(\w+)\s*\((.*)\)", text.strip())
+        if match and match.group(1) in ("range", "pow2", "log", "categorical", "ordered"):
+            form, args = match.group(1), [parse_value(v) for v in _split(match.group(2))]
+            if form == "categorical":
+                return cls(name, args, "categorical")
+            if form == "ordered":
+                return cls(name, args, "ordered")
+            if form == "range":
+                return cls(name, _range(name, *args))
+            if form == "pow2":
+                return cls(name, _pow2(name, *args), "int", log=True)
+            return cls(name, _log(name, *args), log=True)
+
+        values = [parse_value(v) for v in _split(text)]
+        kind = _infer_kind(values)
+        return cls(name, values, kind, log=kind in ("int", "float") and _is_geometric(values))
+
+    # ---------------------------------------------------------
+    # 属性
+    # ---------------------------------------------------------
+    @property
+    def numeric(self):
+        return self.kind in ("int", "float")
+
+    @property
+    def ordered(self):
+        """取值之间是否有顺序（数值参数与有序类别）"""
+        return self.kind != "categorical"
+
+    @property
+    def default(self):
+        """默认值：条件不满足时该参数固定取此值"""
+        return self.values[0]
+
+    def coerce(self, value):
+        """
+        把旧记录中的取值转换为本参数的取值：类型化之前的数据库 / 日志把数值保存为字符串（如 "16"），
+        按 parse_value 解析后与取值列表匹配；无法对应时原样返回
+        """
+        if value in self.values:
+            return value
+        if isinstance(value, str):
+            parsed = parse_value(value)
+            if parsed in self.values:
+                return parsed
+        return next((v for v in self.values if str(v) == str(value)), value)
+
+    def scaled(self):
+        """
+        每个取值在 [0, 1] 上的位置（供模型度量距离）：
+        数值参数按（对数）数值，有序类别按序号；无序类别返回序号本身
+        """
+        n = len(self.values)
+        if self.numeric and n > 1:
+            x = [math.log(v) if self.log else float(v) for v in self.values]
+            lo, hi = x[0], x[-1]
+            if hi > lo:
+                return [(v - lo) / (hi - lo) for v in x]
+        if self.ordered and n > 1:
+            return [i / (n - 1) for i in range(n)]
+        return [float(i) for i in range(n)]
+
+    def describe(self):
+        if self.numeric:
+            text = f"{self.kind}[{self.values[0]}..{self.values[-1]}, {len(self.values)} values"
+            text += ", log]" if self.log else "]"
+        else:
+            text = f"{self.kind}({len(self.values)} values)"
+        if self.condition:
+            text += f" when {self.condition}"
+        return f"{self.name}: {text}"
+
+
+def parse_value(text):
+    """单个取值：整数 / 浮点数转换为数字，其余保留字符串"""
+    text = text.strip()
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _split(text):
+    return [v for v in (v.strip() for v in text.split(",")) if v]
+
+
+def _infer_kind(values):
+    """全为整数 -> int，全为数字 -> float；数字形式的字符串按列出顺序视为有序类别，其余为无序类别"""
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return "int"
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return "float"
+    if all(isinstance(parse_value(str(v)), (int, float)) for v in values):
+        return "ordered"
+    return "categorical"
+
+
+def _is_geometric(values):
+    """至少三个正数且相邻比值相同（如 8, 16, 32, 64）时按对数尺度度量"""
+    values = sorted(values)
+    if len(values) < 3 or values[0] <= 0:
+        return False
+    ratios = [b / a for a, b in zip(values, values[1:])]
+    return ratios[0] > 1 and all(math.isclose(r, ratios[0], rel_tol=1e-6) for r in ratios)
+
+
+def _range(name, start, stop, step=1):
+    if step <= 0 or stop < start:
+        raise ValueError(f"Invalid range for parameter '{name}': ({start}, {stop}, {step})")
+    if all(isinstance(v, int) for v in (start, stop, step)):
+        return list(range(start, stop + 1, step))
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    return [round(start + i * step, 12) for i in range(count)]
+
+
+def _pow2(name, low, high):
+    if low <= 0 or high < low:
+        raise ValueError(f"Invalid pow2 range for parameter '{name}': ({low}, {high})")
+    return [2 ** k for k in range(math.ceil(math.log2(low)), math.floor(math.log2(high)) + 1)]
+
+
+def _log(name, low, high, count):
+    if low <= 0 or high < low or count < 1:
+        raise ValueError(f"Invalid log range for parameter '{name}': ({low}, {high}, {count})")
+    if count == 1:
+        return [low]
+    values = [low * (high / low) ** (i / (count - 1)) for i in range(count)]
+    if isinstance(low, int) and isinstance(high, int):
+        return sorted({int(round(v)) for v in values})
+    return [round(v, 12) for v in values]
@@ -0,0 +1,182 @@
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import subprocess
+import uuid
+from contextlib import contextmanager
+
+
+class BuildCache:
+    """
+    BuildCache 编译缓存
+    ------------------------------------------------
+    职责：
+        1. 以 (源文件与本地头文件哈希 + 编译器及其版本 + 编译参数) 作为键缓存可执行文件；
+        2. 多个进程共享同一缓存目录，通过文件锁保证同一键只编译一次；
+        3. 按最近使用时间（LRU）和总大小进行淘汰；
+        4. 统计命中 / 未命中次数，供 Autotuner 写入日志。
+    锁：<键>.lock 编译时持有排他锁，checkout() 使用期间（运行程序时）持有共享锁；
+    淘汰只删除能立即拿到排他锁的条目，正在被运行的可执行文件不会被删除。
+    """
+
+    def __init__(self, cache_dir="tmp/build_cache", max_entries=64, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats_path = os.path.join(cache_dir, "stats.json")
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------------------------------------------------------
+    # 主接口
+    # ---------------------------------------------------------
+    def key(self, sources, compiler, flags, version=""):
+        """根据源文件内容、编译器（及其版本字符串）与编译参数计算缓存键"""
+        h = hashlib.sha256()
+        for src in sources:
+            with open(src, "rb") as f:
+                h.update(f.read())
+        h.update(compiler.encode())
+        h.update(b"\0" + version.encode())
+        for flag in flags:
+            h.update(b"\0" + flag.encode())
+        return h.hexdigest()[:16]
+
+    def get_or_build(self, key, build):
+        """
+        返回键对应的可执行文件路径，不存在时调用 build(output_path) 编译。
+        ------------------------------------------------
+        build: 函数，接收临时输出路径，编译失败时抛出 CalledProcessError
+        只保证返回时文件存在（预编译用）；需要运行它时使用 checkout()。
+        """
+        with self.checkout(key, build) as exe_path:
+            return exe_path
+
+    @contextmanager
+    def checkout(self, key, build):
+        """
+        取得键对应的可执行文件并在 with 块内持有共享锁，期间不会被其他进程淘汰
+        ------------------------------------------------
+        命中时只加共享锁（多个 worker 可以同时运行同一个可执行文件）；
+        未命中时加排他锁编译，再转换为共享锁。转换不是原子操作，
+        转换间隙被淘汰时重新编译。
+        """
+        exe_path = os.path.join(self.cache_dir, key)
+        built = False
+        with open(os.path.join(self.cache_dir, f"{key}.lock"), "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_SH)
+                while not os.path.exists(exe_path):
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    if not os.path.exists(exe_path):
+                        self._build(exe_path, build)
+                        built = True
+                    fcntl.flock(lock, fcntl.LOCK_SH)
+
+                if built:
+                    self._bump("misses")
+                    self.evict(keep=key)
+                else:
+                    os.utime(exe_path)  # 刷新最近使用时间（LRU）
+                    self._bump("hits")
+                yield exe_path
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def stats(self):
+        """读取全局命中统计"""
+        with self._locked("stats.lock"):
+            return self._read_stats()
+
+    def evict(self, keep=None):
+        """按 LRU 淘汰，直到数量与总大小都不超过上限"""
+        with self._locked("evict.lock"):
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if "." in name or name == keep or not os.path.isfile(path):
+                    continue
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, name))
+
+            entries.sort()  # 最久未使用的排在前面
+            total = sum(size for _, size, _ in entries)
+            count = len(entries) + (1 if keep else 0)
+            evicted = 0
+            for _, size, name in entries:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                if not self._remove_unused(name):
+                    continue  # 正在被运行（持有共享锁），跳过
+                count -= 1
+                total -= size
+                evicted += 1
+
+        if evicted:
+            self._bump("evictions", evicted)
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    @staticmethod
+    def _build(exe_path, build):
+        """先编译到临时文件，再原子替换，避免其他进程读到半成品"""
+        tmp_path = f"{exe_path}.{uuid.uuid4().hex[:6]}.tmp"
+        try:
+            build(tmp_path)
+            os.replace(tmp_path, exe_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remove_unused(self, name):
+        """条目没有被使用或编译时删除并返回 True；拿不到排他锁时返回 False"""
+        with open(os.path.join(self.cache_dir, f"{name}.lock"), "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return True
+
+    @contextmanager
+    def _locked(self, lock_name):
+        """基于 fcntl 的跨进程互斥锁"""
+        with open(os.path.join(self.cache_dir, lock_name), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_stats(self):
+        if not os.path.exists(self.stats_path):
+            return {"hits": 0, "misses": 0, "evictions": 0}
+        with open(self.stats_path, "r") as f:
+            return json.load(f)
+
+    def _bump(self, field, amount=1):
+        with self._locked("stats.lock"):
+            stats = self._read_stats()
+            stats[field] = stats.get(field, 0) + amount
+            with open(self.stats_path, "w") as f:
+                json.dump(stats, f)
+
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler):
+    """编译器版本（--version 首行），工具链升级后缓存键随之改变；make 模式下取 cc 的版本"""
+    if compiler.startswith("make:"):
+        compiler = "cc"
+    try:
+        out = subprocess.run([compiler, "--version"], capture_output=True, text=True, timeout=30).stdout
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return out.strip().splitlines()[0] if out.strip() else "unknown"
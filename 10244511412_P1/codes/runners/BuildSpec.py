@@ -0,0 +1,260 @@
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+
+
+class BuildSpec:
+    """
+    BuildSpec 声明式编译 / 运行模板
+    ------------------------------------------------
+    职责：
+        1. 描述如何编译目标程序：直接调用编译器（compile）或调用 Makefile（make）；
+        2. 描述每个参数如何作用到编译或运行上（绑定方式）：
+            flag[:模板]    编译参数，模板中 {value} 替换为参数值（默认 "{value}"）
+            define[:宏名]  -D宏名=值（宏名默认与参数同名）
+            make[:变量名]  make 命令行变量 变量名=值（变量名默认与参数同名）
+            compiler       参数值即编译器命令（如 clang / gcc）
+            env[:变量名]   运行时环境变量
+            argv[:位置]    运行时命令行参数（位置默认按声明顺序）
+        3. flag / define / make / compiler 属于编译期参数，决定编译缓存键；
+           env / argv 只影响运行，同一可执行文件可复用。
+    input.txt 示例：
+        compiler = clang
+        extra_flags = -march=native
+        bind.optimize_level = flag:-{value}
+        bind.COARSEN_THRESHOLD = define
+        bind.block_size = argv
+    未声明绑定时沿用原有约定：optimize_level -> -O{x}，block_size -> argv[1]。
+    """
+
+    KINDS = ("flag", "define", "make", "compiler", "env", "argv")
+    COMPILE_KINDS = ("flag", "define", "make", "compiler")
+    DEFAULT_BINDINGS = {"optimize_level": "flag:-{value}", "block_size": "argv"}
+
+    def __init__(self, target_program, params=None, settings=None, bindings=None):
+        settings = settings or {}
+        self.target_program = target_program
+        self.compiler = settings.get("compiler", "clang")
+        self.sources = [target_program] + split_list(settings.get("sources", ""))
+        self.extra_flags = shlex.split(settings.get("extra_flags", ""))
+        self.link_flags = shlex.split(settings.get("link_flags", ""))
+        self.build_mode = settings.get("build_mode", "compile")
+        self.make_target = settings.get("make_target")
+        self.executable = settings.get("executable")
+        self.run_args = shlex.split(settings.get("run_args", ""))
+        self.output_pattern = settings.get("output_pattern")
+        self.batch_param = settings.get("batch_param")
+
+        if self.build_mode not in ("compile", "make"):
+            raise ValueError(f"Unsupported build_mode: {self.build_mode}")
+        if self.build_mode == "make" and not self.executable:
+            raise ValueError("build_mode = make requires 'executable' (binary produced by make)")
+
+        # 未给出参数空间时（如 CRunner 的默认模板）套用全部默认绑定
+        if params is None:
+            params = dict.fromkeys(self.DEFAULT_BINDINGS)
+        self.bindings = self._parse_bindings(params, bindings or {})
+        if self.batch_param and self.bindings.get(self.batch_param, ("",))[0] != "argv":
+            raise ValueError(f"batch_param '{self.batch_param}' must be bound to argv")
+
+    # ---------------------------------------------------------
+    # 编译
+    # ---------------------------------------------------------
+    def compile_args(self, config):
+        """
+        返回 (编译器, 编译期参数列表)；make 模式下参数列表为 make 变量赋值。
+        """
+        compiler = self.compiler
+        args = []
+        for name, (kind, arg) in self.bindings.items():
+            if name not in config or kind not in self.COMPILE_KINDS:
+                continue
+            value = str(config[name])
+            if kind == "compiler":
+                compiler = value
+            elif kind == "flag":
+                args.extend(shlex.split(arg.replace("{value}", value)))
+            elif kind == "define":
+                args.append(f"-D{arg}={value}")
+            elif kind == "make":
+                args.append(f"{arg}={value}")
+        if self.build_mode == "make":
+            return f"make:{self.make_target or ''}:{self.executable}", args
+        return compiler, args + self.extra_flags
+
+    def cache_key_parts(self, config):
+        """返回 (编译器, 参数列表)，与 key_sources() 一起决定编译缓存键"""
+        compiler, args = self.compile_args(config)
+        return compiler, args + ["--link", *self.link_flags]
+
+    def key_sources(self):
+        """
+        参与缓存键计算的源文件：compile 模式下为源文件及其（递归）#include "..." 的本地头文件，
+        make 模式下为 Makefile 目录中的全部源码；系统头文件随编译器版本进入缓存键
+        """
+        if self.build_mode == "compile":
+            return self.sources + local_headers(self.sources, self.include_dirs())
+        make_dir = self.make_dir()
+        files = []
+        for root, _, names in os.walk(make_dir):
+            for name in names:
+                if name.endswith((".c", ".h", ".cc", ".cpp", ".hpp")) or name in ("Makefile", "makefile"):
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+
+    def include_dirs(self):
+        """extra_flags 中的 -I 目录（支持 -Idir 与 -I dir 两种写法）"""
+        dirs, flags = [], iter(self.extra_flags)
+        for flag in flags:
+            if flag == "-I":
+                dirs.append(next(flags, ""))
+            elif flag.startswith("-I"):
+                dirs.append(flag[2:])
+        return [d for d in dirs if d]
+
+    def make_dir(self):
+        """make 模式下的构建目录（target_program 可以是目录或其中的 Makefile）"""
+        if os.path.isdir(self.target_program):
+            return self.target_program
+        return os.path.dirname(self.target_program) or "."
+
+    def build(self, config, output_path, preexec_fn=None):
+        """按模板编译到 output_path，失败时抛出 subprocess.CalledProcessError"""
+        compiler, args = self.compile_args(config)
+        if self.build_mode == "compile":
+            cmd = [compiler, *args, *self.sources, "-o", output_path, *self.link_flags]
+            subprocess.run(cmd, check=True, capture_output=True, text=True, preexec_fn=preexec_fn)
+            return
+
+        # make 模式：复制到私有目录中构建，避免并行构建互相覆盖中间文件
+        build_dir = tempfile.mkdtemp(prefix="make_", dir=os.path.dirname(output_path) or ".")
+        try:
+            work_dir = os.path.join(build_dir, "src")
+            shutil.copytree(self.make_dir(), work_dir)
+            cmd = ["make", "-C", work_dir, *([self.make_target] if self.make_target else []), *args]
+            subprocess.run(cmd, check=True, capture_output=True, text=True, preexec_fn=preexec_fn)
+            shutil.copy2(os.path.join(work_dir, self.executable), output_path)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    # ---------------------------------------------------------
+    # 运行
+    # ---------------------------------------------------------
+    def argv(self, exe_path, config, batch_values=None):
+        """
+        运行命令行：可执行文件 + 按位置排列的 argv 参数 + 固定参数 run_args
+        batch_values 非空时，batch_param 所在位置展开为多个值（批量协议）
+        """
+        slots = sorted(
+            (int(arg), [str(v) for v in batch_values] if name == self.batch_param and batch_values
+             else [str(config[name])])
+            for name, (kind, arg) in self.bindings.items()
+            if kind == "argv" and name in config
+        )
+        return [exe_path, *[v for _, values in slots for v in values], *self.run_args]
+
+    def batch_group(self, config):
+        """
+        批量分组键：除 batch_param 外完全相同的配置共享同一个可执行文件与运行环境，
+        可以在同一次进程调用中依次测量
+        """
+        return tuple(sorted((k, str(v)) for k, v in config.items() if k != self.batch_param))
+
+    def env(self, config):
+        """运行环境变量；没有 env 绑定时返回 None（继承当前环境）"""
+        extra = {
+            arg: str(config[name])
+            for name, (kind, arg) in self.bindings.items()
+            if kind == "env" and name in config
+        }
+        if not extra:
+            return None
+        env = dict(os.environ)
+        env.update(extra)
+        return env
+
+    def parse_time(self, stdout):
+        """从程序输出中提取运行时间；未配置 output_pattern 时整个输出即为时间"""
+        if not self.output_pattern:
+            return float(stdout.strip())
+        match = re.search(self.output_pattern, stdout)
+        if not match:
+            raise ValueError(f"output_pattern not found in output: {self.output_pattern}")
+        return float(match.group(1))
+
+    def parse_times(self, stdout):
+        """批量协议：按顺序提取每个参数值对应的运行时间（每行一个，或 output_pattern 的全部匹配）"""
+        if not self.output_pattern:
+            return [float(line) for line in stdout.split()]
+        return [float(m) for m in re.findall(self.output_pattern, stdout)]
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _parse_bindings(self, params, declared):
+        """解析 bind.<参数> = 方式[:参数] 声明，并为未声明的参数套用默认绑定"""
+        bindings = {}
+        argv_pos = 0
+        specs = dict(declared)
+        for name in params:
+            if name not in specs:
+                if name not in self.DEFAULT_BINDINGS:
+                    raise ValueError(f"Parameter '{name}' has no binding (add 'bind.{name} = ...' to input.txt)")
+                specs[name] = self.DEFAULT_BINDINGS[name]
+
+        for name, spec in specs.items():
+            kind, _, arg = spec.partition(":")
+            kind = kind.strip()
+            arg = arg.strip()
+            if kind not in self.KINDS:
+                raise ValueError(f"Unsupported binding for '{name}': {spec}")
+            if self.build_mode == "make" and kind in ("flag", "define", "compiler"):
+                raise ValueError(f"Binding '{kind}' for '{name}' is not available in make mode; use 'make'")
+            if kind == "flag":
+                arg = arg or "{value}"
+            elif kind in ("define", "make", "env"):
+                arg = arg or name
+            elif kind == "argv":
+                arg = int(arg) if arg else argv_pos
+                argv_pos = arg + 1
+            bindings[name] = (kind, arg)
+        return bindings
+
+
+def split_list(value):
+    """把逗号分隔的字符串拆成去空白的列表"""
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+_INCLUDE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+
+def local_headers(sources, include_dirs=()):
+    """
+    源文件以 #include "..." 引用的本地头文件（递归，去重，按发现顺序）
+    ------------------------------------------------
+    先在引用者所在目录查找，再依次查找 include_dirs；找不到的头文件忽略
+    （可能在条件编译分支中，或由编译器自己的搜索路径提供）。
+    """
+    headers, seen = [], set()
+    pending = list(sources)
+    while pending:
+        path = pending.pop(0)
+        try:
+            with open(path, "r", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            continue
+        for name in _INCLUDE.findall(text):
+            for directory in [os.path.dirname(path) or ".", *include_dirs]:
+                candidate = os.path.normpath(os.path.join(directory, name))
+                if os.path.isfile(candidate):
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        headers.append(candidate)
+                        pending.append(candidate)
+                    break
+    return headers
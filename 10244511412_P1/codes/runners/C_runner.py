@@ -1,64 +1,234 @@
 import subprocess
 import os
-import uuid
-from codes.utils.Timer import Timer
+import random
+from contextlib import ExitStack, contextmanager
+from codes.runners.BuildCache import BuildCache, compiler_version
+from codes.runners.BuildSpec import BuildSpec
+from codes.runners.Measurement import MeasurementPolicy
+from codes.utils.ResourceUsage import run_with_rusage
+from codes.utils.Telemetry import span
+from codes.utils.Topology import pin_to
 
 
 class CRunner:
-    def __init__(self, target_program):
+    def __init__(self, target_program, spec=None, policy=None, compile_cpus=None):
         """
         target_program: 目标 C 程序路径 (如 'MatrixMultiplication.c')
+        spec: BuildSpec 编译 / 运行模板（默认 clang -O{x}，block_size 作为 argv[1]）
+        policy: MeasurementPolicy 重复测量策略（默认单次测量）
+        compile_cpus: 编译进程绑定的 CPU 列表（None 表示不绑定）
         """
         self.target_program = target_program
+        self.spec = spec or BuildSpec(target_program)
+        self.policy = policy or MeasurementPolicy()
+        self.compile_cpus = compile_cpus
         self.tmp_dir = "tmp"
         os.makedirs(self.tmp_dir, exist_ok=True)
+        self.cache = BuildCache(os.path.join(self.tmp_dir, "build_cache"))
 
-    def run(self, config):
+    def build_key(self, config):
+        """配置对应的编译缓存键；键相同的配置共享同一个可执行文件"""
+        compiler, flags = self.spec.cache_key_parts(config)
+        return self.cache.key(self.spec.key_sources(), compiler, flags, compiler_version(compiler))
+
+    def build(self, config):
+        """
+        编译目标程序（带缓存），返回可执行文件路径（预编译用，运行时使用 checkout）。
+        只有编译期参数（flag / define / make / compiler 绑定）影响编译结果，
+        运行期参数（如 block_size）不同的配置共享同一个可执行文件。
+        """
+        with span("compile"):
+            return self.cache.get_or_build(self.build_key(config), self._compile_to(config))
+
+    @contextmanager
+    def checkout(self, config):
+        """编译（带缓存）并在 with 块内持有可执行文件：运行期间其他 worker 的淘汰不会删除它"""
+        with ExitStack() as stack:
+            with span("compile"):
+                exe_path = stack.enter_context(self.cache.checkout(self.build_key(config), self._compile_to(config)))
+            yield exe_path
+
+    def _compile_to(self, config):
+        def compile_to(output_path):
+            self.spec.build(config, output_path, preexec_fn=pin_to(self.compile_cpus))
+        return compile_to
+
+    def run(self, config, limit=None, cpus=None):
         """
         编译并运行目标程序，返回运行时间（秒）。
         config: dict，例如 {'optimize_level': 'O2', 'block_size': '64'}
         """
-        opt_flag = config.get("optimize_level", "O0")
-        block_size = config.get("block_size", "64")
+        return self.measure(config, limit, cpus)["time"]
+
+    def measure(self, config, limit=None, cpus=None):
+        """
+        按测量策略编译并重复运行目标程序。
+        ------------------------------------------------
+        limit: 竞速上限（秒），超过即终止运行，None 表示不限时
+        cpus: 计时运行绑定的 CPU 列表（None 表示不绑定）
+        返回：
+            dict: {"time": 按 statistic 选出的时间, "samples": 计时样本,
+                   "stats": 统计量, "censored": 是否因超时被终止,
+                   "rusage": 每次计时运行的子进程资源使用情况}
+            出错时 time 为无穷大；被终止时 time 为删失下界 limit。
+        """
+        # 编译（命中缓存时直接复用已有可执行文件），测量结束前一直持有
+        try:
+            with self.checkout(config) as exe_path:
+                return self._measure(exe_path, config, limit, cpus)
+        except subprocess.CalledProcessError as e:
+            print(f"[Compile Error] {e.cmd}\n{e.stderr}")
+            return {"time": float("inf"), "samples": [], "stats": None, "censored": False, "rusage": []}
+
+    def _measure(self, exe_path, config, limit=None, cpus=None):
+        """用已编译的可执行文件按测量策略重复运行（返回格式同 measure）"""
+        failed = {"time": float("inf"), "samples": [], "stats": None, "censored": False, "rusage": []}
+        timeout = self.policy.timeout(limit)
+        samples, rusage = [], []
+        try:
+            # 预热运行（结果丢弃）
+            for _ in range(self.policy.warmup_runs):
+                if self._execute(exe_path, config, timeout, cpus)[0] == float("inf"):
+                    return failed
 
-        # 每个进程生成唯一可执行文件名，防止并行冲突
-        exe_name = f"matrix_{opt_flag}_{uuid.uuid4().hex[:6]}"
-        exe_path = os.path.join(self.tmp_dir, exe_name)
+            # 计时运行，直到满足策略要求
+            while not self.policy.done(samples):
+                runtime, usage = self._execute(exe_path, config, timeout, cpus)
+                if runtime == float("inf"):
+                    return failed
+                samples.append(runtime)
+                rusage.append(usage)
+        except subprocess.TimeoutExpired:
+            # 竞速超时：真实时间至少为 limit，记为删失下界
+            return {"time": limit, "samples": samples, "stats": None, "censored": True, "rusage": rusage}
 
-        # 编译命令
-        compile_cmd = ["clang", f"-{opt_flag}", self.target_program, "-o", exe_path]
+        stats = self.policy.summarize(samples)
+        return {"time": self.policy.value(stats), "samples": samples, "stats": stats,
+                "censored": False, "rusage": rusage}
+
+    def measure_batch(self, configs, limit=None, cpus=None):
+        """
+        批量协议：在同一次进程调用中测量多个只在 batch_param 上不同的配置。
+        ------------------------------------------------
+        程序只初始化一次，按给定顺序为每个取值输出一行时间；
+        每轮运行都随机打乱顺序以避免位置偏差，已满足测量策略的配置不再参与后续轮次。
+        超时后尚未输出的配置记为删失，崩溃后尚未输出的配置记为失败。
+        返回：
+            与 configs 一一对应的测量结果列表（格式同 measure）
+        """
+        if len(configs) == 1:
+            return [self.measure(configs[0], limit, cpus)]
 
+        failed = {"time": float("inf"), "samples": [], "stats": None, "censored": False, "rusage": []}
         try:
-            subprocess.run(compile_cmd, check=True, capture_output=True, text=True)
+            with self.checkout(configs[0]) as exe_path:
+                return self._measure_batch(exe_path, configs, limit, cpus)
         except subprocess.CalledProcessError as e:
-            print(f"[Compile Error] {compile_cmd}\n{e.stderr}")
-            return float("inf")
+            print(f"[Compile Error] {e.cmd}\n{e.stderr}")
+            return [dict(failed) for _ in configs]
+
+    def _measure_batch(self, exe_path, configs, limit=None, cpus=None):
+        """用已编译的可执行文件执行批量协议（返回格式同 measure_batch）"""
+        failed = {"time": float("inf"), "samples": [], "stats": None, "censored": False, "rusage": []}
+        count = len(configs)
+        samples = [[] for _ in range(count)]
+        rusage = [[] for _ in range(count)]
+        status = [None] * count  # None: 测量中；"censored" / "failed"
+        warmups_left = self.policy.warmup_runs
+
+        active = list(range(count))
+        while active:
+            timed = warmups_left == 0  # 预热轮的结果丢弃
+            warmups_left = max(0, warmups_left - 1)
+            order = active[:]
+            random.shuffle(order)
+            timeout = self.policy.timeout(None if limit is None else limit * len(order))
+            times, usage, outcome = self._execute_batch(exe_path, [configs[i] for i in order], timeout, cpus)
+
+            for i, runtime in zip(order, times):
+                if timed:
+                    samples[i].append(runtime)
+                    rusage[i].append(dict(usage, batch_size=len(order)))
+            for i in order[len(times):]:
+                status[i] = outcome
+
+            active = [i for i in active if status[i] is None and not self.policy.done(samples[i])]
+
+        results = []
+        for i in range(count):
+            if status[i] == "censored":
+                results.append({"time": limit, "samples": samples[i], "stats": None,
+                                "censored": True, "rusage": rusage[i]})
+            elif status[i] == "failed" or not samples[i]:
+                results.append(dict(failed))
+            else:
+                stats = self.policy.summarize(samples[i])
+                results.append({"time": self.policy.value(stats), "samples": samples[i], "stats": stats,
+                                "censored": False, "rusage": rusage[i]})
+        return results
+
+    def _execute_batch(self, exe_path, configs, timeout=None, cpus=None):
+        """
+        以批量协议运行一次可执行文件
+        ------------------------------------------------
+        返回：
+            (按顺序解析出的时间列表, 资源使用情况, 未完成部分的原因 "censored" / "failed")
+        """
+        batch_param = self.spec.batch_param
+        argv = self.spec.argv(exe_path, configs[0], [c[batch_param] for c in configs])
 
-        # 执行程序并计时
         try:
-            with Timer() as t:
-                result = subprocess.run([exe_path, str(block_size)],
-                                        capture_output=True, text=True)
+            with span("run", batch=len(configs)):
+                result = run_with_rusage(argv, timeout=timeout, preexec_fn=pin_to(cpus), env=self.spec.env(configs[0]))
         except Exception as e:
             print(f"[Runtime Error] {exe_path}: {e}")
-            return float("inf")
+            return [], None, "failed"
+
+        try:
+            times = self.spec.parse_times(result.stdout)[:len(configs)]
+        except ValueError:
+            print(f"[Warning] Invalid output for batch {argv[1:]}: '{result.stdout.strip()}'")
+            return [], result.usage, "failed"
+
+        if result.timed_out:
+            return times, result.usage, "censored"
+        if result.returncode != 0:
+            # 非零退出时整批作废：崩溃可能发生在最后一行计时之后
+            print(f"[Error] Program crashed for batch {argv[1:]}:\n{result.stderr}")
+            return [], result.usage, "failed"
+        return times, result.usage, "failed"
+
+    def _execute(self, exe_path, config, timeout=None, cpus=None):
+        """
+        运行一次可执行文件
+        ------------------------------------------------
+        返回：
+            (程序自身报告的运行时间（秒）, 子进程资源使用情况 dict)
+        超过 timeout 时子进程被杀死并抛出 subprocess.TimeoutExpired
+        """
+        argv = self.spec.argv(exe_path, config)
+
+        # 执行程序并采集资源使用情况
+        try:
+            with span("run"):
+                result = run_with_rusage(argv, timeout=timeout, preexec_fn=pin_to(cpus), env=self.spec.env(config))
+        except Exception as e:
+            print(f"[Runtime Error] {exe_path}: {e}")
+            return float("inf"), None
+
+        if result.timed_out:
+            raise subprocess.TimeoutExpired(argv, timeout)
 
         # 检查执行状态
         if result.returncode != 0:
             print(f"[Error] Program crashed for {config}:\n{result.stderr}")
-            return float("inf")
+            return float("inf"), result.usage
 
         # 提取运行时间
         try:
-            runtime = float(result.stdout.strip())
+            runtime = self.spec.parse_time(result.stdout)
         except ValueError:
             print(f"[Warning] Invalid output for {config}: '{result.stdout.strip()}'")
             runtime = float("inf")
 
-        # 可选：运行后清理可执行文件
-        try:
-            os.remove(exe_path)
-        except FileNotFoundError:
-            pass
-
-        return runtime
+        return runtime, result.usage
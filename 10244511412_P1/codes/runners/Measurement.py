@@ -0,0 +1,97 @@
+import math
+import statistics
+
+
+# 95% 双侧 t 分布临界值（自由度 1~30），更大自由度近似为正态分布 1.96
+T_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+class MeasurementPolicy:
+    """
+    MeasurementPolicy 重复测量策略
+    ------------------------------------------------
+    职责：
+        1. 规定预热次数（warmup_runs）与计时次数（timed_runs）；
+        2. 自适应重复：置信区间半宽未达到 ci_target 时继续测量，直到 max_runs；
+        3. 计算样本统计量，并按 statistic 选出供搜索算法比较的数值；
+        4. 竞速模式：已有最优解时，超过 race_factor × 最优 的运行被终止，
+           结果记为删失（censored）下界，而不是无穷大。
+    默认值（0 次预热、1 次计时、不竞速）与原先的单次测量行为一致。
+    """
+
+    STATISTICS = ("median", "mean", "min")
+
+    def __init__(self, warmup_runs=0, timed_runs=1, max_runs=None, ci_target=None, statistic="median",
+                 race_factor=None, race_grace=5.0):
+        if statistic not in self.STATISTICS:
+            raise ValueError(f"Unsupported statistic: {statistic}")
+        if race_factor is not None and race_factor <= 1.0:
+            raise ValueError("race_factor must be greater than 1")
+        self.warmup_runs = warmup_runs
+        self.timed_runs = max(1, timed_runs)
+        self.max_runs = max(self.timed_runs, max_runs or self.timed_runs)
+        self.ci_target = ci_target
+        self.statistic = statistic
+        self.race_factor = race_factor
+        self.race_grace = race_grace
+
+    @classmethod
+    def from_settings(cls, settings):
+        """根据 InputDealer 解析出的设置项构造策略"""
+        return cls(
+            warmup_runs=int(settings.get("warmup_runs", 0)),
+            timed_runs=int(settings.get("timed_runs", 1)),
+            max_runs=int(settings["max_runs"]) if "max_runs" in settings else None,
+            ci_target=float(settings["ci_target"]) if "ci_target" in settings else None,
+            statistic=settings.get("statistic", "median"),
+            race_factor=float(settings["race_factor"]) if "race_factor" in settings else None,
+            race_grace=float(settings.get("race_grace", 5.0)),
+        )
+
+    def done(self, samples):
+        """判断是否已采集到足够样本"""
+        if len(samples) < self.timed_runs:
+            return False
+        if len(samples) >= self.max_runs or self.ci_target is None:
+            return True
+        stats = self.summarize(samples)
+        return stats["ci_half_width"] <= self.ci_target * stats[self.statistic]
+
+    def summarize(self, samples):
+        """计算样本统计量（均值、中位数、最小值、标准差与 95% 置信区间）"""
+        n = len(samples)
+        mean = statistics.fmean(samples)
+        stdev = statistics.stdev(samples) if n > 1 else 0.0
+        if n > 1:
+            t = T_95[n - 2] if n - 1 <= len(T_95) else 1.96
+            half_width = t * stdev / math.sqrt(n)
+        else:
+            half_width = float("inf")
+        return {
+            "n": n,
+            "mean": mean,
+            "median": statistics.median(samples),
+            "min": min(samples),
+            "stdev": stdev,
+            "ci_half_width": half_width,
+            "ci_low": mean - half_width,
+            "ci_high": mean + half_width,
+        }
+
+    def limit(self, incumbent):
+        """竞速上限：race_factor × 当前最优；未开启竞速或尚无最优解时返回 None"""
+        if self.race_factor is None or incumbent == float("inf"):
+            return None
+        return self.race_factor * incumbent
+
+    def timeout(self, limit):
+        """单次运行的进程超时（上限 + 初始化宽限）"""
+        return None if limit is None else limit + self.race_grace
+
+    def value(self, stats):
+        """返回搜索算法比较所用的统计量"""
+        return stats[self.statistic]
@@ -0,0 +1,188 @@
+import fcntl
+import hashlib
+import json
+import os
+import platform
+import time
+from codes.runners.BuildCache import compiler_version
+from codes.utils.Topology import CpuTopology
+
+
+class ResultCache:
+    """
+    ResultCache 跨实验测量结果缓存
+    ------------------------------------------------
+    职责：
+        1. 以 (目标源码哈希 + 编译器版本 + CPU 型号 / 拓扑指纹 + 测量策略 +
+           测量环境（核绑定、并发 worker 数、batch_param）+ 配置) 作为键，
+           缓存已完成的测量结果，新的实验目录可以直接复用旧实验的结果；
+        2. 过期策略：超过 max_age 秒的结果视为过期，force=True 时强制全部重新测量；
+        3. 统计命中 / 未命中 / 过期次数，供 Autotuner 写入日志。
+    存储：
+        tmp/result_cache/results.jsonl，追加写入并使用 fcntl 锁，
+        多个实验可以同时读写；同一个键以最后写入的结果为准。
+    只缓存完整的测量结果：删失（竞速终止）与失败（inf）的结果依赖当次的上限或环境，不缓存。
+    默认关闭：复用的是旧实验的计时，需要在 input.txt 中显式开启。
+    input.txt 示例：
+        result_cache = true
+        result_cache_max_age = 168      # 小时
+        force_remeasure = false
+    """
+
+    def __init__(self, spec, policy, cache_dir="tmp/result_cache", max_age=None, force=False, setup=None):
+        self.spec = spec
+        self.policy = policy
+        self.setup = setup or {}   # 测量环境：核绑定、并发 worker 数、batch_param
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "results.jsonl")
+        self.max_age = max_age
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._entries = None       # 延迟加载：key -> 记录
+        self._fingerprint = None   # 延迟计算：与配置无关的环境指纹
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, spec, policy, settings, workers=1):
+        """
+        根据 input.txt 中的设置构造；未设置 result_cache = true 时返回 None
+        workers: 同时测量的 worker 数（并发测量会互相干扰，计时不能与串行测量混用）
+        """
+        if not _flag(settings, "result_cache"):
+            return None
+        max_age = settings.get("result_cache_max_age")
+        setup = {
+            "pin_cores": _flag(settings, "pin_cores"),
+            "one_per_llc": _flag(settings, "one_per_llc"),
+            "workers": workers,
+            "batch_param": spec.batch_param,
+        }
+        return cls(spec, policy, max_age=float(max_age) * 3600 if max_age else None,
+                   force=_flag(settings, "force_remeasure"), setup=setup)
+
+    def __getstate__(self):
+        """传给子进程时不携带已加载的记录，由子进程按需重新加载"""
+        state = dict(self.__dict__)
+        state["_entries"] = None
+        return state
+
+    # ---------------------------------------------------------
+    # 主接口
+    # ---------------------------------------------------------
+    def key(self, config):
+        """配置在当前源码 / 工具链 / 机器 / 测量策略下的缓存键"""
+        compiler, flags = self.spec.cache_key_parts(config)
+        parts = [
+            self.fingerprint(),
+            compiler_version(compiler),
+            compiler,
+            flags,
+            self.spec.argv("", config),
+            sorted(self._env(config).items()),
+        ]
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+    def lookup(self, config):
+        """
+        查找缓存的测量结果
+        ------------------------------------------------
+        返回 Autotuner 使用的测量字典（附带 cached=True 与 measured_at），
+        未命中或已过期时返回 None。
+        """
+        entry = self._load().get(self.key(config))
+        if entry is None:
+            self.misses += 1
+            return None
+        if self.force or (self.max_age is not None and time.time() - entry["measured_at"] > self.max_age):
+            self.stale += 1
+            return None
+        self.hits += 1
+        return {
+            "time": entry["time"], "samples": entry["samples"], "stats": entry["stats"],
+            "censored": False, "rusage": entry.get("rusage", []),
+            "cached": True, "measured_at": entry["measured_at"],
+        }
+
+    def store(self, config, measurement):
+        """保存一次完整测量；删失、失败与本身来自缓存的结果不写入"""
+        if measurement["censored"] or measurement.get("cached") or measurement["time"] == float("inf"):
+            return
+        entry = {
+            "key": self.key(config), "config": config, "time": measurement["time"],
+            "samples": measurement["samples"], "stats": measurement["stats"],
+            "rusage": measurement["rusage"], "measured_at": time.time(),
+        }
+        with open(self.path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write((json.dumps(entry) + "\n").encode())
+            f.flush()
+        self._load()[entry["key"]] = entry
+
+    def describe(self):
+        """命中统计摘要（用于日志）"""
+        lookups = self.hits + self.misses + self.stale
+        rate = self.hits / lookups if lookups else 0.0
+        return f"{self.hits} hits, {self.misses} misses, {self.stale} stale ({rate:.1%} hit rate)"
+
+    def fingerprint(self):
+        """与配置无关的指纹：目标源码、CPU 型号与拓扑、测量策略与测量环境"""
+        if self._fingerprint is None:
+            h = hashlib.sha256()
+            for src in self.spec.key_sources():
+                with open(src, "rb") as f:
+                    h.update(f.read())
+            p = self.policy
+            self._fingerprint = [
+                h.hexdigest(),
+                _cpu_model(),
+                CpuTopology().describe(),
+                [p.warmup_runs, p.timed_runs, p.max_runs, p.ci_target, p.statistic],
+                self.spec.run_args,
+                sorted(self.setup.items()),
+            ]
+        return self._fingerprint
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _load(self):
+        """读取缓存日志（共享锁）；后写入的同键记录覆盖先前的记录"""
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    fcntl.flock(f, fcntl.LOCK_SH)
+                    data = f.read()
+                for line in data.decode().splitlines():
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 跳过被中断写入的残缺行
+                    self._entries[entry["key"]] = entry
+        return self._entries
+
+    def _env(self, config):
+        """env 绑定产生的环境变量（只取绑定的变量，避免整个进程环境进入缓存键）"""
+        return {
+            arg: str(config[name])
+            for name, (kind, arg) in self.spec.bindings.items()
+            if kind == "env" and name in config
+        }
+
+
+def _cpu_model():
+    """CPU 型号（Linux 下读取 /proc/cpuinfo，其他平台退回 platform.processor()）"""
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _flag(settings, key):
+    return str(settings.get(key, "false")).lower() in ("true", "1", "yes", "on")
@@ -0,0 +1,232 @@
+import math
+import random
+import numpy as np
+from codes.utils.ConfigSpace import ConfigSpace
+
+
+class BayesianOptimization:
+    """
+    Bayesian Optimization（高斯过程 + 期望改进）搜索算法
+    ------------------------------------------------
+    算法思想：
+        1. 先随机评估 n_init 个配置作为初始样本；
+        2. 用高斯过程（GP）拟合 log(运行时间)：
+           数值参数（如 block_size）按（对数）数值归一化到 [0, 1]，有序类别按序号归一化，
+           无序类别参数（如 optimize_level）按是否相同计入距离（Hamming），
+           核函数 k = exp(-d² / (2 l²))，长度尺度 l 与噪声按边际似然在网格上选取；
+        3. 在全部候选配置上向量化计算期望改进（EI），选出 EI 最大的配置；
+        4. 批量提议：每选出一个点，就以 GP 均值作为“假想结果”加入样本（Kriging Believer），
+           再选下一个点，直到凑满 batch_size 个，使 max_workers 个 worker 同时有活可干。
+
+    参数类型：
+        来自 input.txt 的参数类型（见 Parameter）：数值与有序类别参数按上述位置度量距离，
+        无序类别参数按 Hamming 距离；可用 option.ordinal / option.categorical 显式覆盖（逗号分隔参数名）。
+
+    支持的接口（批量动态算法）：
+        - next_batch(history): 返回下一组待测配置
+        - update(config, result, censored): 根据结果更新样本
+        - stop(): 评估次数达到 max_evals 或空间耗尽时结束
+    """
+
+    LENGTH_SCALES = (0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 2.0)
+    NOISES = (1e-4, 1e-2, 1e-1)
+
+    def __init__(self, params, max_evals=30, batch_size=4, n_init=None, ordinal=None, categorical=None,
+                 xi=0.01, max_candidates=5000):
+        self.params = params
+        self.space = ConfigSpace.of(params)
+        self.names = self.space.names
+        self.max_evals = max_evals
+        self.batch_size = batch_size
+        self.xi = xi
+        self.max_candidates = max_candidates
+
+        ordinal = _as_list(ordinal)
+        categorical = _as_list(categorical)
+        self.ordinal = np.array([
+            name in ordinal or (name not in categorical and self.space.parameter(name).ordered)
+            for name in self.names
+        ])
+        self.sizes = np.array(self.space.radices)
+
+        # 每个维度取值下标 -> 特征值的查找表（按最大取值数补齐）
+        self.scales = np.zeros((len(self.names), int(self.sizes.max())))
+        for d, name in enumerate(self.names):
+            parameter, n = self.space.parameter(name), self.sizes[d]
+            if not self.ordinal[d]:
+                scale = np.arange(n, dtype=float)
+            elif parameter.ordered:
+                scale = np.array(parameter.scaled())
+            else:
+                scale = np.arange(n) / max(n - 1, 1)
+            self.scales[d, :n] = scale
+        self.n_init = n_init or max(batch_size, 2 * len(self.names) + 1)
+
+        # 样本：配置的取值下标向量 -> 结果（inf / 删失下界在拟合时处理）
+        self.observed = {}
+        self.censored = set()
+        self.outstanding = []   # 最近一次提议的批次（恢复时重新提交其中尚无结果的配置）
+
+        self.best_config = None
+        self.best_result = float("inf")
+
+    # ---------------------------------------------------------
+    # 编码与候选集
+    # ---------------------------------------------------------
+    def _candidates(self):
+        """
+        候选集（取值下标矩阵）：空间不大时枚举全部配置，否则随机抽取 max_candidates 个；
+        去掉已评估与违反约束的配置
+        """
+        if self.space.size <= self.max_candidates:
+            grids = np.indices(self.sizes).reshape(len(self.sizes), -1).T
+        else:
+            grids = np.array([self.space.positions(c) for c in self.space.sample(self.max_candidates)])
+        keep = [
+            tuple(row) not in self.observed and self.space.is_valid(self.space.from_positions(row))
+            for row in grids.tolist()
+        ]
+        return grids[np.array(keep, dtype=bool)]
+
+    def _features(self, index):
+        """有序维度为 [0, 1] 上的位置，类别维度保留下标（距离时只比较是否相等）"""
+        index = np.asarray(index, dtype=int).reshape(-1, len(self.names))
+        return self.scales[np.arange(len(self.names)), index]
+
+    def _sq_dist(self, a, b):
+        """有序维度为欧氏距离平方，类别维度每个不同计 1"""
+        diff = a[:, None, :] - b[None, :, :]
+        ordinal = np.sum(np.where(self.ordinal, diff ** 2, 0.0), axis=2)
+        categorical = np.sum(np.where(self.ordinal, 0.0, diff != 0), axis=2)
+        return ordinal + categorical
+
+    # ---------------------------------------------------------
+    # 高斯过程
+    # ---------------------------------------------------------
+    def _targets(self):
+        """log 时间；失败（inf）以当前最差值加惩罚代替"""
+        keys = list(self.observed)
+        y = np.array([self.observed[k] for k in keys], dtype=float)
+        finite = np.isfinite(y) & (y > 0)
+        y = np.where(finite, np.log(np.where(finite, y, 1.0)), np.nan)
+        worst = np.nanmax(y) if finite.any() else 0.0
+        y = np.where(np.isnan(y), worst + 1.0, y)
+        return keys, y
+
+    def _kernel(self, a, b, length):
+        return np.exp(-self._sq_dist(a, b) / (2 * length * length))
+
+    def _fit(self, X, z):
+        """在长度尺度 / 噪声网格上最大化边际似然，返回 (长度尺度, 噪声)"""
+        d2 = self._sq_dist(X, X)
+        best, hyper = -np.inf, (self.LENGTH_SCALES[-1], self.NOISES[-1])
+        for length in self.LENGTH_SCALES:
+            K = np.exp(-d2 / (2 * length * length))
+            for noise in self.NOISES:
+                try:
+                    L = np.linalg.cholesky(K + noise * np.eye(len(X)))
+                except np.linalg.LinAlgError:
+                    continue
+                alpha = np.linalg.solve(L.T, np.linalg.solve(L, z))
+                log_ml = -0.5 * z @ alpha - np.log(np.diag(L)).sum()
+                if log_ml > best:
+                    best, hyper = log_ml, (length, noise)
+        return hyper
+
+    def _posterior(self, X, z, C, length, noise):
+        """候选点 C 的后验均值与标准差（标准化空间）"""
+        L = np.linalg.cholesky(self._kernel(X, X, length) + noise * np.eye(len(X)))
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, z))
+        Ks = self._kernel(C, X, length)
+        v = np.linalg.solve(L, Ks.T)
+        var = np.maximum(1.0 - np.sum(v * v, axis=0), 1e-12)
+        return Ks @ alpha, np.sqrt(var)
+
+    # ---------------------------------------------------------
+    # 接口函数
+    # ---------------------------------------------------------
+    def next_batch(self, history=None):
+        """
+        返回下一批配置：初始阶段随机采样，之后按 EI + Kriging Believer 选点。
+        调用方在评估完上一批之后才会再次调用，因此选点时所有已提议的配置都已有结果；
+        从批次中途的快照恢复时，上一批中尚无结果的配置先原样重新返回。
+        """
+        unobserved = [c for c in self.outstanding if self.space.positions(c) not in self.observed]
+        if unobserved:
+            return unobserved
+
+        budget = self.max_evals - len(self.observed)
+        candidates = self._candidates()
+        if budget <= 0 or len(candidates) == 0:
+            return []
+
+        if len(self.observed) < self.n_init:
+            count = min(budget, len(candidates), self.n_init - len(self.observed))
+            picks = candidates[random.sample(range(len(candidates)), count)]
+        else:
+            picks = self._propose(candidates, min(budget, len(candidates), self.batch_size))
+        self.outstanding = [self.space.from_positions(index) for index in picks]
+        return self.outstanding
+
+    def _propose(self, candidates, q):
+        """向量化 EI 选点，每选一个点以后验均值作为假想观测再选下一个"""
+        keys, y = self._targets()
+        X = self._features(keys)
+        z = (y - y.mean()) / (y.std() or 1.0)
+        length, noise = self._fit(X, z)
+        C = self._features(candidates)
+
+        chosen = []
+        available = np.ones(len(candidates), dtype=bool)
+        for _ in range(q):
+            mu, sigma = self._posterior(X, z, C, length, noise)
+            ei = _expected_improvement(mu, sigma, z.min() - self.xi)
+            ei[~available] = -np.inf
+            pick = int(np.argmax(ei))
+            chosen.append(candidates[pick])
+            available[pick] = False
+
+            # Kriging Believer：把后验均值当作观测值加入，使下一个点远离已选点
+            X = np.vstack([X, C[pick]])
+            z = np.append(z, mu[pick])
+        return np.array(chosen)
+
+    def update(self, config, result, censored=False):
+        """
+        记录一个样本；删失结果按下界使用（真实时间只会更慢），不参与全局最优比较
+        """
+        index = self.space.positions(config)
+        self.observed[index] = result
+        if censored:
+            self.censored.add(index)
+        elif result < self.best_result:
+            self.best_result = result
+            self.best_config = config
+
+    def stop(self):
+        """评估次数达到上限或空间已全部评估"""
+        return len(self.observed) >= min(self.max_evals, self.space.size)
+
+
+def _expected_improvement(mu, sigma, best):
+    """最小化问题的期望改进（标准化空间），向量化"""
+    improvement = best - mu
+    z = improvement / sigma
+    cdf = 0.5 * (1.0 + _erf(z / math.sqrt(2.0)))
+    pdf = np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+    return improvement * cdf + sigma * pdf
+
+
+def _erf(x):
+    """向量化误差函数（Abramowitz-Stegun 7.1.26，误差 < 1.5e-7）"""
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
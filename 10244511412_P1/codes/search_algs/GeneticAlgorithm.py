@@ -0,0 +1,226 @@
+import os
+import random
+from codes.utils.ConfigSpace import ConfigSpace
+from codes.utils.Database import Database
+from codes.utils.History import config_key
+
+
+class GeneticAlgorithm:
+    """
+    GeneticAlgorithm 遗传（进化）搜索算法
+    ------------------------------------------------
+    算法思想：
+        1. 初始种群：最多 seed_fraction 比例的个体取自已有结果中最优的配置，其余随机采样。
+           已有结果来自本次实验的历史（恢复时），以及 seed_from 指定的旧实验目录
+           （option.seed_from = results/GridSearch/<实验名>）；旧实验的结果只用于挑选种子，
+           这些个体在本次实验中重新测量；
+        2. 每一代整体作为一个批次并行评估（已评估过的个体直接沿用结果，不重复测量）；
+        3. 精英保留：上一代最优的 elite 个个体直接进入下一代；
+        4. 锦标赛选择：每次随机取 tournament_size 个个体，选其中最优者作为父代；
+        5. 按参数类型交叉与变异：
+           数值 / 有序参数在两个父代的取值位置之间均匀取值，变异时前后移动一到两格；
+           无序类别参数从父代中任取其一，变异时换成其他任一取值；
+        6. 子代违反约束时重新生成，若整代都已评估过则引入随机个体保持多样性。
+
+    支持的接口（批量动态算法）：
+        - next_batch(history): 返回当前一代中尚未评估的个体（当前一代未评估完时先返回其余个体）
+        - update(config, result, censored): 记录个体适应度（运行时间，越小越好）
+        - stop(): 达到代数或评估次数上限时结束
+    """
+
+    CHILD_TRIES = 20
+
+    def __init__(self, params, population_size=16, generations=10, elite=2, tournament_size=3,
+                 crossover_rate=0.9, mutation_rate=None, seed_fraction=0.5, max_evals=None, seed_from=None):
+        self.params = params
+        self.space = ConfigSpace.of(params)
+        self.population_size = population_size
+        self.generations = generations
+        self.elite = elite
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate if mutation_rate is not None else 1.0 / max(1, len(self.space.names))
+        self.seed_fraction = seed_fraction
+        self.max_evals = max_evals
+        self.seed_from = seed_from
+
+        # 搜索状态
+        self.population = None     # 当前一代（配置列表）
+        self.generation = -1       # 当前代数（0 为初始种群）
+        self.fitness = {}          # config_key -> 运行时间
+        self.best_config = None
+        self.best_result = float("inf")
+
+    # ---------------------------------------------------------
+    # 种群操作
+    # ---------------------------------------------------------
+    def _initial_population(self, history):
+        """本次历史与旧实验中最优的配置作为种子，其余随机采样"""
+        population, keys = [], set()
+        ranked = self._ranked_history(history) if history is not None else []
+        ranked += self._ranked_records(self._seed_records())
+        for config in ranked:
+            if len(population) >= int(self.population_size * self.seed_fraction):
+                break
+            if config_key(config) not in keys:
+                population.append(config)
+                keys.add(config_key(config))
+        for config in self.space.sample():
+            if len(population) >= self.population_size:
+                break
+            if config_key(config) not in keys:
+                population.append(config)
+                keys.add(config_key(config))
+        return population
+
+    def _ranked_history(self, history):
+        """历史中未删失、属于本空间的配置，按结果从优到劣排序（其结果直接作为适应度）"""
+        entries = [
+            (result, config) for config, result in history
+            if not history.is_censored(config) and result != float("inf") and self._in_space(config)
+        ]
+        entries.sort(key=lambda e: e[0])
+        for result, config in entries:
+            self.fitness.setdefault(config_key(config), result)
+        if entries and entries[0][0] < self.best_result:
+            self.best_result, self.best_config = entries[0]
+        return [config for _, config in entries]
+
+    def _seed_records(self):
+        """seed_from 实验目录（或其数据库文件）中的记录；未设置时为空"""
+        if not self.seed_from:
+            return []
+        path = self.seed_from
+        if os.path.isdir(path):
+            path = os.path.join(path, "best_config.json")
+        if not any(os.path.exists(p) for p in (path, os.path.splitext(path)[0] + ".jsonl")):
+            raise ValueError(f"No results to seed from: {self.seed_from}")
+        return Database(path).get_records()
+
+    def _ranked_records(self, records):
+        """旧实验中未删失、非低保真度筛选、属于本空间的配置，按结果从优到劣排序（不计入适应度）"""
+        best = {}
+        for rec in records:
+            if rec.get("censored") or rec.get("screening") or rec["time"] == float("inf"):
+                continue
+            config = self.space.coerce(rec["config"])
+            key = config_key(config)
+            if self._in_space(config) and rec["time"] < best.get(key, (float("inf"),))[0]:
+                best[key] = (rec["time"], config)
+        return [config for _, config in sorted(best.values(), key=lambda e: e[0])]
+
+    def _in_space(self, config):
+        try:
+            self.space.positions(config)
+        except KeyError:
+            return False
+        return self.space.is_valid(config)
+
+    def _score(self, config):
+        return self.fitness.get(config_key(config), float("inf"))
+
+    def _tournament(self):
+        contestants = random.sample(self.population, min(self.tournament_size, len(self.population)))
+        return min(contestants, key=self._score)
+
+    def _crossover(self, a, b):
+        """按参数类型交叉：有序维度在两个父代位置之间取值，类别维度任取其一"""
+        child = {}
+        for name in self.space.names:
+            values = self.space[name]
+            if self.space.parameter(name).ordered:
+                i, j = sorted((values.index(a[name]), values.index(b[name])))
+                child[name] = values[random.randint(i, j)]
+            else:
+                child[name] = random.choice((a[name], b[name]))
+        return child
+
+    def _mutate(self, config):
+        """按参数类型变异：有序维度前后移动一到两格，类别维度换成其他任一取值"""
+        child = dict(config)
+        for name in self.space.names:
+            values = self.space[name]
+            if len(values) < 2 or random.random() >= self.mutation_rate:
+                continue
+            position = values.index(child[name])
+            if self.space.parameter(name).ordered:
+                position = min(len(values) - 1, max(0, position + random.choice((-2, -1, 1, 2))))
+            else:
+                position = random.choice([j for j in range(len(values)) if j != position])
+            child[name] = values[position]
+        return child
+
+    def _child(self):
+        """生成一个满足约束的子代；多次失败时随机采样"""
+        for _ in range(self.CHILD_TRIES):
+            a, b = self._tournament(), self._tournament()
+            child = self._crossover(a, b) if random.random() < self.crossover_rate else dict(a)
+            child = self.space.canonical(self._mutate(child))
+            if self.space.is_valid(child):
+                return child
+        return self.space.random_config()
+
+    def _evolve(self):
+        """精英保留 + 锦标赛选择产生下一代；没有新个体时引入随机个体"""
+        ranked = sorted(self.population, key=self._score)
+        population = ranked[:self.elite]
+        keys = {config_key(c) for c in population}
+        attempts = 0
+        while len(population) < self.population_size and attempts < self.population_size * self.CHILD_TRIES:
+            attempts += 1
+            child = self._child()
+            if config_key(child) not in keys:
+                population.append(child)
+                keys.add(config_key(child))
+
+        if all(config_key(c) in self.fitness for c in population):
+            for config in self.space.sample():
+                if config_key(config) not in self.fitness:
+                    population[-1] = config
+                    break
+        return population
+
+    def _generation_complete(self):
+        """当前一代的个体是否都已有结果（评估次数用完时不再等待其余个体）"""
+        return self.population is not None and not self._unevaluated()
+
+    def _unevaluated(self):
+        """当前一代中尚未评估的个体（受 max_evals 限制）"""
+        batch = [c for c in self.population if config_key(c) not in self.fitness]
+        if self.max_evals is not None:
+            batch = batch[:max(0, self.max_evals - len(self.fitness))]
+        return batch
+
+    # ---------------------------------------------------------
+    # 接口函数
+    # ---------------------------------------------------------
+    def next_batch(self, history=None):
+        """
+        产生下一代，返回其中尚未评估的个体（整代作为一个批次并行评估）；
+        当前一代还有个体没有结果时（从一代中途的快照恢复），先重新返回这些个体，整代评估完才进化
+        """
+        if self.population is None:
+            self.population = self._initial_population(history)
+            self.generation += 1
+        elif self._generation_complete():
+            self.population = self._evolve()
+            self.generation += 1
+        return self._unevaluated()
+
+    def update(self, config, result, censored=False):
+        """
+        记录个体适应度；删失结果是下界（真实时间更慢），按下界参与选择，
+        不参与全局最优比较
+        """
+        self.fitness[config_key(config)] = result
+        if not censored and result < self.best_result:
+            self.best_result = result
+            self.best_config = config
+
+    def stop(self):
+        """达到代数上限（且最后一代已评估完），或评估次数达到 max_evals"""
+        if self.max_evals is not None and len(self.fitness) >= self.max_evals:
+            return True
+        if self.population is not None and not self._generation_complete():
+            return False
+        return self.generation >= self.generations - 1
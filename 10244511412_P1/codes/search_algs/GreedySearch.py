@@ -1,5 +1,6 @@
 import random
-import itertools
+from codes.utils.History import History, config_key
+from codes.utils.ConfigSpace import ConfigSpace
 
 
 class GreedySearch:
@@ -8,30 +9,49 @@ class GreedySearch:
     ------------------------------------------------
     算法思想：
         1. 从一个随机初始配置开始；
-        2. 在邻域中搜索更优配置；
-        3. 如果找到更优结果，则更新当前配置；
-        4. 否则认为收敛，停止搜索。
+        2. 在邻域中搜索更优配置（当前配置的未测邻居在异步模式下同时提议、并行评估）：
+           first（默认）：任一邻居优于当前最优时立即移动（首次改进）；
+           steepest（option.strategy = steepest）：邻域全部有结果后移动到其中最优者；
+        3. 邻域中没有更优配置时到达局部最优，默认即停止；
+        4. 开启 restarts（option.restarts = true）时从新的起点重新下降
+           （diversity：在若干随机候选中选离已到达的局部最优最远者；random：随机起点），
+           直到评估预算 max_iters 用完，最终返回所有重启中的最优配置。
 
     支持的接口：
-        - next_config(history): 根据当前结果选择下一个配置
+        - next_config(history, pending): 根据当前结果选择下一个配置
+          （history 为 History 索引，可为 None；pending 为在途配置，不会重复提议；
+          返回 None 表示需要等待在途结果）
         - update(config, result): 根据结果更新状态
         - stop(): 判断是否结束
     """
 
-    def __init__(self, params, max_iters=20):
+    RESTART_CANDIDATES = 16
+
+    def __init__(self, params, max_iters=20, strategy="first", restarts=False, restart_mode="diversity"):
         """
         初始化搜索算法
         params: 参数空间（字典）
         例如: {"optimize_level": ["O0", "O1", "O2", "O3"], "block_size": ["8", "16", "32", "64", "128"]}
+        max_iters: 评估预算（提议的配置总数，含所有重启）
         """
+        if strategy not in ("steepest", "first"):
+            raise ValueError(f"Unsupported greedy strategy: {strategy}")
+        if restart_mode not in ("diversity", "random"):
+            raise ValueError(f"Unsupported restart mode: {restart_mode}")
         self.params = params
+        self.space = ConfigSpace.of(params)
         self.param_names = list(params.keys())
         self.param_values = [params[k] for k in self.param_names]
         self.max_iters = max_iters
+        self.strategy = strategy
+        self.restarts = restarts
+        self.restart_mode = restart_mode
 
         # 搜索状态
-        self.history = {}              # config -> result
+        self.history = History(self.space)  # 本算法自身测过的配置
         self.current_config = self._random_config()  # 当前配置
+        self.started = False                # 当前起点是否已提议
+        self.local_optima = []              # 已到达的局部最优（用于多样性重启）
         self.best_config = None
         self.best_result = float("inf")
         self.iter_count = 0
@@ -41,65 +61,106 @@ class GreedySearch:
     # 工具函数
     # ---------------------------------------------------------
     def _random_config(self):
-        """随机生成一个初始配置"""
-        return {k: random.choice(vs) for k, vs in self.params.items()}
-
-    def _get_neighbors(self, config):
-        """生成邻域配置：每次修改一个参数，前后相邻一格"""
-        neighbors = []
-        for k in self.param_names:
-            values = self.params[k]
-            idx = values.index(config[k])
-            # 左右邻居
-            if idx > 0:
-                new_cfg = dict(config)
-                new_cfg[k] = values[idx - 1]
-                neighbors.append(new_cfg)
-            if idx < len(values) - 1:
-                new_cfg = dict(config)
-                new_cfg[k] = values[idx + 1]
-                neighbors.append(new_cfg)
-        return neighbors
+        """随机生成一个满足约束的初始配置"""
+        return self.space.random_config()
+
+    def _result(self, config, history):
+        """配置的已知结果（本算法的结果优先，其次共享历史）；删失或未知时为 inf"""
+        for source in (self.history, history):
+            if source is not None and config in source:
+                return float("inf") if source.is_censored(config) else source.get(config)
+        return float("inf")
+
+    def _distance(self, a, b):
+        """有序参数按位置差归一化，类别参数按是否相同"""
+        total = 0.0
+        for name, pa, pb, radix in zip(self.space.names, self.space.positions(a), self.space.positions(b),
+                                       self.space.radices):
+            if self.space.parameter(name).ordered:
+                total += abs(pa - pb) / max(1, radix - 1)
+            else:
+                total += pa != pb
+        return total
+
+    def _restart_point(self, history, pending):
+        """新的起点：diversity 模式在随机候选中选离已知局部最优最远者；没有未测配置时返回 None"""
+        candidates = []
+        for config in self.space.sample():
+            if config in self.history or (history is not None and config in history) \
+                    or config_key(config) in pending:
+                continue
+            candidates.append(config)
+            if self.restart_mode == "random" or len(candidates) >= self.RESTART_CANDIDATES:
+                break
+        if not candidates:
+            return None
+        if self.restart_mode == "random" or not self.local_optima:
+            return candidates[0]
+        return max(candidates, key=lambda c: min(self._distance(c, o) for o in self.local_optima))
+
+    def _propose(self, config):
+        self.iter_count += 1
+        return config
 
     # ---------------------------------------------------------
     # 接口函数
     # ---------------------------------------------------------
-    def next_config(self, history):
+    def next_config(self, history, pending=None):
         """
         根据已有历史结果选择下一个待测配置
+        ------------------------------------------------
+        异步模式下当前配置的多个邻居同时在途；邻居都已提议但结果未返回时返回 None，
+        等结果返回后再决定移动、重启或结束。
         """
-        self.iter_count += 1
-        if self.iter_count == 1:
-            # 第一次返回初始配置
-            return self.current_config
-
-        # 生成邻域
-        neighbors = self._get_neighbors(self.current_config)
-        # 过滤掉已经测试过的配置
-        neighbors = [n for n in neighbors if str(n) not in history]
-
-        if not neighbors:
-            self.converged = True
-            return self.current_config
-
-        # 按照随机顺序选择下一个候选点（也可扩展为启发式选择）
-        return random.choice(neighbors)
+        pending = pending or {}
+        while self.iter_count < self.max_iters and not self.converged:
+            if not self.started:
+                # 起点（初始或重启）
+                self.started = True
+                if self.current_config not in self.history and config_key(self.current_config) not in pending:
+                    return self._propose(self.current_config)
+
+            # 生成邻域并过滤掉已经测试过或正在测试的配置（包括其他来源写入共享历史的结果）
+            neighbors = self.history.untested_neighbours(self.current_config)
+            if history is not None:
+                neighbors = [n for n in neighbors if n not in history]
+            neighbors = [n for n in neighbors if config_key(n) not in pending]
+            if neighbors:
+                # 按照随机顺序选择下一个候选点
+                return self._propose(random.choice(neighbors))
+            if pending:
+                return None  # 邻域已全部提议，等待结果
+
+            # 邻域全部有结果：最速下降移动到最优邻居，否则到达局部最优
+            current = self._result(self.current_config, history)
+            best = min(self.space.neighbours(self.current_config), key=lambda c: self._result(c, history),
+                       default=None)
+            if best is not None and self._result(best, history) < current:
+                self.current_config = best
+                continue
+
+            self.local_optima.append(self.current_config)
+            restart = self._restart_point(history, pending) if self.restarts else None
+            if restart is None:
+                self.converged = True
+                return None
+            self.current_config, self.started = restart, False
+        return None
 
-    def update(self, config, result):
-        """更新算法内部状态"""
-        self.history[str(config)] = result
+    def update(self, config, result, censored=False):
+        """
+        更新算法内部状态
+        censored=True 表示该运行超过竞速上限被终止，result 只是下界：
+        真实时间一定劣于当前最优，因此不会移动到该点。
+        """
+        self.history.add(config, result, censored=censored)
 
-        if result < self.best_result:
+        if not censored and result < self.best_result:
             self.best_result = result
             self.best_config = config
-            self.current_config = config  # 移动到更优点
-        else:
-            # 如果连续几次没有改进，可以认为收敛
-            if self.iter_count > self.max_iters:
-                self.converged = True
+            if self.strategy == "first":
+                self.current_config = config  # 首次改进：立即移动到更优点
 
     def stop(self):
-        """判断是否停止搜索"""
+        """判断是否停止搜索（评估预算用完，或关闭重启时到达局部最优）"""
         return self.converged or self.iter_count >= self.max_iters
-
-
@@ -1,33 +1,102 @@
 # GridSearch.py
-# 实现穷举搜索（网格搜索）算法
+# 实现穷举搜索（网格搜索）算法，可选代理模型预筛选
 
-import itertools
+import math
+import random
+from codes.utils.ConfigSpace import ConfigSpace
+from codes.utils.History import config_key
+from codes.utils.Surrogate import Surrogate
 
 class GridSearch:
-    def __init__(self, params):
+    def __init__(self, params, prescreen=False, prescreen_samples=None, prescreen_z=2.0):
         """
         初始化参数空间。
-        params: dict, 形如 {"optimize_level": ["O0", "O1"], "block_size": ["8", "16", "32"]}
+        params: dict 或 ConfigSpace, 形如 {"optimize_level": ["O0", "O1"], "block_size": ["8", "16", "32"]}
+
+        预筛选（option.prescreen = true）：
+            1. 先评估 prescreen_samples 个空间填充样本（每个参数的各取值轮流出现）；
+            2. 用岭回归代理模型（Surrogate，one-hot 特征）拟合 log 时间，结果增加时重新拟合；
+            3. 按网格顺序继续遍历，预测下界 exp(均值 - prescreen_z·标准差) 仍慢于当前最优的配置直接跳过，
+               跳过的配置及其预测值记录在 pruned 中（Autotuner 逐条写入日志并汇总节省的时间）。
+            配置被 Autotuner 惰性拉取时（有空闲 worker 才取下一个）筛选才能用上最新结果；
+            设置了 batch_param 时整个空间会先被分组，预筛选基本不起作用。
         """
         self.params = params
+        self.space = ConfigSpace.of(params)
         self.best_config = None
         self.best_result = float("inf")
 
+        self.prescreen = prescreen
+        self.prescreen_samples = prescreen_samples or max(8, 2 * max(self.space.radices))
+        self.prescreen_z = prescreen_z
+        self.results = []   # (config, result)，供代理模型拟合
+        self.pruned = []    # (config, 预测时间, 预测下界, 当时的最优)
+
     def all_configs(self):
         """
-        生成所有可能的参数组合。
-        使用 itertools.product() 对参数空间进行笛卡尔积组合。
+        生成所有满足约束的参数组合。
+        按笛卡尔积顺序惰性遍历，违反约束的配置直接跳过；开启预筛选时先产生空间填充样本。
         """
-        keys = list(self.params.keys())
-        values = list(self.params.values())
-        for combination in itertools.product(*values):
-            config = dict(zip(keys, combination))
-            yield config  # 返回一个生成器，逐个配置供 Autotuner 并行执行
+        if not self.prescreen:
+            yield from self.space.configs()  # 返回一个生成器，逐个配置供 Autotuner 并行执行
+            return
+
+        self.pruned = []  # 恢复实验时从头遍历，重新判定
+        sampled = set()
+        for config in self._space_filling_sample():
+            sampled.add(config_key(config))
+            yield config
+
+        model, fitted_on = Surrogate(self.space), 0
+        min_results = len(self.space.names) + 2
+        for config in self.space.configs():
+            if config_key(config) in sampled:
+                continue
+            if len(self.results) >= min_results and self.best_result < float("inf"):
+                if fitted_on != len(self.results):
+                    fitted_on = len(self.results) if model.fit(*zip(*self.results)) else 0
+                if fitted_on:
+                    mean, std = model.predict(config)
+                    lower = math.exp(mean - self.prescreen_z * std)
+                    if lower > self.best_result:
+                        self.pruned.append((config, math.exp(mean), lower, self.best_result))
+                        continue
+            yield config
+
+    def _space_filling_sample(self):
+        """每个参数的取值按随机排列轮流出现的样本（网格上的拉丁超立方），违反约束时换成随机有效配置"""
+        count = min(self.prescreen_samples, self.space.size)
+        columns = []
+        for radix in self.space.radices:
+            column = []
+            while len(column) < count:
+                column.extend(random.sample(range(radix), radix))
+            columns.append(column[:count])
+
+        configs, keys = [], set()
+        for positions in zip(*columns):
+            config = self.space.canonical(self.space.from_positions(positions))
+            if not self.space.is_valid(config) or config_key(config) in keys:
+                config = next((c for c in self.space.sample() if config_key(c) not in keys), None)
+                if config is None:
+                    break
+            keys.add(config_key(config))
+            configs.append(config)
+        return configs
+
+    def __len__(self):
+        """有效配置总数（用于进度与 ETA；开启预筛选时为上限）"""
+        return self.space.count_valid()
 
-    def update(self, config, result):
+    def update(self, config, result, censored=False):
         """
         每次测试结束后由 Autotuner 调用，用于更新全局最优结果。
+        censored=True 表示该运行因超过竞速上限被终止，result 为下界。
         """
+        # 删失结果是下界：作为样本会让模型偏乐观，只会少剪枝，不会误剪
+        self.results.append((config, result))
+        if censored:
+            return  # 被竞速终止的结果只是下界，不可能成为最优
         if result < self.best_result:
             self.best_result = result
             self.best_config = config
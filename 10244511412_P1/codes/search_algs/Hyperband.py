@@ -0,0 +1,144 @@
+import math
+from codes.utils.ConfigSpace import ConfigSpace
+
+
+class Hyperband:
+    """
+    Hyperband / Successive Halving 多保真度搜索算法
+    ------------------------------------------------
+    算法思想：
+        1. 引入“保真度”维度（如矩阵规模 n）：小规模运行便宜但只能粗略反映优劣；
+        2. 每个 bracket 先在低保真度上评估大量随机配置，
+           只把前 1/eta 晋级到更高保真度，直到最高保真度（完整问题规模）；
+        3. Hyperband 依次运行从激进（起点保真度最低）到保守的多个 bracket，
+           brackets=1 时退化为单个 Successive Halving。
+
+    保真度参数需要在 input.txt 中绑定到编译宏或命令行参数，例如：
+        search_algorithm = Hyperband
+        bind.n = define
+        option.fidelity_param = n
+        option.fidelities = 1024, 2048, 4096
+
+    支持的接口（批量动态算法）：
+        - next_batch(history): 返回下一组可并行评估的配置（同一 rung）
+        - update(config, result, censored): 根据结果更新状态
+        - stop(): 判断是否结束
+        - record_tags(config): 低保真度结果在数据库中标记为 screening
+    """
+
+    def __init__(self, params, fidelity_param="n", fidelities=None, min_fidelity=512,
+                 max_fidelity=4096, eta=3, brackets=None):
+        self.params = params
+        self.space = ConfigSpace.of(params)
+        self.fidelity_param = fidelity_param
+        self.eta = eta
+
+        # 保真度阶梯：未显式给出时按 eta 倍数从 min_fidelity 增长到 max_fidelity
+        if fidelities is None:
+            fidelities = []
+            f = min_fidelity
+            while f < max_fidelity:
+                fidelities.append(int(f))
+                f *= eta
+            fidelities.append(max_fidelity)
+        elif not isinstance(fidelities, list):
+            fidelities = [fidelities]
+        self.fidelities = sorted(fidelities)
+        self.max_fidelity = self.fidelities[-1]
+
+        self.s_max = len(self.fidelities) - 1
+        self.last_bracket = 0 if brackets is None else max(0, self.s_max - brackets + 1)
+
+        # 搜索状态
+        self.bracket = self.s_max      # 当前 bracket（s 越大起点保真度越低）
+        self.rung = 0                  # 当前 bracket 内的晋级轮次
+        self.candidates = []           # 当前 rung 的候选配置（不含保真度参数）
+        self.results = {}              # 当前 rung 的结果
+        self.finished = False
+
+        self.best_config = None
+        self.best_result = float("inf")
+
+    # ---------------------------------------------------------
+    # 工具函数
+    # ---------------------------------------------------------
+    def _key(self, config):
+        return tuple(sorted((k, v) for k, v in config.items() if k != self.fidelity_param))
+
+    def _sample(self, count):
+        """
+        不放回地随机采样 count 个配置（不含保真度参数），
+        只保留在每个保真度下都满足约束的配置
+        """
+        base = ConfigSpace({k: vs for k, vs in self.space.items() if k != self.fidelity_param})
+        configs = []
+        for config in base.sample():
+            if all(self.space.is_valid(dict(config, **{self.fidelity_param: f})) for f in self.fidelities):
+                configs.append(config)
+                if len(configs) >= count:
+                    break
+        return configs
+
+    def _fidelity(self):
+        """当前 bracket / rung 对应的保真度"""
+        return self.fidelities[self.s_max - self.bracket + self.rung]
+
+    def _promote(self):
+        """当前 rung 全部完成：保留前 1/eta 晋级，或进入下一个 bracket"""
+        if self._fidelity() == self.max_fidelity:
+            self.bracket -= 1
+            self.rung = 0
+            self.candidates = []
+            if self.bracket < self.last_bracket:
+                self.finished = True
+        else:
+            keep = max(1, len(self.candidates) // self.eta)
+            ranked = sorted(self.candidates, key=lambda c: self.results[self._key(c)])
+            self.candidates = ranked[:keep]
+            self.rung += 1
+        self.results = {}
+
+    # ---------------------------------------------------------
+    # 接口函数
+    # ---------------------------------------------------------
+    def next_batch(self, history=None):
+        """返回当前 rung 的全部待测配置（附带保真度参数）"""
+        if self.finished:
+            return []
+        if not self.candidates:
+            # 新 bracket：n = ceil((s_max + 1) / (s + 1) * eta^s)
+            s = self.bracket
+            n = math.ceil((self.s_max + 1) / (s + 1) * self.eta ** s)
+            self.candidates = self._sample(n)
+
+        fidelity = self._fidelity()
+        return [dict(c, **{self.fidelity_param: fidelity}) for c in self.candidates
+                if self._key(c) not in self.results]
+
+    def update(self, config, result, censored=False):
+        """
+        记录结果；当前 rung 全部完成后执行晋级。
+        censored=True 的结果是下界，排序时按下界处理（一定排在较后）。
+        只有最高保真度的结果参与全局最优比较。
+        """
+        self.results[self._key(config)] = result
+
+        if (not censored and config.get(self.fidelity_param) == self.max_fidelity
+                and result < self.best_result):
+            self.best_result = result
+            self.best_config = config
+
+        if all(self._key(c) in self.results for c in self.candidates):
+            self._promote()
+
+    def stop(self):
+        """所有 bracket 完成后停止"""
+        return self.finished
+
+    def record_tags(self, config):
+        """低保真度结果只用于筛选，不参与数据库中的最优记录"""
+        fidelity = config.get(self.fidelity_param)
+        tags = {"fidelity": fidelity}
+        if fidelity != self.max_fidelity:
+            tags["screening"] = True
+        return tags
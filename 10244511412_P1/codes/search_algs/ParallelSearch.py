@@ -1,13 +1,16 @@
 import os
+import math
 import time
 import json
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from codes.runners.C_runner import CRunner
 from codes.utils.Database import Database
+from codes.utils.History import History, config_key
 from codes.utils.Logger import Logger
 
 
-def run_single_algorithm(alg_name, params, target_program, exp_dir):
+def run_single_algorithm(alg_name, params, target_program, exp_dir, policy=None, spec=None, result_cache=None,
+                         options=None):
     """
     子算法运行函数（用于子进程中执行）
     ------------------------------------------------
@@ -16,75 +19,288 @@ def run_single_algorithm(alg_name, params, target_program, exp_dir):
         params: 参数空间字典
         target_program: 目标程序文件
         exp_dir: 当前实验主目录
+        policy: MeasurementPolicy 重复测量策略（可选）
+        spec: BuildSpec 编译 / 运行模板（可选）
+        result_cache: ResultCache 跨实验结果缓存（可选，命中时不再测量）
+        options: 子算法构造参数（可选）
     输出：
         (算法名, 最优配置, 最优时间)
     """
     # ✅ 延迟导入，避免循环依赖
     from codes.search_algs.allAlgs import get_search_algorithm
 
-    algo = get_search_algorithm(alg_name, params)
+    algo = get_search_algorithm(alg_name, params, options)
     db_path = os.path.join(exp_dir, f"{alg_name}_subresult.json")
     db = Database(db_path)
     logger = Logger(f"{alg_name}", log_dir=exp_dir)
 
+    runner = CRunner(target_program, spec=spec, policy=policy)
     logger.log(f"Starting sub-algorithm {alg_name}...")
 
     start = time.time()
 
+    def measure(config):
+        """先查结果缓存，未命中时实际测量并写回缓存"""
+        measurement = result_cache.lookup(config) if result_cache else None
+        if measurement is None:
+            measurement = runner.measure(config, runner.policy.limit(algo.best_result))
+            if result_cache:
+                result_cache.store(config, measurement)
+        return measurement
+
     if hasattr(algo, "all_configs"):
         # 静态算法
         for config in algo.all_configs():
-            result = CRunner(target_program).run(config)
-            algo.update(config, result)
-            db.save(config, result)
-            logger.log(f"{alg_name}: {config} -> {result:.6f}s")
+            measurement = measure(config)
+            result = measurement["time"]
+            algo.update(config, result, censored=measurement["censored"])
+            db.save(config, result, {"samples": measurement["samples"], "stats": measurement["stats"],
+                                     "rusage": measurement["rusage"], "censored": measurement["censored"],
+                                     "cached": measurement.get("cached", False)})
+            logger.log(f"{alg_name}: {config} -> {result:.6f}s", config=config, time=result,
+                       censored=measurement["censored"])
 
     elif hasattr(algo, "next_config") and hasattr(algo, "stop"):
         # 动态算法
+        history = History(params)
         while not algo.stop():
-            config = algo.next_config(db.get_all())
-            result = CRunner(target_program).run(config)
-            algo.update(config, result)
-            db.save(config, result)
-            logger.log(f"{alg_name}: {config} -> {result:.6f}s")
+            config = algo.next_config(history)
+            if config is None:
+                break  # 顺序执行时没有在途配置，算法无法再提议
+            measurement = measure(config)
+            result = measurement["time"]
+            history.add(config, result, censored=measurement["censored"])
+            algo.update(config, result, censored=measurement["censored"])
+            db.save(config, result, {"samples": measurement["samples"], "stats": measurement["stats"],
+                                     "rusage": measurement["rusage"], "censored": measurement["censored"],
+                                     "cached": measurement.get("cached", False)})
+            logger.log(f"{alg_name}: {config} -> {result:.6f}s", config=config, time=result,
+                       censored=measurement["censored"])
 
     best_config, best_time = algo.best_config, algo.best_result
     total = time.time() - start
+    db.export()
 
+    if result_cache:
+        logger.log(f"{alg_name} result cache: {result_cache.describe()}")
     logger.log(f"{alg_name} finished. Best: {best_config} -> {best_time:.6f}s, Total: {total:.2f}s")
     return alg_name, best_config, best_time, total
 
 
 class ParallelSearch:
     """
-    ParallelSearch 类
+    ParallelSearch 组合搜索（portfolio）
     ------------------------------------------------
-    用于同时运行多个搜索算法（如 GridSearch、RandomSearch、GreedySearch），
-    自动选出最优结果。
+    由 Autotuner 驱动（异步 ask / tell，支持 next_config / update / stop 接口）：
+        1. 多个子算法（默认 GridSearch、RandomSearch、GreedySearch）共享 Autotuner 的 History
+           与结果缓存：子算法提议已评估的配置时直接把已知结果交给它，不重复测量；
+           提议的配置正由其他子算法测量时等待同一个结果，结果返回后分发给所有提议者；
+        2. 共享同一个最优解：竞速上限按全局最优计算，子算法之间互相受益；
+        3. 预算（max_evals 次实际提议）按多臂老虎机（UCB1）分配：
+           每次测量的收益为是否刷新全局最优，取最近 window 次的平均收益加探索项
+           exploration · sqrt(2 ln N / n)，改进最快的子算法获得更多 worker；
+           子算法结束或需要等待自身结果时把机会让给其他子算法。
+        4. 子算法参数通过 option.<子算法>.<参数> = 值 传入，例如 option.GreedySearch.max_iters = 20。
+
+    run_all() 保留原有的独立模式：每个子算法在单独进程中运行，互不通信，各自写 *_subresult.json。
     """
 
-    def __init__(self, params, sub_algorithms=None, exp_dir=None, max_workers=3):
+    FREE_STEPS = 200   # 单次 next_config 中最多处理的不需测量的提议（已知结果 / 等待他人测量）
+
+    def __init__(self, params, sub_algorithms=None, exp_dir=None, max_workers=3, max_evals=60,
+                 exploration=0.5, window=10, **sub_options):
         self.params = params
         self.exp_dir = exp_dir if exp_dir else "results/ParallelSearch"
-        os.makedirs(self.exp_dir, exist_ok=True)
         self.max_workers = max_workers
 
+        if isinstance(sub_algorithms, str):
+            sub_algorithms = [sub_algorithms]
         self.sub_algorithms = sub_algorithms or ["GridSearch", "RandomSearch", "GreedySearch"]
+        self.sub_options = {name: {} for name in self.sub_algorithms}
+        for key, value in sub_options.items():
+            name, _, option = key.partition(".")
+            if not option or name not in self.sub_options:
+                raise ValueError(f"Unsupported ParallelSearch option: {key}")
+            self.sub_options[name][option] = value
 
         self.best_config = None
         self.best_result = float("inf")
+        self.logger = None
 
-        self.logger = Logger("ParallelSearch", log_dir=self.exp_dir)
+        # 组合搜索状态
+        self.max_evals = max_evals
+        self.exploration = exploration
+        self.window = window
+        self.members = [self._member(name) for name in self.sub_algorithms]
+        self.owners = {}          # config_key -> 等待该结果的子算法编号（第一个为实际提议者）
+        self.proposed = 0         # 实际提议（需要测量）的配置数
+        self.best_member = None
+
+    # ---------------------------------------------------------
+    # 子算法管理
+    # ---------------------------------------------------------
+    def _member(self, name):
+        # ✅ 延迟导入，避免循环依赖
+        from codes.search_algs.allAlgs import get_search_algorithm
+
+        algo = get_search_algorithm(name, self.params, self.sub_options[name])
+        if hasattr(algo, "custom_run"):
+            raise ValueError(f"{name} cannot run inside a ParallelSearch portfolio")
+        if hasattr(algo, "next_batch"):
+            kind = "batch"
+        elif hasattr(algo, "next_config"):
+            kind = "dynamic"
+        else:
+            kind = "static"
+        return {
+            "name": name, "algorithm": algo, "kind": kind, "done": False,
+            "pending": {},        # 本子算法在途的配置（只把自己的在途配置传给 next_config）
+            "buffer": [],         # 批量算法尚未提议的配置
+            "iterator": None,     # 静态算法的配置生成器（不随检查点保存）
+            "consumed": 0,        # 静态算法已取出的配置数（恢复时据此跳过）
+            "proposed": 0, "shared": 0, "improvements": 0, "rewards": [],
+        }
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["members"] = [dict(m, iterator=None) for m in self.members]
+        state["logger"] = None
+        return state
+
+    def _ask(self, member, history):
+        """向子算法索取一个配置；需要等待或已结束时返回 None"""
+        algo = member["algorithm"]
+        if member["kind"] == "static":
+            if member["iterator"] is None:
+                member["iterator"] = iter(algo.all_configs())
+                for _ in range(member["consumed"]):
+                    next(member["iterator"], None)
+            config = next(member["iterator"], None)
+            if config is None:
+                member["done"] = True
+            else:
+                member["consumed"] += 1
+            return config
+
+        if algo.stop():
+            member["done"] = True
+            return None
+        if member["kind"] == "dynamic":
+            return algo.next_config(history, pending=member["pending"])
+        if not member["buffer"]:
+            if member["pending"]:
+                return None  # 批量算法在上一批全部有结果后才能产生下一批
+            member["buffer"] = list(algo.next_batch(history))
+            if not member["buffer"]:
+                return None
+        return member["buffer"].pop(0)
+
+    def _tell(self, member, config, result, censored):
+        member["pending"].pop(config_key(config), None)
+        member["algorithm"].update(config, result, censored=censored)
 
-    def run_all(self, target_program):
+    def _score(self, member):
+        """UCB1：最近 window 次测量刷新全局最优的比例 + 探索项（未测量过的子算法优先）"""
+        if member["proposed"] == 0:
+            return float("inf")
+        rewards = member["rewards"]
+        mean = sum(rewards) / len(rewards) if rewards else 1.0
+        return mean + self.exploration * math.sqrt(2 * math.log(max(1, self.proposed)) / member["proposed"])
+
+    # ---------------------------------------------------------
+    # 接口函数（被 Autotuner 调用）
+    # ---------------------------------------------------------
+    def next_config(self, history=None, pending=None):
+        """
+        按 UCB 分数选择子算法并返回它提议的配置
+        ------------------------------------------------
+        已评估的配置直接把结果交给子算法，正在测量的配置登记为等待，二者都不占用预算；
+        所有子算法都在等待或已结束时返回 None。
+        """
+        pending = pending or {}
+        blocked = set()
+        for _ in range(self.FREE_STEPS):
+            if self.proposed >= self.max_evals:
+                return None
+            active = [i for i, m in enumerate(self.members) if not m["done"] and i not in blocked]
+            if not active:
+                return None
+            index = max(active, key=lambda i: self._score(self.members[i]))
+            member = self.members[index]
+            config = self._ask(member, history)
+            if config is None:
+                blocked.add(index)
+                continue
+
+            key = config_key(config)
+            if key in self.owners or key in pending:
+                member["pending"][key] = config
+                self.owners.setdefault(key, []).append(index)  # 其他子算法正在测量：等待同一个结果
+                continue
+            if history is not None and config in history:
+                member["shared"] += 1
+                self._tell(member, config, history.get(config), history.is_censored(config))
+                continue
+
+            member["pending"][key] = config
+            member["proposed"] += 1
+            self.owners[key] = [index]
+            self.proposed += 1
+            return config
+        return None
+
+    def update(self, config, result, censored=False):
+        """
+        把结果分发给所有提议过该配置的子算法；实际提议者获得收益（是否刷新全局最优）
+        """
+        improved = not censored and result < self.best_result
+        owners = self.owners.pop(config_key(config), [])
+        for position, index in enumerate(owners):
+            member = self.members[index]
+            self._tell(member, config, result, censored)
+            if position == 0:
+                member["rewards"] = (member["rewards"] + [1.0 if improved else 0.0])[-self.window:]
+                member["improvements"] += improved
+            else:
+                member["shared"] += 1
+
+        if improved:
+            self.best_result = result
+            self.best_config = config
+            self.best_member = self.members[owners[0]]["name"] if owners else None
+
+    def stop(self):
+        """预算用完，或所有子算法都已结束"""
+        return self.proposed >= self.max_evals or all(m["done"] for m in self.members)
+
+    def record_tags(self, config):
+        """数据库记录中标注提议该配置的子算法"""
+        owners = self.owners.get(config_key(config))
+        return {"algorithm": self.members[owners[0]]["name"]} if owners else None
+
+    def summary(self):
+        """各子算法的测量数、共享结果数与刷新最优的次数"""
+        members = ", ".join(
+            f"{m['name']}: {m['proposed']} measured, {m['shared']} shared, {m['improvements']} improvements"
+            for m in self.members
+        )
+        return f"Portfolio: {members}; best found by {self.best_member}"
+
+    def run_all(self, target_program, policy=None, spec=None, result_cache=None):
+        """独立模式：每个子算法在单独进程中完整运行，最后取最优"""
+        os.makedirs(self.exp_dir, exist_ok=True)
+        self.logger = Logger("ParallelSearch", log_dir=self.exp_dir)
         self.logger.log(f"Launching parallel execution for: {', '.join(self.sub_algorithms)}")
 
         start_global = time.time()
         results = []
 
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+        # 子算法的日志经队列交给本进程的单一写者，避免各子进程以 "w" 模式截断同一个 log.txt
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=Logger.init_worker,
+                                 initargs=(self.logger.queue,)) as executor:
             tasks = [
-                executor.submit(run_single_algorithm, alg, self.params, target_program, self.exp_dir)
+                executor.submit(run_single_algorithm, alg, self.params, target_program, self.exp_dir, policy, spec,
+                                result_cache, self.sub_options[alg])
                 for alg in self.sub_algorithms
             ]
 
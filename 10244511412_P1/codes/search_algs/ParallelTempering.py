@@ -0,0 +1,185 @@
+import math
+import random
+from codes.utils.History import config_key
+from codes.utils.ConfigSpace import ConfigSpace
+from codes.search_algs.SimulatedAnnealing import SimulatedAnnealing
+
+
+class ParallelTempering:
+    """
+    ParallelTempering 并行回火（副本交换模拟退火）
+    ------------------------------------------------
+    算法思想：
+        1. 同时维护 chains 条模拟退火链，温度按几何级数分布在 t_min（最冷）到 t_max（最热）之间，
+           温度为归一化温度，能量为 log(运行时间)，接受准则与 SimulatedAnnealing 相同；
+        2. 每条链同一时间最多一个评估在途：异步模式下 workers >= chains 时每条链各占一个 worker，
+           结果返回后该链立即走下一步，不等待其他链；
+        3. 每收到 swap_interval 个结果，相邻温度的链按 min(1, exp((1/Ti - 1/Tj)(Ei - Ej))) 提议交换状态
+           （奇偶相邻对交替），热链发现的好区域因此逐步交给冷链精细搜索；
+        4. 所有链共享评估记录（本算法收到的结果 + Autotuner 的 History）：
+           提议已评估过的配置时直接用已知结果走一步，不重复测量；
+           提议的配置正由其他链测量时等待同一个结果；
+           连续 MEMO_STEPS 步都落在已评估配置上时跳到一个未评估的随机配置。
+
+    支持的接口：
+        - next_config(history, pending): 为空闲的链提议下一个配置；没有空闲链时返回 None
+        - update(config, result, censored): 记录结果并推进等待该配置的链，定期提议交换
+        - stop(): 提议数达到 max_iter，或空间已全部评估
+    """
+
+    NEIGHBOUR_TRIES = 20
+    MEMO_STEPS = 50
+
+    def __init__(self, params, chains=4, t_min=0.01, t_max=1.0, swap_interval=None, max_iter=100):
+        if chains < 1:
+            raise ValueError("ParallelTempering needs at least one chain")
+        self.params = params
+        self.space = ConfigSpace.of(params)
+        self.max_iter = max_iter
+        self.swap_interval = swap_interval or chains
+
+        # 温度阶梯：chains[0] 最冷，chains[-1] 最热
+        ratio = (t_max / t_min) ** (1.0 / (chains - 1)) if chains > 1 else 1.0
+        self.chains = [
+            {"config": self.space.random_config(), "energy": None, "temp": t_min * ratio ** i, "steps": 0}
+            for i in range(chains)
+        ]
+
+        # 搜索状态
+        self.memo = {}        # config_key -> 运行时间（删失时为下界）
+        self.waiting = {}     # config_key -> 等待该结果的链编号列表
+        self.busy = set()     # 有评估在途的链
+        self.best_config = None
+        self.best_result = float("inf")
+        self.proposed = 0     # 已提议的配置数（含在途）
+        self.iter_count = 0   # 已收到的结果数
+        self.exhausted = False
+        self.swaps_proposed = 0
+        self.swaps_accepted = 0
+        self.swap_parity = 0
+
+    # ---------------------------------------------------------
+    # 辅助函数
+    # ---------------------------------------------------------
+    def _known(self, config, history):
+        """共享评估记录中的结果；未评估时返回 None"""
+        key = config_key(config)
+        if key in self.memo:
+            return self.memo[key]
+        if history is not None and config in history:
+            return history.get(config)
+        return None
+
+    def _neighbour(self, config):
+        """随机相邻配置（有序参数前后一格，类别参数换成其他取值）"""
+        neighbours = self.space.neighbours(config)
+        return random.choice(neighbours) if neighbours else self.space.random_config()
+
+    def _unexplored(self, history, pending):
+        """一个未评估、未在途的随机配置；空间已全部评估时返回 None"""
+        for config in self.space.sample():
+            key = config_key(config)
+            if key not in pending and key not in self.waiting and self._known(config, history) is None:
+                return config
+        return None
+
+    def _step(self, index, config, result):
+        """链 index 对候选 config（结果 result）执行一步 Metropolis"""
+        chain = self.chains[index]
+        chain["steps"] += 1
+        if chain["energy"] is None or config_key(config) == config_key(chain["config"]):
+            chain["config"], chain["energy"] = config, result
+        elif random.random() < SimulatedAnnealing.acceptance(chain["energy"], result, chain["temp"]):
+            chain["config"], chain["energy"] = config, result
+
+    def _swap(self):
+        """相邻温度的链提议交换状态（奇偶相邻对交替）"""
+        for i in range(self.swap_parity, len(self.chains) - 1, 2):
+            cold, hot = self.chains[i], self.chains[i + 1]
+            if cold["energy"] is None or hot["energy"] is None:
+                continue
+            self.swaps_proposed += 1
+            exponent = (1.0 / cold["temp"] - 1.0 / hot["temp"]) * (_log(cold["energy"]) - _log(hot["energy"]))
+            if exponent >= 0 or random.random() < math.exp(exponent):
+                self.swaps_accepted += 1
+                cold["config"], hot["config"] = hot["config"], cold["config"]
+                cold["energy"], hot["energy"] = hot["energy"], cold["energy"]
+        self.swap_parity = 1 - self.swap_parity
+
+    # ---------------------------------------------------------
+    # 接口函数
+    # ---------------------------------------------------------
+    def next_config(self, history=None, pending=None):
+        """
+        为一条空闲的链提议下一个待测配置（步数最少的链优先）
+        ------------------------------------------------
+        已评估的候选直接用已知结果推进，正在测量的候选让该链等待同一个结果，
+        因此返回的配置一定未评估且不在途；所有链都在等待时返回 None。
+        """
+        pending = pending or {}
+        idle = sorted((i for i in range(len(self.chains)) if i not in self.busy),
+                      key=lambda i: self.chains[i]["steps"])
+        for index in idle:
+            if self.proposed >= self.max_iter or self.exhausted:
+                return None
+            chain = self.chains[index]
+            for _ in range(self.MEMO_STEPS):
+                candidate = chain["config"] if chain["energy"] is None else self._neighbour(chain["config"])
+                result = self._known(candidate, history)
+                if result is not None:
+                    self._step(index, candidate, result)  # 共享记录命中：不重复测量
+                    continue
+                break
+            else:
+                candidate = self._unexplored(history, pending)
+                if candidate is None:
+                    self.exhausted = True
+                    return None
+
+            key = config_key(candidate)
+            self.busy.add(index)
+            if key in pending or key in self.waiting:
+                self.waiting.setdefault(key, []).append(index)  # 其他链正在测量：等待同一个结果
+                continue
+            self.waiting[key] = [index]
+            self.proposed += 1
+            return candidate
+        return None
+
+    def update(self, config, result, censored=False):
+        """
+        记录结果并推进等待该配置的链
+        ------------------------------------------------
+        censored=True 表示该运行超过竞速上限被终止，result 只是下界：
+        与 SimulatedAnnealing 相同，用下界作为能量估计，且不更新全局最优。
+        """
+        key = config_key(config)
+        self.memo[key] = result
+        self.iter_count += 1
+        if not censored and result < self.best_result:
+            self.best_result = result
+            self.best_config = config
+
+        for index in self.waiting.pop(key, []):
+            self.busy.discard(index)
+            self._step(index, config, result)
+
+        if len(self.chains) > 1 and self.iter_count % self.swap_interval == 0:
+            self._swap()
+
+    def stop(self):
+        """提议数达到 max_iter，或空间中已没有未评估的配置"""
+        return self.exhausted or self.proposed >= self.max_iter
+
+    def summary(self):
+        """各链温度与当前能量、交换接受率（Autotuner 在实验结束时写入日志）"""
+        chains = ", ".join(
+            f"T={c['temp']:.3g}: {c['energy']:.6f}s" if c["energy"] is not None else f"T={c['temp']:.3g}: -"
+            for c in self.chains
+        )
+        rate = self.swaps_accepted / self.swaps_proposed if self.swaps_proposed else 0.0
+        return f"Parallel tempering: chains [{chains}], swaps accepted {self.swaps_accepted}/{self.swaps_proposed} ({rate:.0%})"
+
+
+def _log(value):
+    return math.log(value) if value > 0 else -math.inf
@@ -1,5 +1,4 @@
-import random
-import itertools
+from codes.utils.ConfigSpace import ConfigSpace
 
 class RandomSearch:
     def __init__(self, params, sample_size=10):
@@ -7,7 +6,7 @@ class RandomSearch:
         随机搜索算法
         --------------------------------------------
         输入参数：
-            params: 参数空间（字典类型）
+            params: 参数空间（字典或 ConfigSpace）
             sample_size: 采样数量（默认10）
         """
         self.params = params
@@ -15,12 +14,9 @@ class RandomSearch:
         self.best_config = None
         self.best_result = float("inf")
 
-        # 计算搜索空间大小
-        keys = list(params.keys())
-        values = list(params.values())
-        self.all_possible_configs = [
-            dict(zip(keys, v)) for v in itertools.product(*values)
-        ]
+        # 惰性配置空间：按下标不放回抽样，不展开全部组合
+        self.space = ConfigSpace.of(params)
+        self.sample_configs = None  # 抽样结果保存在对象中，快照恢复后沿用同一组样本
 
     def all_configs(self):
         """
@@ -29,19 +25,26 @@ class RandomSearch:
         返回：
             一个生成器（yield），每次返回一个随机配置
         """
-        # 随机采样指定数量（不放回）
-        sample_configs = random.sample(
-            self.all_possible_configs,
-            min(self.sample_size, len(self.all_possible_configs))
-        )
-
-        for config in sample_configs:
+        for config in self._samples():
             yield config
 
-    def update(self, config, result):
+    def __len__(self):
+        """采样数量（用于进度与 ETA）"""
+        return len(self._samples())
+
+    def _samples(self):
+        """随机采样指定数量的有效配置（不放回），首次调用时抽取"""
+        if self.sample_configs is None:
+            self.sample_configs = list(self.space.sample(self.sample_size))
+        return self.sample_configs
+
+    def update(self, config, result, censored=False):
         """
         根据结果更新最优配置
+        censored=True 表示该运行因超过竞速上限被终止，result 为下界
         """
+        if censored:
+            return  # 被竞速终止的结果只是下界，不可能成为最优
         if result < self.best_result:
             self.best_result = result
             self.best_config = config
@@ -1,6 +1,8 @@
 import math
 import random
 import copy
+from codes.utils.History import config_key
+from codes.utils.ConfigSpace import ConfigSpace
 
 
 class SimulatedAnnealing:
@@ -8,79 +10,122 @@ class SimulatedAnnealing:
     SimulatedAnnealing 模拟退火算法
     ------------------------------------------------
     特点：
-        1. 属于动态搜索算法（支持 next_config() / stop() 接口）；
+        1. 属于动态搜索算法（支持 next_config() / stop() 接口），
+           异步模式下会在当前配置附近同时提议多个邻居（不重复提议在途配置）；
         2. 能跳出局部最优，通过温度衰减控制搜索范围；
-        3. 与 Database 结合，可根据历史结果调整搜索方向。
+        3. 与 Database 结合，可根据历史结果调整搜索方向；
+        4. Metropolis 准则比较候选与当前状态的能量：能量取 log(运行时间)（即相对变化，
+           与程序运行时间的量级无关），温度 t_start / t_stop 也按相对变化理解
+           （例如慢 10% 的候选在温度 0.1 时以约 e^-1 的概率被接受）。
+           多条链并行与交换见 ParallelTempering。
     """
 
-    def __init__(self, params, initial_temp=100.0, cooling_rate=0.9, stop_temp=1.0, max_iter=100):
+    NEIGHBOUR_TRIES = 20
+
+    def __init__(self, params, t_start=1.0, cooling_rate=0.9, t_stop=0.01, max_iter=100):
         self.params = params
+        self.space = ConfigSpace.of(params)
         self.param_keys = list(params.keys())
         self.current_config = self.random_config()
         self.best_config = self.current_config
         self.best_result = float("inf")
+        self.current_result = None   # 当前状态的能量（运行时间），首个结果返回前为 None
 
         # 温度控制参数
-        self.temp = initial_temp
+        self.temp = t_start
         self.cooling_rate = cooling_rate
-        self.stop_temp = stop_temp
+        self.t_stop = t_stop
         self.max_iter = max_iter
-        self.iter_count = 0
+        self.iter_count = 0     # 已收到的结果数
+        self.proposed = 0       # 已提议的配置数（含在途）
 
     # ---------------------------------------------------------
     # 辅助函数
     # ---------------------------------------------------------
     def random_config(self):
-        """随机生成一个配置"""
-        return {k: random.choice(v) for k, v in self.params.items()}
+        """随机生成一个满足约束的配置"""
+        return self.space.random_config()
+
+    def random_jump(self, history=None, pending=None):
+        """随机跳转到一个未测量且不在途的配置（空间已全部测量时退回任意随机配置）"""
+        for config in self.space.sample():
+            if config_key(config) not in (pending or {}) and (history is None or config not in history):
+                return config
+        return self.random_config()
 
     def neighbor_config(self, config):
-        """在当前配置附近随机选取一个邻居"""
-        new_config = copy.deepcopy(config)
-        key = random.choice(self.param_keys)
-        values = self.params[key]
-        new_config[key] = random.choice(values)
-        return new_config
+        """在当前配置附近随机选取一个满足约束的邻居：随机修改一个参数为其他取值（多次尝试失败时随机跳转）"""
+        for _ in range(self.NEIGHBOUR_TRIES):
+            new_config = copy.deepcopy(config)
+            key = random.choice(self.param_keys)
+            values = [v for v in self.params[key] if v != config.get(key)]
+            if not values:
+                continue
+            new_config[key] = random.choice(values)
+            new_config = self.space.canonical(new_config)
+            if self.space.is_valid(new_config):
+                return new_config
+        return self.random_config()
+
+    @staticmethod
+    def acceptance(current, result, temp):
+        """Metropolis 接受概率：能量差为 log(result / current)，temp 为相对温度"""
+        if current is None or result <= current:
+            return 1.0
+        if result == float("inf") or current <= 0 or temp <= 0:
+            return 0.0
+        return math.exp(-math.log(result / current) / temp)
 
     # ---------------------------------------------------------
     # 主接口（被 Autotuner 调用）
     # ---------------------------------------------------------
-    def next_config(self, history=None):
+    def next_config(self, history=None, pending=None):
         """
         根据当前温度与历史记录生成下一个待测配置
         ------------------------------------------------
-        history: Database 提供的历史结果 {str(config): time}
+        history: Autotuner 维护的 History 历史索引（可为 None）
+        pending: 在途配置（config_key -> config），可为 None
+        迭代预算已被已提议的配置用完时返回 None（等待在途结果）。
         """
-        if self.iter_count == 0:
+        pending = pending or {}
+        if self.proposed >= self.max_iter:
+            return None
+        self.proposed += 1
+        if self.proposed == 1:
             return self.current_config  # 首次运行当前配置
 
         # 选择邻居配置
         candidate = self.neighbor_config(self.current_config)
 
-        # 如果历史已有记录，则跳过重复配置
-        if history and str(candidate) in history:
-            return self.random_config()
+        # 如果历史已有记录或正在测量，则改为随机跳转（跳转目标同样避开在途配置，
+        # 否则 Autotuner 丢弃重复提议时这次迭代预算就白白用掉了）
+        if (history is not None and candidate in history) or config_key(candidate) in pending:
+            return self.random_jump(history, pending)
 
         return candidate
 
-    def update(self, config, result):
-        """根据本次结果更新当前状态与全局最优"""
+    def update(self, config, result, censored=False):
+        """
+        根据本次结果更新当前状态与全局最优
+        ------------------------------------------------
+        censored=True 表示该运行超过竞速上限被终止，result 只是下界。
+        此时用下界作为能量估计代入 Metropolis 准则（真实时间只会更差），
+        且删失结果不会更新全局最优。
+        """
         self.iter_count += 1
 
-        if result < self.best_result:
+        if not censored and result < self.best_result:
             self.best_config = config
             self.best_result = result
 
-        # 计算是否接受较差解（Metropolis 准则）
-        delta = result - self.best_result
-        prob = math.exp(-delta / self.temp) if delta > 0 else 1.0
-
-        if random.random() < prob:
+        # 计算是否接受较差解（Metropolis 准则，与当前状态比较）
+        if random.random() < self.acceptance(self.current_result, result, self.temp):
             self.current_config = config
+            self.current_result = result
 
         # 降温
         self.temp *= self.cooling_rate
 
     def stop(self):
         """判断是否终止"""
-        return self.temp < self.stop_temp or self.iter_count >= self.max_iter
+        return self.temp < self.t_stop or self.iter_count >= self.max_iter
@@ -6,23 +6,32 @@ from codes.search_algs.RandomSearch import RandomSearch
 from codes.search_algs.GreedySearch import GreedySearch
 from codes.search_algs.ParallelSearch import ParallelSearch
 from codes.search_algs.SimulatedAnnealing import SimulatedAnnealing
+from codes.search_algs.ParallelTempering import ParallelTempering
+from codes.search_algs.Hyperband import Hyperband
+from codes.search_algs.BayesianOptimization import BayesianOptimization
+from codes.search_algs.GeneticAlgorithm import GeneticAlgorithm
 
-def get_search_algorithm(name, params):
+def get_search_algorithm(name, params, options=None):
     """
     根据算法名称返回对应的搜索算法对象。
     所有算法都应遵循相同的接口定义：
     - all_configs(): 返回所有候选配置（或生成器）
     - update(config, result): 更新当前最优解（用于反馈优化）
+    options: 额外的构造参数（来自 input.txt 中的 option.<名称> = 值）
     """
     algs = {
         "GridSearch": GridSearch,
         "GreedySearch": GreedySearch,
         "RandomSearch": RandomSearch,
         "ParallelSearch": ParallelSearch,
-        "SimulatedAnnealing": SimulatedAnnealing
+        "SimulatedAnnealing": SimulatedAnnealing,
+        "ParallelTempering": ParallelTempering,
+        "Hyperband": Hyperband,
+        "BayesianOptimization": BayesianOptimization,
+        "GeneticAlgorithm": GeneticAlgorithm
     }
 
     if name not in algs:
         raise ValueError(f"Unsupported search algorithm: {name}")
 
-    return algs[name](params)
+    return algs[name](params, **(options or {}))
@@ -0,0 +1,46 @@
+import os
+import pickle
+import random
+import time
+
+
+class Checkpoint:
+    """
+    Checkpoint 实验快照
+    ------------------------------------------------
+    职责：
+        1. 周期性保存搜索算法对象（温度、当前位置、采样集合等全部内部状态）
+           与全局随机数发生器状态，写入 <exp_dir>/checkpoint.pkl；
+        2. 先写临时文件再原子替换，中断（Ctrl-C、重启）时不会留下半个快照；
+        3. --resume 时读取快照，恢复算法对象与随机数状态。
+    快照中的 seen 记录算法已经收到结果的配置（配置键 -> 次数），
+    数据库中多出的记录（快照之后完成的结果）在恢复时直接回放给算法，不再重新测量。
+    in_flight 记录快照时异步模式下已提议、结果未返回的配置，恢复后优先重新提交，
+    等待这些结果的算法（如贪心搜索的邻域、模拟退火的迭代预算）因此不会一直等下去。
+    """
+
+    def __init__(self, exp_dir):
+        self.path = os.path.join(exp_dir, "checkpoint.pkl")
+
+    def save(self, algorithm, seen, in_flight=None):
+        """保存算法对象、随机数状态、已反馈配置计数与在途配置"""
+        state = {
+            "algorithm": algorithm,
+            "random_state": random.getstate(),
+            "seen": seen,
+            "in_flight": list((in_flight or {}).values()),
+            "saved_at": time.time(),
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """读取快照并恢复随机数状态；没有快照时返回 None"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        random.setstate(state["random_state"])
+        return state
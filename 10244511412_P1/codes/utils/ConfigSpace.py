@@ -0,0 +1,257 @@
+import ast
+import itertools
+import math
+import random
+from collections.abc import Mapping
+from codes.input.Parameter import Parameter
+
+
+# 约束表达式允许使用的语法节点与函数（其余一律拒绝，不能访问属性、下标或任意内建函数）
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.IfExp, ast.Call, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List,
+)
+_FUNCTIONS = {"min": min, "max": max, "abs": abs, "int": int, "float": float, "str": str, "log2": math.log2}
+
+
+class ConfigSpace(Mapping):
+    """
+    ConfigSpace 惰性配置空间
+    ------------------------------------------------
+    职责：
+        1. 混合进制编址：配置与 [0, size) 内的整数一一对应（最后一个参数变化最快，
+           与 itertools.product 的顺序一致），按下标 O(1) 随机访问，不展开整个空间；
+        2. 不放回随机采样：惰性产生互不相同的随机配置，不预先生成全部组合；
+        3. 声明式约束：input.txt 中的 constraint = <表达式>（如 n % block_size == 0），
+           表达式经 AST 白名单检查后编译，违反约束的配置在编译之前就被剪除；
+        4. 条件参数：条件（when.<参数>）不成立时该参数只允许取默认值，其余取值视为无效；
+        5. 邻域：每次只改一个参数——有序 / 数值参数取前后相邻的一格，无序类别参数取其他任一值。
+    ConfigSpace 本身是只读映射（参数名 -> 取值列表），可以直接替代原来的 params 字典；
+    取值列表也可以是 Parameter（类型化参数），类型信息通过 parameter(name) 取得。
+    """
+
+    def __init__(self, params, constraints=None):
+        self.parameters = {
+            name: values if isinstance(values, Parameter) else Parameter(name, values)
+            for name, values in params.items()
+        }
+        self.params = {name: p.values for name, p in self.parameters.items()}
+        self.names = list(self.params)
+        self.radices = [len(values) for values in self.params.values()]
+        self.size = math.prod(self.radices)
+        self._positions = {name: {v: i for i, v in enumerate(values)} for name, values in self.params.items()}
+
+        if constraints is not None and not isinstance(constraints, list):
+            constraints = [constraints]
+        self.constraints = list(constraints or [])
+        self.conditions = {name: p.condition for name, p in self.parameters.items() if p.condition}
+        self._compile_all()
+        self._valid_count = None
+
+    @classmethod
+    def of(cls, params):
+        """已是 ConfigSpace 时原样返回，否则把参数字典包装为无约束的空间"""
+        return params if isinstance(params, cls) else cls(params)
+
+    # ---------------------------------------------------------
+    # 映射接口（参数名 -> 取值列表）
+    # ---------------------------------------------------------
+    def __getitem__(self, name):
+        return self.params[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_compiled"], state["_conditions"]  # 代码对象不能序列化，反序列化时重新编译
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile_all()
+
+    def _compile_all(self):
+        self._compiled = [_compile(expr) for expr in self.constraints]
+        self._conditions = {name: _compile(expr) for name, expr in self.conditions.items()}
+
+    def parameter(self, name):
+        """参数的类型信息（Parameter）"""
+        return self.parameters[name]
+
+    # ---------------------------------------------------------
+    # 编址
+    # ---------------------------------------------------------
+    def coerce(self, config):
+        """旧记录中的配置（数值保存为字符串）转换为当前参数类型；不在空间中的参数原样保留"""
+        return {
+            name: self.parameters[name].coerce(value) if name in self.parameters else value
+            for name, value in config.items()
+        }
+
+    def config(self, index):
+        """下标 -> 配置（混合进制解码）"""
+        positions = []
+        for radix in reversed(self.radices):
+            index, position = divmod(index, radix)
+            positions.append(position)
+        return self.from_positions(reversed(positions))
+
+    def index(self, config):
+        """配置 -> 下标（混合进制编码）"""
+        index = 0
+        for position, radix in zip(self.positions(config), self.radices):
+            index = index * radix + position
+        return index
+
+    def positions(self, config):
+        """配置中每个参数取值在其取值列表中的位置"""
+        return tuple(self._positions[name][config[name]] for name in self.names)
+
+    def from_positions(self, positions):
+        return {name: self.params[name][int(p)] for name, p in zip(self.names, positions)}
+
+    # ---------------------------------------------------------
+    # 约束
+    # ---------------------------------------------------------
+    def is_valid(self, config):
+        """配置是否满足全部约束与条件；除零视为不满足"""
+        if not self._compiled and not self._conditions:
+            return True
+        env = {name: _number(value) for name, value in config.items()}
+        for name, code in self._conditions.items():
+            if config.get(name) != self.parameters[name].default and not _check(self.conditions[name], code, env):
+                return False
+        return all(_check(expr, code, env) for expr, code in zip(self.constraints, self._compiled))
+
+    def canonical(self, config):
+        """把条件不成立的参数重置为默认值（如修改 unroll 后 unroll_inner 失效）"""
+        if not self._conditions:
+            return config
+        env = {name: _number(value) for name, value in config.items()}
+        inactive = {name: self.parameters[name].default for name, code in self._conditions.items()
+                    if not _check(self.conditions[name], code, env)}
+        return dict(config, **inactive) if inactive else config
+
+    def count_valid(self):
+        """有效配置数（有约束或条件时需要遍历一次空间，结果缓存）"""
+        if not self._compiled and not self._conditions:
+            return self.size
+        if self._valid_count is None:
+            self._valid_count = sum(1 for _ in self.configs())
+        return self._valid_count
+
+    # ---------------------------------------------------------
+    # 遍历与采样
+    # ---------------------------------------------------------
+    def configs(self):
+        """按下标顺序惰性产生全部有效配置"""
+        for combination in itertools.product(*self.params.values()):
+            config = dict(zip(self.names, combination))
+            if self.is_valid(config):
+                yield config
+
+    def sample(self, count=None):
+        """
+        不放回地惰性产生随机有效配置（最多 count 个，None 表示直到空间耗尽）
+        ------------------------------------------------
+        随机抽取下标并记录已抽过的下标；已抽取超过一半时，
+        把剩余下标打乱后依次产生，避免拒绝采样越来越慢。
+        """
+        seen = set()
+        produced = 0
+        while len(seen) < self.size and (count is None or produced < count):
+            if len(seen) > self.size // 2:
+                rest = [i for i in range(self.size) if i not in seen]
+                random.shuffle(rest)
+                indices = iter(rest)
+                seen.update(rest)
+            else:
+                index = random.randrange(self.size)
+                if index in seen:
+                    continue
+                seen.add(index)
+                indices = iter((index,))
+            for index in indices:
+                config = self.config(index)
+                if self.is_valid(config):
+                    produced += 1
+                    yield config
+                    if count is not None and produced >= count:
+                        return
+
+    def random_config(self):
+        """随机取一个有效配置"""
+        for config in self.sample(1):
+            return config
+        raise ValueError(f"No configuration satisfies the constraints: {self.constraints}")
+
+    def neighbours(self, config):
+        """
+        相邻的有效配置：每次只修改一个参数，有序 / 数值参数取前后相邻的一格，
+        无序类别参数取其他任一取值（不在取值列表中的参数不参与）
+        """
+        result, seen = [], {tuple(sorted(config.items()))}
+        for name, values in self.params.items():
+            position = self._positions[name].get(config.get(name))
+            if position is None:
+                continue
+            if self.parameters[name].ordered:
+                steps = (position - 1, position + 1)
+            else:
+                steps = [j for j in range(len(values)) if j != position]
+            for j in steps:
+                if 0 <= j < len(values):
+                    neighbour = self.canonical(dict(config, **{name: values[j]}))
+                    key = tuple(sorted(neighbour.items()))
+                    if key not in seen and self.is_valid(neighbour):
+                        seen.add(key)
+                        result.append(neighbour)
+        return result
+
+    def describe(self):
+        text = f"{self.size} configs ({'; '.join(p.describe() for p in self.parameters.values())})"
+        if self.constraints:
+            text += f", constraints: {'; '.join(self.constraints)}"
+        return text
+
+
+def _compile(expr):
+    """检查约束表达式只包含白名单语法后编译"""
+    tree = ast.parse(expr, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in constraint '{expr}': {type(node).__name__}")
+        if isinstance(node, ast.Call) and not (
+                isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS and not node.keywords):
+            raise ValueError(f"Unsupported function call in constraint '{expr}'")
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise ValueError(f"Unsupported name in constraint '{expr}': {node.id}")
+    return compile(tree, f"<constraint: {expr}>", "eval")
+
+
+def _check(expr, code, env):
+    """求值一个约束 / 条件表达式"""
+    try:
+        return bool(eval(code, {"__builtins__": {}, **_FUNCTIONS}, env))
+    except ZeroDivisionError:
+        return False
+    except NameError as e:
+        raise ValueError(f"Constraint '{expr}' refers to an unknown parameter: {e}")
+
+
+def _number(value):
+    """约束中数字形式的取值按数字参与运算（如 "64" -> 64）"""
+    if not isinstance(value, str):
+        return value
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
@@ -0,0 +1,68 @@
+from codes.utils.Topology import CpuTopology
+
+
+class CoreScheduler:
+    """
+    CoreScheduler 测量槽调度器
+    ------------------------------------------------
+    职责：
+        1. 根据 CPU 拓扑划分互不干扰的“测量槽”：每个槽独占一个物理核
+           （包括其 SMT 兄弟线程），计时运行只绑定在该核上；
+        2. one_per_llc=True 时每个末级缓存域只放一个测量槽，避免多个
+           带宽密集的矩阵乘法争抢同一个 LLC 与内存控制器；
+        3. 未被测量槽占用的核留给编译使用；
+        4. acquire() / release() 在主进程中分配槽，保证同一时刻一个槽只跑一个任务。
+    """
+
+    def __init__(self, max_slots, one_per_llc=False, topology=None):
+        self.topology = topology or CpuTopology()
+        self.one_per_llc = one_per_llc
+
+        reserved = self._choose_cores(max_slots)
+        # 测量进程只绑定到核的第一个逻辑 CPU，兄弟线程保持空闲
+        self.slots = [core[:1] for core in reserved]
+        reserved_cpus = {cpu for core in reserved for cpu in core}
+        self.compile_cpus = [cpu for cpu in self.topology.cpus if cpu not in reserved_cpus]
+        self.shared_compile = not self.compile_cpus
+        if self.shared_compile:
+            # 没有剩余核时编译只能与测量共用 CPU
+            self.compile_cpus = list(self.topology.cpus)
+
+        self.free = list(range(len(self.slots)))
+
+    def acquire(self):
+        """取出一个空闲槽的编号（调用方需保证在途任务数不超过槽数）"""
+        return self.free.pop(0)
+
+    def release(self, slot_id):
+        """归还槽"""
+        self.free.append(slot_id)
+
+    def pinning(self, slot_id):
+        """返回传给 Runner 的绑定信息 (测量 CPU, 编译 CPU)"""
+        return self.slots[slot_id], self.compile_cpus
+
+    def describe(self):
+        """调度方案摘要（用于日志）"""
+        mode = "one per LLC domain" if self.one_per_llc else "one per core"
+        note = " (compiles share measurement cores)" if self.shared_compile else ""
+        return (f"{self.topology.describe()}; {len(self.slots)} measurement slots {mode} "
+                f"{self.slots}; compile CPUs {self.compile_cpus}{note}")
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _choose_cores(self, max_slots):
+        """按 LLC 域轮转选核，使测量槽尽量分散在不同缓存域上"""
+        domains = [self.topology.cores_in(d) for d in self.topology.llc_domains]
+        if self.one_per_llc:
+            domains = [cores[:1] for cores in domains]
+
+        chosen = []
+        depth = 0
+        while len(chosen) < max_slots and any(depth < len(cores) for cores in domains):
+            for cores in domains:
+                if depth < len(cores) and len(chosen) < max_slots:
+                    chosen.append(cores[depth])
+            depth += 1
+        return chosen
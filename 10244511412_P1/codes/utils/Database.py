@@ -1,6 +1,8 @@
+import fcntl
 import json
 import os
 from threading import Lock
+from codes.utils.Telemetry import span
 
 
 class Database:
@@ -12,41 +14,62 @@ class Database:
         2. 提供查询接口（get_best, get_all）；
         3. 支持动态算法实时访问历史记录；
         4. 使用文件锁避免并行写冲突。
+
+    存储格式：
+        - 结果以 JSON Lines 形式追加写入 <db_path 去掉 .json>.jsonl，每条记录一行，
+          写入时持有 fcntl 排他锁，多个进程（ProcessPoolExecutor 子进程）可以安全并发追加；
+        - 每次 save 只追加一行（O(1)），读取时只解析上次读取位置之后新增的行；
+        - add_summary / export 时把全部记录导出为原有的 best_config.json 布局
+          （records / best / summary），供现有脚本与报告继续使用。
     """
 
     def __init__(self, db_path="results/summary/best_config.json"):
         self.db_path = db_path
+        self.log_path = os.path.splitext(db_path)[0] + ".jsonl"
         self.lock = Lock()
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        # 进程内缓存：已读取的记录、读取位置与当前最优
+        self._records = []
+        self._summary = None
+        self._offset = 0
+        self._best = {"config": None, "time": float("inf")}
+
+        with self.lock, self._locked(fcntl.LOCK_EX) as f:
+            # 兼容旧实验目录：只有 best_config.json 时把其中的记录导入追加日志
+            if os.path.getsize(self.log_path) == 0 and os.path.exists(db_path):
+                with open(db_path, "r") as old:
+                    legacy = json.load(old)
+                lines = [json.dumps(rec) + "\n" for rec in legacy.get("records", [])]
+                if "summary" in legacy:
+                    lines.append(json.dumps({"summary": legacy["summary"]}) + "\n")
+                f.write("".join(lines).encode())
+                f.flush()
 
-        # 初始化数据库文件
+        # 初始化导出文件，保持原有“实验开始即存在 best_config.json”的行为
         if not os.path.exists(db_path):
-            with open(db_path, "w") as f:
-                json.dump({"records": [], "best": {"config": None, "time": float("inf")}}, f, indent=4)
+            self.export()
 
     # ---------------------------------------------------------
     # 基本操作
     # ---------------------------------------------------------
-    def save(self, config, result):
-        """保存一次测试结果"""
-        with self.lock:
-            data = self._read_db()
-
-            # 记录新的测试结果
-            record = {"config": config, "time": result}
-            data["records"].append(record)
-
-            # 更新最优解
-            if result < data["best"]["time"]:
-                data["best"] = {"config": config, "time": result}
-
-            self._write_db(data)
+    def save(self, config, result, extra=None):
+        """
+        保存一次测试结果
+        ------------------------------------------------
+        extra: 附加字段（如重复测量的样本向量 samples 与统计量 stats）
+        """
+        record = {"config": config, "time": result}
+        if extra:
+            record.update(extra)
+        with span("db_write"):
+            self._append(record)
 
     def get_best(self):
         """读取当前最优配置"""
         with self.lock:
-            data = self._read_db()
-            return data["best"]
+            self._refresh()
+            return dict(self._best)
 
     def get_all(self):
         """
@@ -56,30 +79,71 @@ class Database:
         让算法根据过去结果调整搜索方向。
         """
         with self.lock:
-            data = self._read_db()
+            self._refresh()
             # 转换成 {str(config): time} 格式方便查重与访问
-            return {str(rec["config"]): rec["time"] for rec in data["records"]}
+            return {str(rec["config"]): rec["time"] for rec in self._records}
+
+    def get_records(self):
+        """返回全部原始记录（包含 samples / stats / rusage 等附加字段）"""
+        with self.lock:
+            self._refresh()
+            return list(self._records)
+
+    def add_summary(self, algorithm_name, total_runtime):
+        """写入实验总结信息，并导出 JSON 布局"""
+        self._append({"summary": {
+            "algorithm": algorithm_name,
+            "total_runtime_sec": round(total_runtime, 3)
+        }})
+        self.export()
+
+    def export(self):
+        """把追加日志导出为原有的 best_config.json 布局（原子替换）"""
+        with self.lock:
+            self._refresh()
+            data = {"records": self._records, "best": self._best}
+            if self._summary is not None:
+                data["summary"] = self._summary
+            tmp_path = f"{self.db_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_path, self.db_path)
 
     # ---------------------------------------------------------
     # 内部函数
     # ---------------------------------------------------------
-    def _read_db(self):
-        """读取数据库文件"""
-        with open(self.db_path, "r") as f:
-            return json.load(f)
+    def _locked(self, mode):
+        """打开追加日志并加 fcntl 锁，返回文件对象（关闭时自动释放锁）"""
+        f = open(self.log_path, "a+b")
+        fcntl.flock(f, mode)
+        return f
 
-    def _write_db(self, data):
-        """写入数据库文件"""
-        with open(self.db_path, "w") as f:
-            json.dump(data, f, indent=4)
+    def _append(self, entry):
+        """在排他锁内追加一行；单次 write 保证整行写入"""
+        line = json.dumps(entry) + "\n"
+        with self.lock, self._locked(fcntl.LOCK_EX) as f:
+            f.write(line.encode())
+            f.flush()
 
-    def add_summary(self, algorithm_name, total_runtime):
-        """写入实验总结信息"""
-        with self.lock:
-            data = self._read_db()
-            data["summary"] = {
-                "algorithm": algorithm_name,
-                "total_runtime_sec": round(total_runtime, 3)
-            }
-            self._write_db(data)
+    def _refresh(self):
+        """读取上次位置之后新增的完整行（调用方持有 self.lock）"""
+        with self._locked(fcntl.LOCK_SH) as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+        self._offset += end
+        for line in chunk[:end].decode().splitlines():
+            if line.strip():
+                self._load(json.loads(line))
 
+    def _load(self, entry):
+        """把一行日志合并进进程内缓存"""
+        if "summary" in entry and "config" not in entry:
+            self._summary = entry["summary"]
+            return
+        self._records.append(entry)
+        # 更新最优解（删失结果只是下界、screening 结果为低保真度，均不参与最优比较）
+        if entry["time"] < self._best["time"] and not entry.get("censored") and not entry.get("screening"):
+            self._best = {"config": entry["config"], "time": entry["time"]}
@@ -0,0 +1,115 @@
+from codes.utils.ConfigSpace import ConfigSpace
+
+
+def config_key(config):
+    """
+    规范化配置键：按参数名排序的 (参数, 值) 元组
+    ------------------------------------------------
+    与 str(config) 不同，它与字典的插入顺序无关，且可哈希。
+    """
+    return tuple(sorted(config.items()))
+
+
+class History:
+    """
+    History 内存历史索引
+    ------------------------------------------------
+    职责：
+        1. 在内存中增量记录每个配置的测量结果（不需要反复读取数据库文件）；
+        2. 以规范化配置键提供 O(1) 的查重（config in history）与取值；
+        3. 维护当前最优（删失结果只是下界，不参与最优比较）；
+        4. 维护每个参数取值的边际统计（次数、均值、最优），
+           以及参数空间中的相邻配置查询。
+    由 Autotuner 在每次得到结果时更新，并作为 history 传给
+    next_config / next_batch。
+    """
+
+    def __init__(self, params=None):
+        self.params = params or {}
+        self.space = ConfigSpace.of(self.params)
+        self._results = {}        # config_key -> result
+        self._censored = set()    # 删失结果的 config_key
+        self._marginals = {}      # (参数, 值) -> [次数, 总和, 最优]
+
+        self.best_config = None
+        self.best_result = float("inf")
+
+    @classmethod
+    def from_records(cls, records, params=None):
+        """从数据库记录（Database.get_records()）重建历史索引（旧记录中字符串形式的取值按参数类型转换）"""
+        history = cls(params)
+        for rec in records:
+            history.add(rec["config"], rec["time"], censored=rec.get("censored", False))
+        return history
+
+    # ---------------------------------------------------------
+    # 更新与查询
+    # ---------------------------------------------------------
+    def add(self, config, result, censored=False):
+        """记录一次结果；同一配置重复测量时保留较优值（边际统计计入每一次测量）"""
+        config = self.space.coerce(config)
+        key = config_key(config)
+        for item in key:
+            stats = self._marginals.setdefault(item, [0, 0.0, float("inf")])
+            stats[0] += 1
+            stats[1] += result
+            if not censored:
+                stats[2] = min(stats[2], result)
+
+        if key in self._results and self._results[key] <= result:
+            return
+        self._results[key] = result
+        if censored:
+            self._censored.add(key)
+        else:
+            self._censored.discard(key)
+
+        if not censored and result < self.best_result:
+            self.best_result = result
+            self.best_config = dict(config)
+
+    def get(self, config, default=None):
+        """返回配置的测量结果，不存在时返回 default"""
+        return self._results.get(config_key(config), default)
+
+    def is_censored(self, config):
+        """该配置的结果是否为竞速删失得到的下界"""
+        return config_key(config) in self._censored
+
+    def __contains__(self, config):
+        return config_key(config) in self._results
+
+    def __len__(self):
+        return len(self._results)
+
+    def __iter__(self):
+        """按记录顺序遍历 (config, result)"""
+        for key, result in self._results.items():
+            yield dict(key), result
+
+    # ---------------------------------------------------------
+    # 统计与邻域
+    # ---------------------------------------------------------
+    def marginals(self, name):
+        """
+        参数 name 各取值的边际统计
+        ------------------------------------------------
+        返回 {值: {"count": 次数, "mean": 平均时间, "best": 最优时间}}
+        （失败的 inf 结果会使均值为 inf，best 只统计未删失结果）
+        """
+        return {
+            value: {"count": count, "mean": total / count, "best": best}
+            for (param, value), (count, total, best) in self._marginals.items()
+            if param == name
+        }
+
+    def neighbours(self, config):
+        """
+        相邻配置：每次只修改一个参数，取其在参数列表中前后相邻的一格
+        （按 params 中的取值顺序；不在取值列表中的参数不参与；违反约束的配置不算邻居）
+        """
+        return self.space.neighbours(config)
+
+    def untested_neighbours(self, config):
+        """尚未测量过的相邻配置"""
+        return [c for c in self.neighbours(config) if c not in self]
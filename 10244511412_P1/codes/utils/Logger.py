@@ -1,28 +1,140 @@
+import atexit
 import datetime
+import json
+import multiprocessing
 import os
+import queue
+import threading
+import time
+
+
+# 当前进程作为进程池 worker 时，日志事件发往父进程的写入队列（由 Logger.init_worker 设置）
+_worker_queue = None
+
+
+class LogSink:
+    """
+    LogSink 单写者日志后端
+    ------------------------------------------------
+    职责：
+        1. 每个日志目录只有一个写者：一个后台线程从 multiprocessing.Queue 中取出事件；
+        2. 人类可读的行写入 log.txt，结构化事件（JSON Lines）写入 events.jsonl；
+        3. 批量写入：攒够 batch_size 条或距上次写入超过 flush_interval 秒才写盘并 flush；
+        4. 进程退出时（atexit）写出剩余事件并关闭文件。
+    同一进程内对同一目录创建的多个 Logger 共享同一个 LogSink，不会互相截断日志。
+    """
+
+    _sinks = {}       # 日志目录 -> LogSink
+    _STOP = "__stop__"
+
+    def __init__(self, log_dir, append=False, batch_size=64, flush_interval=0.5):
+        os.makedirs(log_dir, exist_ok=True)
+        self.log_file = os.path.join(log_dir, "log.txt")
+        self.event_file = os.path.join(log_dir, "events.jsonl")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self.queue = multiprocessing.Queue()
+
+        mode = "a" if append else "w"
+        self._text = open(self.log_file, mode)
+        self._events = open(self.event_file, mode)
+        self._thread = threading.Thread(target=self._drain, name=f"LogSink:{log_dir}", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def open(cls, log_dir, append=False):
+        """
+        取得目录对应的写者；首次打开时按 append 决定是否覆盖旧日志。
+        fork 出的子进程继承父进程的写者，事件经继承的队列交给父进程写入。
+        """
+        key = os.path.abspath(log_dir)
+        if key not in cls._sinks:
+            cls._sinks[key] = cls(log_dir, append)
+        return cls._sinks[key]
+
+    def close(self):
+        """写出剩余事件并关闭文件"""
+        if self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join()
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _drain(self):
+        """后台写线程：批量取出事件并写盘"""
+        buffer = []
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            stop = item == self._STOP
+            if item is not None and not stop:
+                buffer.append(item)
+            if stop or len(buffer) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                self._write(buffer)
+                buffer = []
+                last_flush = time.monotonic()
+            if stop:
+                self._text.close()
+                self._events.close()
+                return
+
+    def _write(self, items):
+        if not items:
+            return
+        for line, event in items:
+            if line is not None:
+                self._text.write(line + "\n")
+            if event is not None:
+                self._events.write(json.dumps(event, default=str) + "\n")
+        self._text.flush()
+        self._events.flush()
+
+
+@atexit.register
+def _close_sinks():
+    for sink in list(LogSink._sinks.values()):
+        if sink.pid == os.getpid():
+            sink.close()
+
 
 class Logger:
-    def __init__(self, name="Autotuner", log_dir=None):
+    def __init__(self, name="Autotuner", log_dir=None, append=False):
         """
         初始化日志系统
         ------------------------------------------------
         参数：
             name    : 模块名（默认 "Autotuner"）
             log_dir : 日志保存目录（如 results/GridSearch/20251103_1130/）
+            append  : 追加到已有日志（恢复实验时使用），否则覆盖
+        进程池 worker 中（见 init_worker）所有事件都发往父进程的写者，
+        log_dir 被忽略，因此子进程不会再以 "w" 模式截断共享的 log.txt。
         """
         self.name = name
         self.log_dir = log_dir
         self.log_file = None
+        self.queue = None
+
+        if _worker_queue is not None:
+            self.queue = _worker_queue
+        elif log_dir:
+            sink = LogSink.open(log_dir, append)
+            self.queue = sink.queue
+            self.log_file = sink.log_file
+            self._emit(f"=== Log {'resumed' if append else 'started'} for {name} ===", None)
 
-        # 如果指定了日志目录，就创建对应文件并开启文件写入
-        if log_dir:
-            os.makedirs(log_dir, exist_ok=True)
-            self.log_file = os.path.join(log_dir, "log.txt")
-            with open(self.log_file, "w") as f:
-                f.write(f"=== Log started for {name} ===\n")
+    @staticmethod
+    def init_worker(log_queue):
+        """进程池 initializer：把本进程的日志事件发往父进程的写者"""
+        global _worker_queue
+        _worker_queue = log_queue
 
-    def log(self, msg):
-        """打印日志（控制台 + 文件）"""
+    def log(self, msg, **fields):
+        """打印日志（控制台 + 文件），fields 作为结构化字段写入 events.jsonl"""
         time_str = datetime.datetime.now().strftime("%H:%M:%S")
         formatted = f"[{self.name} {time_str}] {msg}"
 
@@ -30,6 +142,18 @@ class Logger:
         print(formatted)
 
         # 写入文件
-        if self.log_file:
-            with open(self.log_file, "a") as f:
-                f.write(formatted + "\n")
+        self._emit(formatted, self._event("log", msg=msg, **fields))
+
+    def event(self, phase, **fields):
+        """只写结构化事件（不输出到控制台与 log.txt），如 worker 的编译 / 测量耗时"""
+        self._emit(None, self._event(phase, **fields))
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _event(self, phase, **fields):
+        return {"ts": time.time(), "pid": os.getpid(), "logger": self.name, "phase": phase, **fields}
+
+    def _emit(self, line, event):
+        if self.queue is not None:
+            self.queue.put((line, event))
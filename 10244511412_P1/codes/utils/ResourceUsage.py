@@ -0,0 +1,96 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from codes.utils.Timer import Timer
+
+
+class ChildResult:
+    """子进程运行结果：退出码、输出与资源使用情况"""
+
+    def __init__(self, returncode, stdout, stderr, usage, timed_out):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.usage = usage
+        self.timed_out = timed_out
+
+
+def run_with_rusage(argv, timeout=None, preexec_fn=None, env=None):
+    """
+    运行子进程并通过 os.wait4 采集该子进程自身的资源使用情况
+    ------------------------------------------------
+    返回 ChildResult，其中 usage 字段包含：
+        wall    : 墙钟时间（秒，perf_counter_ns 计时）
+        utime   : 用户态 CPU 时间（秒）
+        stime   : 内核态 CPU 时间（秒）
+        maxrss  : 峰值常驻内存（KB）
+        minflt / majflt : 次缺页 / 主缺页次数
+        nvcsw / nivcsw  : 自愿 / 非自愿上下文切换次数
+    超过 timeout 时杀死子进程，timed_out 为 True。
+    输出重定向到临时文件，避免管道写满导致死锁。
+    超时线程与回收共用一把锁：先等子进程退出但不回收（waitid + WNOWAIT，PID 仍属于它），
+    在锁内标记已退出后才 wait4 回收；超时线程只在锁内、确认子进程尚未退出时发送 SIGKILL，
+    因此不会误杀复用了该 PID 的进程，也不会把刚好按时结束的运行记为超时。
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        with Timer() as t:
+            proc = subprocess.Popen(argv, stdout=out, stderr=err, preexec_fn=preexec_fn, env=env)
+            killed = threading.Event()
+            exited = threading.Event()
+            lock = threading.Lock()
+
+            def kill():
+                with lock:
+                    if exited.is_set() or _has_exited(proc.pid):
+                        return
+                    killed.set()
+                    os.kill(proc.pid, signal.SIGKILL)
+
+            killer = threading.Timer(timeout, kill) if timeout is not None else None
+            if killer:
+                killer.start()
+            try:
+                _wait_exited(proc.pid)
+                with lock:
+                    exited.set()
+                _, status, ru = os.wait4(proc.pid, 0)
+            finally:
+                if killer:
+                    killer.cancel()
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        timed_out = killed.is_set()
+
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode(errors="replace")
+        stderr = err.read().decode(errors="replace")
+
+    # Linux 的 ru_maxrss 单位为 KB，macOS 为字节
+    maxrss = ru.ru_maxrss // 1024 if sys.platform == "darwin" else ru.ru_maxrss
+    usage = {
+        "wall": t.interval,
+        "utime": ru.ru_utime,
+        "stime": ru.ru_stime,
+        "maxrss": maxrss,
+        "minflt": ru.ru_minflt,
+        "majflt": ru.ru_majflt,
+        "nvcsw": ru.ru_nvcsw,
+        "nivcsw": ru.ru_nivcsw,
+    }
+    return ChildResult(proc.returncode, stdout, stderr, usage, timed_out)
+
+
+def _wait_exited(pid):
+    """等待子进程退出但不回收（僵尸进程保留 PID）；不支持 waitid 的平台（macOS）直接返回，由 wait4 等待"""
+    if hasattr(os, "waitid"):
+        os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+
+
+def _has_exited(pid):
+    """子进程是否已退出（不回收）"""
+    if not hasattr(os, "waitid"):
+        return False
+    return os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
@@ -0,0 +1,54 @@
+import math
+import numpy as np
+
+
+class Surrogate:
+    """
+    Surrogate 岭回归代理模型
+    ------------------------------------------------
+    职责：
+        1. 特征：截距 + 每个参数每个取值一个 one-hot 列（与参数类型无关，交互项不建模）；
+        2. 目标：log(运行时间)，失败（inf）的结果不参与拟合；
+        3. 预测：返回 log 时间的均值与标准差，标准差包含残差噪声与参数不确定性
+           （σ² · (1 + xᵀ A⁻¹ x)，A = XᵀX + αI），供调用方计算预测下界。
+    """
+
+    MIN_SIGMA = 0.05   # log 空间噪声下限（约 5%），样本很少时避免过度自信
+
+    def __init__(self, space, alpha=1.0):
+        self.space = space
+        self.alpha = alpha
+        self.offsets = np.concatenate(([1], 1 + np.cumsum(space.radices)[:-1])).astype(int)
+        self.n_features = 1 + sum(space.radices)
+        self.weights = None
+        self.A_inv = None
+        self.sigma = None
+
+    def _columns(self, config):
+        """配置激活的特征列（截距 + 每个参数一个 one-hot 列）"""
+        return np.concatenate(([0], self.offsets + np.array(self.space.positions(config))))
+
+    def fit(self, configs, results):
+        """拟合；有效样本不足两个时返回 False"""
+        pairs = [(c, r) for c, r in zip(configs, results) if 0 < r < float("inf")]
+        if len(pairs) < 2:
+            return False
+        X = np.zeros((len(pairs), self.n_features))
+        for row, (config, _) in enumerate(pairs):
+            X[row, self._columns(config)] = 1.0
+        y = np.log([r for _, r in pairs])
+
+        penalty = self.alpha * np.eye(self.n_features)
+        penalty[0, 0] = 0.0  # 截距不做正则
+        self.A_inv = np.linalg.pinv(X.T @ X + penalty)
+        self.weights = self.A_inv @ X.T @ y
+        residuals = y - X @ self.weights
+        self.sigma = max(self.MIN_SIGMA, math.sqrt(residuals @ residuals / max(1, len(pairs) - 1)))
+        return True
+
+    def predict(self, config):
+        """返回 (log 时间均值, log 时间标准差)"""
+        columns = self._columns(config)
+        mean = float(self.weights[columns].sum())
+        leverage = float(self.A_inv[np.ix_(columns, columns)].sum())
+        return mean, self.sigma * math.sqrt(1.0 + max(0.0, leverage))
@@ -0,0 +1,168 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+# 本进程记录的时间片段 (阶段, 开始, 结束, pid, 附加信息)，由 drain() 取走
+_spans = []
+
+
+@contextmanager
+def span(phase, **args):
+    """
+    记录一个时间片段（墙钟时间，可跨进程对齐）
+    ------------------------------------------------
+    在 worker 中由 evaluate / CRunner / Database 调用，
+    结果随测量字典返回主进程，由 Telemetry 汇总。
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        _spans.append((phase, start, time.time(), os.getpid(), args))
+
+
+def drain():
+    """取走本进程已记录的时间片段"""
+    spans = list(_spans)
+    _spans.clear()
+    return spans
+
+
+class Telemetry:
+    """
+    Telemetry 运行期遥测
+    ------------------------------------------------
+    职责：
+        1. 计数器：已完成 / 删失 / 缓存命中 / 回放 / 失败的配置数、计时运行次数；
+        2. 直方图：每个阶段（queue / compile / run / db_write / evaluate）的耗时分布；
+        3. 进度：每隔 interval 秒输出一行进度（完成数、吞吐、在途任务、ETA）；
+        4. 报告：有效测量时间（计时运行）与框架开销（编译、排队、写库、空闲）的占比；
+        5. 时间线：导出 Chrome Trace 格式（chrome://tracing / Perfetto），每个 worker 一行。
+    """
+
+    PHASES = ("queue", "compile", "run", "db_write", "evaluate")
+
+    def __init__(self, workers=1, total=None, interval=5.0):
+        self.workers = workers
+        self.total = total
+        self.interval = interval
+        self.counters = {}
+        self.durations = {}     # 阶段 -> 耗时列表（秒）
+        self.trace = []         # Chrome Trace 事件
+        self.in_flight = 0
+        self.start = time.time()
+        self.last_progress = self.start
+
+    # ---------------------------------------------------------
+    # 采集
+    # ---------------------------------------------------------
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_spans(self, spans):
+        """汇总时间片段到直方图与时间线"""
+        for phase, start, end, pid, args in spans:
+            self.durations.setdefault(phase, []).append(end - start)
+            self.trace.append({
+                "name": phase, "cat": "autotuner", "ph": "X", "pid": pid, "tid": pid,
+                "ts": (start - self.start) * 1e6, "dur": (end - start) * 1e6, "args": args,
+            })
+
+    def observe(self, measurement, submitted=None):
+        """
+        记录一个配置的结果
+        ------------------------------------------------
+        submitted: 主进程提交任务的时间；与 worker 中 evaluate 开始时间之差即排队时间
+        """
+        spans = measurement.get("spans") or []
+        if submitted is not None:
+            starts = [start for phase, start, _, _, _ in spans if phase == "evaluate"]
+            if starts:
+                spans = spans + [("queue", submitted, min(starts), os.getpid(), {})]
+        self.add_spans(spans)
+
+        self.count("configs")
+        if measurement.get("restored"):
+            self.count("restored")
+        elif measurement.get("cached"):
+            self.count("cached")
+        elif measurement["censored"]:
+            self.count("censored")
+        elif measurement["time"] == float("inf"):
+            self.count("failed")
+        self.count("timed_runs", len(measurement["samples"]))
+
+    # ---------------------------------------------------------
+    # 输出
+    # ---------------------------------------------------------
+    def progress(self, force=False):
+        """距上次输出超过 interval 秒时返回进度行，否则返回 None"""
+        now = time.time()
+        if not force and now - self.last_progress < self.interval:
+            return None
+        self.last_progress = now
+
+        done = self.counters.get("configs", 0)
+        elapsed = now - self.start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        line = f"Progress: {done}"
+        if self.total:
+            line += f"/{self.total} ({done / self.total:.1%})"
+        line += f", {rate:.2f} configs/s, {self.in_flight}/{self.workers} in flight"
+        if self.total and rate > 0:
+            remaining = max(0, self.total - done) / rate
+            line += f", ETA {_clock(remaining)}"
+        return line + f", elapsed {_clock(elapsed)}"
+
+    def report(self):
+        """最终报告：各阶段耗时分布与框架开销占比"""
+        wall = time.time() - self.start
+        capacity = wall * self.workers
+        total = {phase: sum(values) for phase, values in self.durations.items()}
+        useful = total.get("run", 0.0)
+        framework = {p: total.get(p, 0.0) for p in ("compile", "queue", "db_write")}
+        busy = total.get("evaluate", useful + framework["compile"] + framework["db_write"])
+        idle = max(0.0, capacity - busy)
+
+        lines = [
+            f"Telemetry: {wall:.2f}s wall x {self.workers} workers = {capacity:.2f} worker-seconds; "
+            + ", ".join(f"{k} {v}" for k, v in sorted(self.counters.items())),
+            f"  useful measurement (program runs): {useful:.2f}s ({_share(useful, capacity)})",
+        ]
+        for phase, seconds in framework.items():
+            lines.append(f"  {phase}: {seconds:.2f}s ({_share(seconds, capacity)})")
+        lines.append(f"  worker idle / scheduling overhead: {idle:.2f}s ({_share(idle, capacity)})")
+        for phase in sorted(self.durations):
+            values = sorted(self.durations[phase])
+            lines.append(
+                f"  {phase:<9} n={len(values):<5} mean={sum(values) / len(values) * 1e3:.1f}ms "
+                f"p50={_pick(values, 0.5) * 1e3:.1f}ms p90={_pick(values, 0.9) * 1e3:.1f}ms "
+                f"max={values[-1] * 1e3:.1f}ms"
+            )
+        return lines
+
+    def write_trace(self, path):
+        """导出 Chrome Trace（JSON Object 格式），每个 worker 进程标注名称"""
+        pids = sorted({event["pid"] for event in self.trace})
+        meta = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": pid,
+             "args": {"name": "main" if pid == os.getpid() else f"worker {pid}"}}
+            for pid in pids
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": meta + self.trace, "displayTimeUnit": "ms"}, f)
+
+
+def _clock(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _share(part, whole):
+    return f"{part / whole:.1%}" if whole > 0 else "n/a"
+
+
+def _pick(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
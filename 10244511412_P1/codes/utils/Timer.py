@@ -1,10 +1,15 @@
 import time
 
 class Timer:
+    """
+    高精度计时器（单调时钟，纳秒分辨率）
+    interval 为秒（float），interval_ns 为纳秒（int）
+    """
     def __enter__(self):
-        self.start = time.time()
+        self.start = time.perf_counter_ns()
         return self
 
     def __exit__(self, *args):
-        self.end = time.time()
-        self.interval = self.end - self.start
\ No newline at end of file
+        self.end = time.perf_counter_ns()
+        self.interval_ns = self.end - self.start
+        self.interval = self.interval_ns / 1e9
@@ -0,0 +1,101 @@
+import glob
+import os
+
+
+class CpuTopology:
+    """
+    CpuTopology CPU 拓扑
+    ------------------------------------------------
+    职责：
+        1. 从 /sys/devices/system/cpu 读取物理核（SMT 兄弟线程）与末级缓存（LLC）共享域；
+        2. 只考虑当前进程允许使用的 CPU；
+        3. 在没有 /sys 的平台（如 macOS）上退化为“每个逻辑核一个物理核、共享一个 LLC”。
+    """
+
+    def __init__(self, sysfs="/sys/devices/system/cpu"):
+        self.sysfs = sysfs
+        if hasattr(os, "sched_getaffinity"):
+            self.cpus = sorted(os.sched_getaffinity(0))
+        else:
+            self.cpus = list(range(os.cpu_count() or 1))
+
+        self.cores = self._group(lambda cpu: self._read_list(f"cpu{cpu}/topology/thread_siblings_list"))
+        self.llc_domains = self._group(self._llc_cpus)
+
+    # ---------------------------------------------------------
+    # 查询接口
+    # ---------------------------------------------------------
+    def cores_in(self, domain):
+        """返回某个 LLC 域内的物理核（每个核是一组兄弟逻辑 CPU）"""
+        return [core for core in self.cores if core[0] in domain]
+
+    def describe(self):
+        """拓扑摘要（用于日志）"""
+        return f"{len(self.cpus)} CPUs, {len(self.cores)} cores, {len(self.llc_domains)} LLC domains"
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _group(self, cpus_of):
+        """按 cpus_of(cpu) 返回的共享集合对可用 CPU 分组"""
+        groups = []
+        seen = set()
+        for cpu in self.cpus:
+            if cpu in seen:
+                continue
+            group = sorted((set(cpus_of(cpu)) | {cpu}) & set(self.cpus))
+            seen.update(group)
+            groups.append(group)
+        return groups
+
+    def _llc_cpus(self, cpu):
+        """返回与 cpu 共享最高一级缓存的 CPU 列表"""
+        best_level, shared = -1, [cpu]
+        for index in glob.glob(os.path.join(self.sysfs, f"cpu{cpu}", "cache", "index*")):
+            try:
+                with open(os.path.join(index, "type")) as f:
+                    if f.read().strip() == "Instruction":
+                        continue
+                with open(os.path.join(index, "level")) as f:
+                    level = int(f.read().strip())
+            except (OSError, ValueError):
+                continue
+            if level > best_level:
+                best_level = level
+                shared = self._read_list(os.path.relpath(os.path.join(index, "shared_cpu_list"), self.sysfs))
+        return shared
+
+    def _read_list(self, rel_path):
+        """解析形如 '0-3,8-11' 的 CPU 列表文件，读取失败时返回空列表"""
+        try:
+            with open(os.path.join(self.sysfs, rel_path)) as f:
+                text = f.read().strip()
+        except OSError:
+            return []
+        return parse_cpu_list(text)
+
+
+def parse_cpu_list(text):
+    """解析 CPU 列表字符串，例如 '0-2,5' -> [0, 1, 2, 5]"""
+    cpus = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.extend(range(int(lo), int(hi) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def pin_to(cpus):
+    """
+    返回用于 subprocess 的 preexec_fn：在子进程 exec 前绑定到指定 CPU。
+    cpus 为空或平台不支持 sched_setaffinity 时返回 None（不绑定）。
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = set(cpus)
+    return lambda: os.sched_setaffinity(0, cpus)
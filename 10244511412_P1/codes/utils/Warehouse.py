@@ -0,0 +1,304 @@
+import json
+import os
+import numpy as np
+
+
+class Warehouse:
+    """
+    Warehouse 列式结果仓库
+    ------------------------------------------------
+    职责：
+        1. ingest：扫描 results/ 下全部实验目录中的结果文件
+           （best_config.jsonl / best_config.json / *_subresult.json[l]），
+           把记录转换为列式数组，按批写入 NumPy .npz 分块；
+        2. 参数、算法、实验目录等字符串列使用分类编码（int32 编码 + 全局字典），
+           字典只追加不重排，因此各分块的编码始终一致；
+        3. 增量更新：manifest 记录每个结果文件的大小与修改时间，
+           只重新读取新增或变化的文件；文件变化后旧分块中该文件的行在查询时被屏蔽；
+        4. query：按任意列分组，向量化计算 count / mean / min / max / 百分位，
+           以及每组内最优的某个参数取值（例如每个优化级别下最优的 block_size）。
+    存储目录（默认 results/.warehouse）：
+        manifest.json     列字典、结果文件签名与其所在分块、分块列表
+        chunk_00000.npz   每次 ingest 产生一个分块
+    """
+
+    BASE_COLUMNS = ("experiment", "algorithm", "source")
+    FLAG_COLUMNS = ("censored", "screening", "cached")
+
+    def __init__(self, store_dir="results/.warehouse"):
+        self.store_dir = store_dir
+        self.manifest_path = os.path.join(store_dir, "manifest.json")
+        os.makedirs(store_dir, exist_ok=True)
+        self._index = {}   # 列名 -> {取值: 编码}，按需从字典构建
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"dictionaries": {}, "params": [], "sources": {}, "chunks": []}
+
+    # ---------------------------------------------------------
+    # 导入
+    # ---------------------------------------------------------
+    def ingest(self, results_dir="results"):
+        """
+        增量导入 results_dir 下的结果文件
+        ------------------------------------------------
+        返回 (新增 / 更新的文件数, 新增行数)
+        """
+        changed = []
+        for path in self._result_files(results_dir):
+            st = os.stat(path)
+            signature = [st.st_size, st.st_mtime]
+            known = self.manifest["sources"].get(path)
+            if known is None or known["signature"] != signature:
+                changed.append((path, signature))
+        if not changed:
+            return 0, 0
+
+        chunk_id = len(self.manifest["chunks"])
+        columns = {name: [] for name in self.BASE_COLUMNS + self.FLAG_COLUMNS + ("time",)}
+        param_values = {}
+        rows = 0
+        for path, signature in changed:
+            experiment = os.path.relpath(os.path.dirname(path), results_dir)
+            algorithm = experiment.split(os.sep)[0]
+            name = os.path.basename(path)
+            if "_subresult" in name:
+                algorithm = name.split("_subresult")[0]
+            source = self._encode("source", path)
+            exp_code = self._encode("experiment", experiment)
+            alg_code = self._encode("algorithm", algorithm)
+
+            records = _read_records(path)
+            for rec in records:
+                columns["experiment"].append(exp_code)
+                columns["algorithm"].append(alg_code)
+                columns["source"].append(source)
+                columns["time"].append(rec["time"])
+                for flag in self.FLAG_COLUMNS:
+                    columns[flag].append(bool(rec.get(flag)))
+                for param, value in rec["config"].items():
+                    if param not in self.manifest["params"]:
+                        self.manifest["params"].append(param)
+                    if param not in param_values:
+                        param_values[param] = [-1] * rows  # 之前的记录没有这个参数
+                    param_values[param].append(self._encode(param, str(value)))
+                rows += 1
+                for values in param_values.values():
+                    if len(values) < rows:
+                        values.append(-1)  # 该记录没有这个参数
+            self.manifest["sources"][path] = {"signature": signature, "chunk": chunk_id, "rows": len(records)}
+
+        arrays = {
+            "experiment": np.asarray(columns["experiment"], dtype=np.int32),
+            "algorithm": np.asarray(columns["algorithm"], dtype=np.int32),
+            "source": np.asarray(columns["source"], dtype=np.int32),
+            "time": np.asarray(columns["time"], dtype=np.float64),
+        }
+        for flag in self.FLAG_COLUMNS:
+            arrays[flag] = np.asarray(columns[flag], dtype=np.bool_)
+        for param, values in param_values.items():
+            arrays[f"param:{param}"] = np.asarray(values, dtype=np.int32)
+
+        chunk_name = f"chunk_{chunk_id:05d}.npz"
+        np.savez(os.path.join(self.store_dir, chunk_name), **arrays)
+        self.manifest["chunks"].append(chunk_name)
+        self._write_manifest()
+        return len(changed), rows
+
+    def compact(self):
+        """把全部有效行合并为一个分块，删除旧分块与失效行"""
+        table = self.load()
+        for chunk_name in self.manifest["chunks"]:
+            os.remove(os.path.join(self.store_dir, chunk_name))
+        arrays = {k: v for k, v in table.items() if k != "chunk"}
+        self.manifest["chunks"] = ["chunk_00000.npz"]
+        for source in self.manifest["sources"].values():
+            source["chunk"] = 0
+        np.savez(os.path.join(self.store_dir, "chunk_00000.npz"), **arrays)
+        self._write_manifest()
+        return len(table["time"])
+
+    # ---------------------------------------------------------
+    # 查询
+    # ---------------------------------------------------------
+    def load(self):
+        """
+        读取全部分块并拼接为列数组（dict：列名 -> ndarray），
+        屏蔽已被更新文件替代的旧行。参数列名为 param:<参数名>。
+        """
+        names = list(self.BASE_COLUMNS + self.FLAG_COLUMNS) + ["time"]
+        names += [f"param:{p}" for p in self.manifest["params"]]
+        parts = {name: [] for name in names}
+        parts["chunk"] = []
+        for chunk_id, chunk_name in enumerate(self.manifest["chunks"]):
+            with np.load(os.path.join(self.store_dir, chunk_name)) as data:
+                n = len(data["time"])
+                for name in names:
+                    if name in data:
+                        parts[name].append(data[name])
+                    else:
+                        parts[name].append(np.full(n, -1, dtype=np.int32))
+                parts["chunk"].append(np.full(n, chunk_id, dtype=np.int32))
+
+        table = {
+            name: np.concatenate(arrays) if arrays else np.empty(0)
+            for name, arrays in parts.items()
+        }
+        if not len(table["time"]):
+            return table
+
+        # 每个结果文件只保留最近一次导入的行
+        sources = self.dictionary("source")
+        current = np.array([self.manifest["sources"][s]["chunk"] for s in sources], dtype=np.int32)
+        valid = current[table["source"]] == table["chunk"]
+        return {name: values[valid] for name, values in table.items()}
+
+    def query(self, group_by=(), aggregates=("count", "min", "median"), where=None, best=None,
+              include_censored=False, include_screening=False):
+        """
+        向量化分组聚合
+        ------------------------------------------------
+        group_by: 分组列（参数名或 experiment / algorithm / source）
+        aggregates: count / mean / min / max / median / p<百分位>（如 p90）
+        where: {列名: 取值或取值列表} 过滤条件
+        best: 参数名，额外输出每组内时间最小的该参数取值
+        返回: (表头列表, 行列表)
+        """
+        header = list(group_by) + list(aggregates) + ([f"best_{best}"] if best else [])
+        table = self.load()
+        if not len(table["time"]):
+            return header, []
+
+        mask = np.isfinite(table["time"])
+        if not include_censored:
+            mask &= ~table["censored"]
+        if not include_screening:
+            mask &= ~table["screening"]
+        for column, values in (where or {}).items():
+            values = values if isinstance(values, list) else [values]
+            codes = [self._lookup(column, str(v)) for v in values]
+            mask &= np.isin(table[self._column(column)], codes)
+
+        times = table["time"][mask]
+        keys = [table[self._column(c)][mask] for c in group_by]
+        if not len(times):
+            return header, []
+
+        # 组编号：按分组列的编码组合去重
+        if keys:
+            uniq, group = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+            group = group.ravel()
+        else:
+            uniq, group = np.empty((1, 0), dtype=np.int32), np.zeros(len(times), dtype=np.int64)
+        n_groups = len(uniq)
+
+        # 按 (组, 时间) 排序后，每组是一段连续且有序的区间
+        order = np.lexsort((times, group))
+        sorted_times = times[order]
+        counts = np.bincount(group, minlength=n_groups)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        columns = []
+        for agg in aggregates:
+            if agg == "count":
+                columns.append(counts)
+            elif agg == "mean":
+                columns.append(np.bincount(group, weights=times, minlength=n_groups) / np.maximum(counts, 1))
+            elif agg == "min":
+                columns.append(sorted_times[starts])
+            elif agg == "max":
+                columns.append(sorted_times[starts + counts - 1])
+            elif agg == "median" or agg.startswith("p"):
+                q = 50.0 if agg == "median" else float(agg[1:])
+                columns.append(_percentile(sorted_times, starts, counts, q))
+            else:
+                raise ValueError(f"Unsupported aggregate: {agg}")
+
+        if best:
+            best_codes = table[self._column(best)][mask][order][starts]
+
+        rows = []
+        for g in range(n_groups):
+            if counts[g] == 0:
+                continue
+            row = [self.dictionary(c)[uniq[g][i]] if uniq[g][i] >= 0 else None
+                   for i, c in enumerate(group_by)]
+            row += [c[g].item() for c in columns]
+            if best:
+                code = best_codes[g]
+                row.append(self.dictionary(best)[code] if code >= 0 else None)
+            rows.append(row)
+        return header, rows
+
+    def dictionary(self, name):
+        """分类列的编码字典（编码 -> 字符串取值）"""
+        return self.manifest["dictionaries"].get(name, [])
+
+    # ---------------------------------------------------------
+    # 内部函数
+    # ---------------------------------------------------------
+    def _result_files(self, results_dir):
+        """结果文件列表；同名的 .jsonl 追加日志优先于导出的 .json"""
+        files = []
+        for root, dirs, names in os.walk(results_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            stems = set()
+            for name in sorted(names, key=lambda n: not n.endswith(".jsonl")):
+                stem, ext = os.path.splitext(name)
+                if ext not in (".json", ".jsonl") or stem in stems:
+                    continue
+                if stem == "best_config" or stem.endswith("_subresult"):
+                    stems.add(stem)
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+
+    def _encode(self, name, value):
+        """取得（必要时新增）分类编码"""
+        values = self.manifest["dictionaries"].setdefault(name, [])
+        if name not in self._index:
+            self._index[name] = {v: i for i, v in enumerate(values)}
+        index = self._index[name]
+        if value not in index:
+            index[value] = len(values)
+            values.append(value)
+        return index[value]
+
+    def _lookup(self, column, value):
+        values = self.dictionary(column)
+        return values.index(value) if value in values else -2
+
+    def _column(self, name):
+        """列名：基础列原样使用，参数列加 param: 前缀"""
+        if name in self.BASE_COLUMNS:
+            return name
+        if name not in self.manifest["params"]:
+            raise ValueError(f"Unknown column: {name}")
+        return f"param:{name}"
+
+    def _write_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def _read_records(path):
+    """读取结果文件中的配置记录（兼容 JSON 布局与 JSON Lines 追加日志）"""
+    with open(path, "r") as f:
+        if path.endswith(".jsonl"):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f).get("records", [])
+    return [e for e in entries if "config" in e and isinstance(e.get("time"), (int, float))]
+
+
+def _percentile(sorted_values, starts, counts, q):
+    """在按组排序的数组上向量化计算每组的百分位（线性插值）"""
+    pos = starts + (np.maximum(counts, 1) - 1) * (q / 100.0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, starts + np.maximum(counts, 1) - 1)
+    frac = pos - lo
+    lo = np.minimum(lo, len(sorted_values) - 1)
+    hi = np.minimum(hi, len(sorted_values) - 1)
+    return sorted_values[lo] * (1 - frac) + sorted_values[hi] * frac
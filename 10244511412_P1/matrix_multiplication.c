@@ -2,8 +2,11 @@
 #include <stdio.h>
 #include <sys/time.h>
 #include <assert.h>
+#include <string.h>
 
+#ifndef n
 #define n 4096
+#endif
 
 double A[n][n];
 double B[n][n];
@@ -16,11 +19,13 @@ float tdiff(struct timeval *start,
 }
 
 int main(int argc, const char *argv[]){
-    assert(argc==2);
-    int s = atoi(argv[1]);
-    if (s < 1 || s > n) {
-        printf("Invalid input values.\n");
-        return -1;
+    assert(argc>=2);
+    for(int a = 1; a < argc; ++a){
+        int s = atoi(argv[a]);
+        if (s < 1 || s > n) {
+            printf("Invalid input values.\n");
+            return -1;
+        }
     }
 
     for(int i = 0; i < n; ++i){
@@ -31,16 +36,24 @@ int main(int argc, const char *argv[]){
         }
     }
 
-    struct timeval start, end;
-    gettimeofday(&start, NULL);
-    for(int ih = 0; ih < n; ih += s)
-        for(int jh = 0; jh < n; jh += s)
-            for(int kh = 0;kh < n; kh += s)
-                for(int il = 0; il < s; ++il)
-                    for(int kl = 0; kl < s; ++kl)
-                        for(int jl = 0; jl < s; ++jl)
-                            C[ih+il][jh+jl] += A[ih+il][kh+kl] * B[kh+kl][jh+jl];
-    gettimeofday(&end, NULL);
-    printf("%0.6f\n",tdiff(&start, &end));
+    // one timing line per block size; the arrays are initialised only once
+    for(int a = 1; a < argc; ++a){
+        int s = atoi(argv[a]);
+        if (a > 1)
+            memset(C, 0, sizeof(C));
+
+        struct timeval start, end;
+        gettimeofday(&start, NULL);
+        for(int ih = 0; ih < n; ih += s)
+            for(int jh = 0; jh < n; jh += s)
+                for(int kh = 0;kh < n; kh += s)
+                    for(int il = 0; il < s; ++il)
+                        for(int kl = 0; kl < s; ++kl)
+                            for(int jl = 0; jl < s; ++jl)
+                                C[ih+il][jh+jl] += A[ih+il][kh+kl] * B[kh+kl][jh+jl];
+        gettimeofday(&end, NULL);
+        printf("%0.6f\n",tdiff(&start, &end));
+        fflush(stdout);
+    }
     return 0;
 }
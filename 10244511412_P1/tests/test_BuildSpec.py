@@ -0,0 +1,84 @@
+import pytest
+
+from codes.runners.BuildSpec import BuildSpec, local_headers
+
+
+def make_spec(params, settings=None, bindings=None):
+    return BuildSpec("prog.c", dict.fromkeys(params), settings or {}, bindings or {})
+
+
+def test_default_bindings():
+    spec = make_spec(["optimize_level", "block_size"])
+    config = {"optimize_level": "O2", "block_size": 16}
+    assert spec.compile_args(config) == ("clang", ["-O2"])
+    assert spec.argv("./a.out", config) == ["./a.out", "16"]
+
+
+def test_unbound_parameter_is_rejected():
+    with pytest.raises(ValueError):
+        make_spec(["tile"])
+
+
+def test_compile_args_for_all_compile_kinds():
+    spec = make_spec(
+        ["cc", "opt", "tile", "vec"],
+        {"compiler": "gcc", "extra_flags": "-march=native -Iinclude"},
+        {"cc": "compiler", "opt": "flag:-{value}", "tile": "define:TILE", "vec": "flag:-f{value} -DVEC"},
+    )
+    compiler, args = spec.compile_args({"cc": "clang", "opt": "O3", "tile": 32, "vec": "tree-vectorize"})
+    assert compiler == "clang"
+    assert args == ["-O3", "-DTILE=32", "-ftree-vectorize", "-DVEC", "-march=native", "-Iinclude"]
+    assert spec.include_dirs() == ["include"]
+
+
+def test_runtime_bindings_do_not_affect_compile_args():
+    spec = make_spec(["threads", "block_size"], bindings={"threads": "env:OMP_NUM_THREADS"})
+    config = {"threads": 4, "block_size": 8}
+    assert spec.compile_args(config) == ("clang", [])
+    assert spec.env(config)["OMP_NUM_THREADS"] == "4"
+    assert spec.env({"block_size": 8}) is None
+
+
+def test_argv_positions_and_run_args():
+    spec = make_spec(["a", "b"], {"run_args": "--quiet"}, {"a": "argv:1", "b": "argv:0"})
+    assert spec.argv("./p", {"a": 1, "b": 2}) == ["./p", "2", "1", "--quiet"]
+
+
+def test_argv_batch_expansion():
+    spec = make_spec(["optimize_level", "block_size"], {"batch_param": "block_size"})
+    assert spec.argv("./p", {"optimize_level": "O2", "block_size": 8}, [8, 16, 32]) == ["./p", "8", "16", "32"]
+    assert spec.batch_group({"optimize_level": "O2", "block_size": 8}) == \
+        spec.batch_group({"optimize_level": "O2", "block_size": 32})
+
+
+def test_batch_param_must_be_argv():
+    with pytest.raises(ValueError):
+        make_spec(["optimize_level"], {"batch_param": "optimize_level"})
+
+
+def test_make_mode():
+    spec = make_spec(["tile"], {"build_mode": "make", "executable": "bench", "make_target": "all"},
+                     {"tile": "make:TILE"})
+    assert spec.compile_args({"tile": 8}) == ("make:all:bench", ["TILE=8"])
+    with pytest.raises(ValueError):
+        make_spec(["tile"], {"build_mode": "make", "executable": "bench"}, {"tile": "define"})
+
+
+def test_parse_time():
+    assert make_spec([]).parse_time(" 1.5\n") == 1.5
+    spec = make_spec([], {"output_pattern": r"time: ([0-9.]+)"})
+    assert spec.parse_time("n=1\ntime: 0.25\n") == 0.25
+    assert spec.parse_times("time: 1\ntime: 2\n") == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        spec.parse_time("nothing")
+
+
+def test_local_headers(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "inc").mkdir()
+    (tmp_path / "m.c").write_text('#include "a.h"\n#include <stdio.h>\n#include "c.h"\n')
+    (tmp_path / "a.h").write_text('#include "sub/b.h"\n')
+    (tmp_path / "sub" / "b.h").write_text('#include "../a.h"\n')
+    (tmp_path / "inc" / "c.h").write_text("")
+    headers = local_headers([str(tmp_path / "m.c")], [str(tmp_path / "inc")])
+    assert headers == [str(tmp_path / "a.h"), str(tmp_path / "inc" / "c.h"), str(tmp_path / "sub" / "b.h")]
@@ -0,0 +1,44 @@
+import shutil
+
+import pytest
+
+from codes.runners.BuildSpec import BuildSpec
+from codes.runners.C_runner import CRunner
+
+
+COMPILER = shutil.which("gcc") or shutil.which("clang")
+
+# 按批量协议逐个输出时间，输出完成后以 EXIT_CODE 退出
+PROGRAM = r"""
+#include <stdio.h>
+#include <stdlib.h>
+
+int main(int argc, char **argv) {
+    for (int i = 1; i < argc; i++)
+        printf("%f\n", 0.001 * atoi(argv[i]));
+    return EXIT_CODE;
+}
+"""
+
+pytestmark = pytest.mark.skipif(COMPILER is None, reason="requires gcc or clang")
+
+
+def make_runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "prog.c").write_text(PROGRAM)
+    spec = BuildSpec("prog.c", dict.fromkeys(["code", "block_size"]),
+                     {"compiler": COMPILER, "batch_param": "block_size"}, {"code": "define:EXIT_CODE"})
+    return CRunner("prog.c", spec)
+
+
+def test_batch_reports_every_time(tmp_path, monkeypatch):
+    runner = make_runner(tmp_path, monkeypatch)
+    results = runner.measure_batch([{"code": 0, "block_size": 8}, {"code": 0, "block_size": 16}])
+    assert [r["time"] for r in results] == pytest.approx([0.008, 0.016])
+
+
+def test_nonzero_exit_fails_the_whole_batch(tmp_path, monkeypatch, capsys):
+    runner = make_runner(tmp_path, monkeypatch)
+    results = runner.measure_batch([{"code": 3, "block_size": 8}, {"code": 3, "block_size": 16}])
+    assert all(r["time"] == float("inf") and not r["censored"] for r in results)
+    assert "Program crashed" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import random
+
+from autotuner import Autotuner
+from codes.search_algs.SimulatedAnnealing import SimulatedAnnealing
+from codes.utils.Checkpoint import Checkpoint
+from codes.utils.History import config_key
+
+
+PARAMS = {"optimize_level": ["O0", "O1", "O2"], "block_size": [8, 16, 32]}
+
+
+def test_load_without_snapshot(tmp_path):
+    assert Checkpoint(str(tmp_path)).load() is None
+
+
+def test_save_load_restores_algorithm_and_random_state(tmp_path):
+    random.seed(3)
+    algorithm = SimulatedAnnealing(PARAMS, max_iter=10)
+    first = algorithm.next_config()
+    algorithm.update(first, 1.0)
+    second = algorithm.next_config()
+    seen = {config_key(first): 1}
+
+    checkpoint = Checkpoint(str(tmp_path))
+    checkpoint.save(algorithm, seen, {config_key(second): second})
+    expected = [random.random() for _ in range(3)]
+
+    random.seed(99)
+    state = checkpoint.load()
+    assert [random.random() for _ in range(3)] == expected
+    restored = state["algorithm"]
+    assert (restored.temp, restored.proposed, restored.iter_count) == (algorithm.temp, 2, 1)
+    assert restored.current_config == algorithm.current_config
+    assert state["seen"] == seen
+    assert state["in_flight"] == [second]
+    assert not list(tmp_path.glob("*.tmp"))  # 原子替换，不留临时文件
+
+
+def test_autotuner_resume_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "input.txt").write_text(
+        "target_program = prog.c\n"
+        "search_algorithm = SimulatedAnnealing\n"
+        "optimize_level = O0, O1, O2\n"
+        "block_size = 8, 16, 32\n"
+        "option.max_iter = 5\n"
+    )
+    tuner = Autotuner("input.txt", max_workers=2, exp_name="resume")
+    done, late, lost = ({"optimize_level": "O0", "block_size": b} for b in (8, 16, 32))
+
+    # 快照时：done 已反馈给算法，lost 在途；late 在快照之后完成（已写库），lost 的结果丢失
+    tuner.db.save(done, 2.0)
+    tuner.seen = {config_key(done): 1}
+    tuner.in_flight = {config_key(lost): lost}
+    tuner.save_checkpoint()
+    tuner.db.save(late, 1.0, {"censored": True})
+
+    resumed = Autotuner(resume=tuner.exp_dir, max_workers=2)
+    assert isinstance(resumed.search_algorithm, SimulatedAnnealing)
+    assert resumed.seen == {config_key(done): 1}
+    assert done in resumed.history and resumed.history.get(done) == 2.0
+    assert list(resumed.replay) == [config_key(late)]
+    assert resumed.replay[config_key(late)][0]["censored"]
+    assert resumed.resubmit == [lost]
+
+
+def test_resume_without_snapshot_replays_everything(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "input.txt").write_text(
+        "target_program = prog.c\n"
+        "search_algorithm = GridSearch\n"
+        "block_size = 8, 16\n"
+    )
+    tuner = Autotuner("input.txt", exp_name="legacy")
+    tuner.db.save({"block_size": "16"}, 1.0)  # 类型化参数之前的记录
+
+    resumed = Autotuner(resume=tuner.exp_dir)
+    assert resumed.resubmit == []
+    assert list(resumed.replay) == [config_key({"block_size": 16})]
+    assert resumed.replay[config_key({"block_size": 16})][0]["config"] == {"block_size": 16}
@@ -0,0 +1,98 @@
+import itertools
+import pickle
+import random
+
+import pytest
+
+from codes.input.Parameter import Parameter
+from codes.utils.ConfigSpace import ConfigSpace
+
+
+PARAMS = {"optimize_level": ["O0", "O1", "O2"], "block_size": [8, 16, 32, 64]}
+
+
+def test_index_round_trip_matches_product_order():
+    space = ConfigSpace(PARAMS)
+    expected = [dict(zip(PARAMS, c)) for c in itertools.product(*PARAMS.values())]
+    assert space.size == len(expected)
+    for index, config in enumerate(expected):
+        assert space.config(index) == config
+        assert space.index(config) == index
+
+
+def test_mapping_interface():
+    space = ConfigSpace(PARAMS)
+    assert list(space) == list(PARAMS)
+    assert space["block_size"] == [8, 16, 32, 64]
+    assert ConfigSpace.of(space) is space
+
+
+def test_sample_without_replacement_covers_space():
+    random.seed(0)
+    space = ConfigSpace(PARAMS)
+    samples = list(space.sample())
+    keys = {tuple(sorted(c.items())) for c in samples}
+    assert len(samples) == len(keys) == space.size
+
+
+def test_sample_count():
+    random.seed(1)
+    space = ConfigSpace(PARAMS)
+    assert len(list(space.sample(5))) == 5
+
+
+def test_constraint_filtering():
+    space = ConfigSpace({"n": [64, 96], "block_size": [8, 16, 32, 64]}, "n % block_size == 0")
+    configs = list(space.configs())
+    assert all(c["n"] % c["block_size"] == 0 for c in configs)
+    assert len(configs) == space.count_valid() == 4 + 3
+    random.seed(2)
+    assert {tuple(sorted(c.items())) for c in space.sample()} == {tuple(sorted(c.items())) for c in configs}
+
+
+def test_constraint_division_by_zero_is_invalid():
+    space = ConfigSpace({"a": [0, 1, 2]}, "4 // a == 2")
+    assert [c["a"] for c in space.configs()] == [2]
+
+
+@pytest.mark.parametrize("expr", ["__import__('os')", "a.real > 0", "open('x')", "[a][0] > 0"])
+def test_constraint_rejects_unsafe_syntax(expr):
+    with pytest.raises(ValueError):
+        ConfigSpace({"a": [1, 2]}, expr)
+
+
+def test_unknown_name_in_constraint():
+    space = ConfigSpace({"a": [1, 2]}, "b > 0")
+    with pytest.raises(ValueError):
+        space.is_valid({"a": 1})
+
+
+def test_condition_fixes_inactive_parameter_to_default():
+    unroll = Parameter("unroll_inner", [1, 2, 4], condition="unroll > 1")
+    space = ConfigSpace({"unroll": Parameter("unroll", [1, 2]), "unroll_inner": unroll})
+    configs = list(space.configs())
+    assert {"unroll": 1, "unroll_inner": 1} in configs
+    assert {"unroll": 1, "unroll_inner": 2} not in configs
+    assert space.count_valid() == 1 + 3
+    assert space.canonical({"unroll": 1, "unroll_inner": 4}) == {"unroll": 1, "unroll_inner": 1}
+
+
+def test_neighbours_ordered_and_categorical():
+    space = ConfigSpace({"opt": Parameter("opt", ["O0", "O1", "O2"], "categorical"), "block_size": [8, 16, 32]})
+    neighbours = space.neighbours({"opt": "O1", "block_size": 8})
+    assert {"opt": "O0", "block_size": 8} in neighbours
+    assert {"opt": "O2", "block_size": 8} in neighbours
+    assert {"opt": "O1", "block_size": 16} in neighbours
+    assert {"opt": "O1", "block_size": 32} not in neighbours
+    assert len(neighbours) == 3
+
+
+def test_coerce_legacy_strings():
+    space = ConfigSpace(PARAMS)
+    assert space.coerce({"optimize_level": "O1", "block_size": "16"}) == {"optimize_level": "O1", "block_size": 16}
+
+
+def test_pickle_recompiles_constraints():
+    space = ConfigSpace({"a": [1, 2, 3]}, "a != 2")
+    clone = pickle.loads(pickle.dumps(space))
+    assert [c["a"] for c in clone.configs()] == [1, 3]
@@ -0,0 +1,70 @@
+import json
+import multiprocessing
+import os
+
+from codes.utils.Database import Database
+
+
+def _writer(db_path, worker, count):
+    db = Database(db_path)
+    for i in range(count):
+        db.save({"worker": worker, "i": i}, float(worker * 100 + i + 1))
+
+
+def test_save_and_best(tmp_path):
+    db = Database(str(tmp_path / "best_config.json"))
+    db.save({"block_size": 8}, 2.0)
+    db.save({"block_size": 16}, 1.0, {"samples": [1.0, 1.1]})
+    db.save({"block_size": 32}, 0.5, {"censored": True})
+    db.save({"block_size": 64}, 0.1, {"screening": True})
+    assert db.get_best() == {"config": {"block_size": 16}, "time": 1.0}
+    assert db.get_all() == {"{'block_size': 8}": 2.0, "{'block_size': 16}": 1.0,
+                            "{'block_size': 32}": 0.5, "{'block_size': 64}": 0.1}
+    assert db.get_records()[1]["samples"] == [1.0, 1.1]
+
+
+def test_export_layout(tmp_path):
+    path = tmp_path / "best_config.json"
+    db = Database(str(path))
+    db.save({"block_size": 8}, 2.0)
+    db.add_summary("GridSearch", 1.23456)
+    data = json.loads(path.read_text())
+    assert data["records"] == [{"config": {"block_size": 8}, "time": 2.0}]
+    assert data["best"] == {"config": {"block_size": 8}, "time": 2.0}
+    assert data["summary"] == {"algorithm": "GridSearch", "total_runtime_sec": 1.235}
+
+
+def test_imports_legacy_json(tmp_path):
+    path = tmp_path / "best_config.json"
+    path.write_text(json.dumps({"records": [{"config": {"block_size": "8"}, "time": 3.0}]}))
+    assert Database(str(path)).get_best()["time"] == 3.0
+
+
+def test_concurrent_append(tmp_path):
+    db_path = str(tmp_path / "best_config.json")
+    Database(db_path)
+    workers, count = 4, 50
+    ctx = multiprocessing.get_context("fork")
+    processes = [ctx.Process(target=_writer, args=(db_path, w, count)) for w in range(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+        assert p.exitcode == 0
+
+    records = Database(db_path).get_records()
+    assert len(records) == workers * count
+    assert {(r["config"]["worker"], r["config"]["i"]) for r in records} == {
+        (w, i) for w in range(workers) for i in range(count)}
+    with open(os.path.splitext(db_path)[0] + ".jsonl") as f:
+        assert all(json.loads(line) for line in f)  # 没有交错的半行
+
+
+def test_incremental_refresh_sees_other_writers(tmp_path):
+    db_path = str(tmp_path / "best_config.json")
+    reader = Database(db_path)
+    assert reader.get_records() == []
+    Database(db_path).save({"block_size": 8}, 1.0)
+    assert len(reader.get_records()) == 1
+    Database(db_path).save({"block_size": 16}, 0.5)
+    assert reader.get_best()["config"] == {"block_size": 16}
@@ -0,0 +1,64 @@
+from codes.input.Parameter import Parameter
+from codes.utils.History import History, config_key
+
+
+PARAMS = {"optimize_level": ["O0", "O2"], "block_size": [8, 16, 32]}
+
+
+def test_config_key_ignores_order():
+    assert config_key({"a": 1, "b": 2}) == config_key({"b": 2, "a": 1})
+
+
+def test_add_real_results():
+    history = History(PARAMS)
+    history.add({"optimize_level": "O0", "block_size": 8}, 3.0)
+    history.add({"optimize_level": "O2", "block_size": 8}, 1.0)
+    assert len(history) == 2
+    assert {"block_size": 8, "optimize_level": "O2"} in history
+    assert history.get({"optimize_level": "O0", "block_size": 8}) == 3.0
+    assert history.best_result == 1.0
+    assert history.best_config == {"optimize_level": "O2", "block_size": 8}
+
+
+def test_censored_result_is_lower_bound():
+    history = History(PARAMS)
+    history.add({"optimize_level": "O0", "block_size": 8}, 2.0)
+    config = {"optimize_level": "O2", "block_size": 16}
+    history.add(config, 0.5, censored=True)
+    assert history.is_censored(config)
+    assert history.best_result == 2.0  # 删失结果不参与最优比较
+    assert history.marginals("block_size")[16] == {"count": 1, "mean": 0.5, "best": float("inf")}
+
+
+def test_repeated_measurement_keeps_better_value():
+    history = History(PARAMS)
+    config = {"optimize_level": "O2", "block_size": 16}
+    history.add(config, 0.8, censored=True)
+    history.add(config, 0.6)
+    assert not history.is_censored(config)
+    assert history.get(config) == 0.6
+    history.add(config, 0.9)
+    assert history.get(config) == 0.6
+    assert history.marginals("optimize_level")["O2"]["count"] == 3
+
+
+def test_marginals():
+    history = History(PARAMS)
+    history.add({"optimize_level": "O0", "block_size": 8}, 3.0)
+    history.add({"optimize_level": "O2", "block_size": 8}, 1.0)
+    assert history.marginals("block_size") == {8: {"count": 2, "mean": 2.0, "best": 1.0}}
+
+
+def test_legacy_string_values_are_coerced():
+    params = {"block_size": Parameter.parse("block_size", "8, 16, 32")}
+    history = History.from_records([{"config": {"block_size": "16"}, "time": 1.0}], params)
+    assert {"block_size": 16} in history
+    assert history.best_config == {"block_size": 16}
+
+
+def test_untested_neighbours():
+    history = History(PARAMS)
+    history.add({"optimize_level": "O0", "block_size": 8}, 3.0)
+    history.add({"optimize_level": "O0", "block_size": 16}, 2.0)
+    assert history.untested_neighbours({"optimize_level": "O0", "block_size": 16}) == [
+        {"optimize_level": "O2", "block_size": 16}, {"optimize_level": "O0", "block_size": 32}]
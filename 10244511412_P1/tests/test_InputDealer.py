@@ -0,0 +1,24 @@
+import pytest
+
+from codes.input.InputDealer import InputDealer
+
+
+def parse(tmp_path, *lines):
+    path = tmp_path / "input.txt"
+    path.write_text("\n".join(["target_program = prog.c", "search_algorithm = grid", *lines]) + "\n")
+    dealer = InputDealer(str(path))
+    return dealer, dealer.parse_input()
+
+
+def test_settings_options_and_params(tmp_path):
+    dealer, (target, params, algorithm) = parse(
+        tmp_path, "block_size = pow2(4, 64)", "pipeline = true", "option.seed = 7")
+    assert (target, algorithm) == ("prog.c", "grid")
+    assert list(params) == ["block_size"]
+    assert dealer.flag("pipeline")
+    assert dealer.options == {"seed": 7}
+
+
+def test_pipeline_with_batch_param_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        parse(tmp_path, "block_size = pow2(4, 64)", "pipeline = true", "batch_param = block_size")
@@ -0,0 +1,79 @@
+import math
+import statistics
+
+import pytest
+
+from codes.runners.Measurement import MeasurementPolicy, T_95
+
+
+def test_defaults_match_single_run():
+    policy = MeasurementPolicy()
+    assert not policy.done([])
+    assert policy.done([1.0])
+    assert policy.limit(1.0) is None
+
+
+def test_done_waits_for_timed_runs():
+    policy = MeasurementPolicy(timed_runs=3)
+    assert not policy.done([1.0, 1.0])
+    assert policy.done([1.0, 1.0, 1.0])
+
+
+def test_done_adaptive_until_ci_target():
+    policy = MeasurementPolicy(timed_runs=2, max_runs=10, ci_target=0.05)
+    assert not policy.done([1.0, 2.0])           # 区间太宽，继续测量
+    assert policy.done([1.0, 1.001, 1.0005])     # 半宽低于 5%
+    assert policy.done([1.0, 2.0] * 5)           # 达到 max_runs 即停止
+
+
+def test_summarize_t_confidence_interval():
+    samples = [1.0, 1.2, 0.9, 1.1]
+    stats = MeasurementPolicy().summarize(samples)
+    half_width = T_95[len(samples) - 2] * statistics.stdev(samples) / math.sqrt(len(samples))
+    assert stats["n"] == 4
+    assert stats["mean"] == pytest.approx(1.05)
+    assert stats["median"] == pytest.approx(1.05)
+    assert stats["min"] == 0.9
+    assert stats["ci_half_width"] == pytest.approx(half_width)
+    assert stats["ci_low"] == pytest.approx(1.05 - half_width)
+    assert stats["ci_high"] == pytest.approx(1.05 + half_width)
+
+
+def test_summarize_large_sample_uses_normal_quantile():
+    samples = [1.0, 2.0] * 20
+    stats = MeasurementPolicy().summarize(samples)
+    assert stats["ci_half_width"] == pytest.approx(1.96 * statistics.stdev(samples) / math.sqrt(40))
+
+
+def test_summarize_single_sample_has_infinite_ci():
+    stats = MeasurementPolicy().summarize([2.0])
+    assert stats["stdev"] == 0.0
+    assert stats["ci_half_width"] == float("inf")
+
+
+def test_value_uses_statistic():
+    stats = MeasurementPolicy().summarize([1.0, 2.0, 6.0])
+    assert MeasurementPolicy(statistic="median").value(stats) == 2.0
+    assert MeasurementPolicy(statistic="mean").value(stats) == 3.0
+    assert MeasurementPolicy(statistic="min").value(stats) == 1.0
+
+
+def test_race_limit_and_timeout():
+    policy = MeasurementPolicy(race_factor=2.0, race_grace=1.0)
+    assert policy.limit(float("inf")) is None
+    assert policy.limit(1.5) == 3.0
+    assert policy.timeout(3.0) == 4.0
+    assert policy.timeout(None) is None
+
+
+@pytest.mark.parametrize("kwargs", [{"statistic": "max"}, {"race_factor": 1.0}])
+def test_invalid_policy(kwargs):
+    with pytest.raises(ValueError):
+        MeasurementPolicy(**kwargs)
+
+
+def test_from_settings():
+    policy = MeasurementPolicy.from_settings({"warmup_runs": "1", "timed_runs": "3", "max_runs": "9",
+                                              "ci_target": "0.02", "statistic": "min"})
+    assert (policy.warmup_runs, policy.timed_runs, policy.max_runs) == (1, 3, 9)
+    assert policy.ci_target == 0.02 and policy.statistic == "min"
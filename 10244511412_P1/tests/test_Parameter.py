@@ -0,0 +1,71 @@
+import pytest
+
+from codes.input.Parameter import Parameter
+
+
+def test_integer_list_is_int_and_sorted():
+    p = Parameter.parse("block_size", "32, 8, 16")
+    assert p.kind == "int"
+    assert p.values == [8, 16, 32]
+    assert p.log  # 等比数列按对数尺度
+
+
+def test_non_geometric_list_is_linear():
+    p = Parameter.parse("n", "1, 2, 4, 5")
+    assert p.kind == "int" and not p.log
+
+
+def test_float_list():
+    p = Parameter.parse("alpha", "0.5, 1, 1.5")
+    assert p.kind == "float"
+    assert p.values == [0.5, 1, 1.5]
+
+
+def test_strings_are_categorical():
+    p = Parameter.parse("optimize_level", "O3, O0, O2")
+    assert p.kind == "categorical"
+    assert p.values == ["O3", "O0", "O2"]
+    assert not p.ordered
+
+
+def test_range():
+    assert Parameter.parse("x", "range(1, 7, 2)").values == [1, 3, 5, 7]
+    assert Parameter.parse("x", "range(0, 1, 0.25)").values == [0, 0.25, 0.5, 0.75, 1.0]
+
+
+def test_pow2():
+    p = Parameter.parse("block_size", "pow2(6, 64)")
+    assert p.values == [8, 16, 32, 64]
+    assert p.kind == "int" and p.log
+
+
+def test_log():
+    p = Parameter.parse("n", "log(1, 1000, 4)")
+    assert p.values == [1, 10, 100, 1000]
+    assert p.log
+
+
+def test_ordered_and_categorical_forms():
+    ordered = Parameter.parse("level", "ordered(low, mid, high)")
+    assert ordered.kind == "ordered" and ordered.values == ["low", "mid", "high"]
+    categorical = Parameter.parse("n", "categorical(1, 2, 3)")
+    assert categorical.kind == "categorical" and categorical.values == [1, 2, 3]
+
+
+@pytest.mark.parametrize("text", ["range(5, 1)", "range(1, 5, 0)", "pow2(0, 8)", "log(0, 10, 3)"])
+def test_invalid_forms(text):
+    with pytest.raises(ValueError):
+        Parameter.parse("x", text)
+
+
+def test_default_and_coerce():
+    p = Parameter.parse("block_size", "16, 8")
+    assert p.default == 8
+    assert p.coerce("16") == 16
+    assert p.coerce(16) == 16
+    assert p.coerce("unknown") == "unknown"
+
+
+def test_scaled():
+    assert Parameter.parse("b", "pow2(1, 4)").scaled() == [0.0, 0.5, 1.0]
+    assert Parameter.parse("o", "ordered(a, b, c)").scaled() == [0.0, 0.5, 1.0]
@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+
+from codes.utils.ResourceUsage import run_with_rusage
+
+
+def test_collects_output_and_usage():
+    result = run_with_rusage([sys.executable, "-c", "print(1.5)"], timeout=30)
+    assert result.returncode == 0 and not result.timed_out
+    assert result.stdout.strip() == "1.5"
+    assert result.usage["wall"] > 0 and result.usage["maxrss"] > 0
+
+
+def test_timeout_kills_child():
+    result = run_with_rusage(["sleep", "5"], timeout=0.2)
+    assert result.timed_out
+    assert result.returncode == -9
+    assert result.usage["wall"] < 5
+
+
+def test_finished_child_is_not_killed_before_reap(monkeypatch):
+    # 子进程早已退出，回收被推迟到超时之后：不能记为超时，也不能抢先回收 / 向该 PID 发信号
+    real_wait4 = os.wait4
+
+    def slow_wait4(pid, options):
+        time.sleep(0.5)
+        return real_wait4(pid, options)
+
+    monkeypatch.setattr(os, "wait4", slow_wait4)
+    result = run_with_rusage(["true"], timeout=0.2)
+    assert result.returncode == 0
+    assert not result.timed_out
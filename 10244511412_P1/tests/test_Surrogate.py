@@ -0,0 +1,86 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from codes.search_algs.GridSearch import GridSearch
+from codes.utils.ConfigSpace import ConfigSpace
+from codes.utils.Surrogate import Surrogate
+
+
+PARAMS = {"optimize_level": ["O0", "O1", "O2", "O3"], "block_size": [8, 16, 32, 64, 128], "unroll": [1, 2, 4]}
+LEVEL = {"O0": 8.0, "O1": 3.0, "O2": 1.2, "O3": 1.0}
+BLOCK = {8: 2.0, 16: 1.3, 32: 1.0, 64: 1.1, 128: 1.6}
+UNROLL = {1: 1.2, 2: 1.0, 4: 1.05}
+
+
+def runtime(config):
+    """乘性（log 空间可加）的运行时间模型，one-hot 岭回归可以精确拟合"""
+    return LEVEL[config["optimize_level"]] * BLOCK[config["block_size"]] * UNROLL[config["unroll"]]
+
+
+def test_fit_requires_two_results():
+    model = Surrogate(ConfigSpace(PARAMS))
+    config = {"optimize_level": "O0", "block_size": 8, "unroll": 1}
+    assert not model.fit([config], [1.0])
+    assert not model.fit([config, config], [1.0, float("inf")])
+
+
+def test_fit_predict_recovers_additive_log_model():
+    space = ConfigSpace(PARAMS)
+    configs = list(space.configs())
+    model = Surrogate(space, alpha=1e-6)
+    assert model.fit(configs, [runtime(c) for c in configs])
+    for config in configs:
+        mean, std = model.predict(config)
+        assert mean == pytest.approx(math.log(runtime(config)), abs=1e-3)
+        assert std >= Surrogate.MIN_SIGMA
+
+
+def test_uncertainty_is_larger_for_unseen_values():
+    space = ConfigSpace(PARAMS)
+    seen = [c for c in space.configs() if c["block_size"] != 128]
+    model = Surrogate(space)
+    model.fit(seen, [runtime(c) for c in seen])
+    _, std_seen = model.predict({"optimize_level": "O2", "block_size": 32, "unroll": 2})
+    _, std_unseen = model.predict({"optimize_level": "O2", "block_size": 128, "unroll": 2})
+    assert std_unseen > std_seen
+
+
+def run_grid(search):
+    """模拟 Autotuner 惰性拉取：每个配置的结果在取下一个配置之前反馈"""
+    measured = []
+    for config in search.all_configs():
+        measured.append(config)
+        search.update(config, runtime(config))
+    return measured
+
+
+def test_prescreen_prunes_without_losing_the_optimum():
+    random.seed(0)
+    space = ConfigSpace(PARAMS)
+    search = GridSearch(space, prescreen=True)
+    measured = run_grid(search)
+
+    optimum = min(space.configs(), key=runtime)
+    assert search.best_config == optimum
+    assert search.pruned
+    assert len(measured) + len(search.pruned) == space.size
+    for config, predicted, lower, best in search.pruned:
+        assert lower > best
+        assert runtime(config) > runtime(optimum)
+
+
+def test_prescreen_disabled_measures_everything():
+    space = ConfigSpace(PARAMS)
+    search = GridSearch(space)
+    assert len(run_grid(search)) == space.size
+    assert search.pruned == []
+
+
+def test_censored_results_never_become_best():
+    search = GridSearch(PARAMS)
+    search.update({"optimize_level": "O3", "block_size": 32, "unroll": 2}, 0.1, censored=True)
+    assert search.best_config is None
+    assert np.isinf(search.best_result)
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from codes.utils.Warehouse import Warehouse
+
+
+def write_jsonl(path, records):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for rec in records:
+            f.write(json.dumps(rec) + "\n")
+
+
+@pytest.fixture
+def results(tmp_path):
+    root = tmp_path / "results"
+    write_jsonl(str(root / "GridSearch" / "run1" / "best_config.jsonl"), [
+        {"config": {"optimize_level": "O0", "block_size": 8}, "time": 4.0},
+        {"config": {"optimize_level": "O0", "block_size": 16}, "time": 3.0},
+        {"config": {"optimize_level": "O2", "block_size": 8}, "time": 2.0},
+        {"config": {"optimize_level": "O2", "block_size": 16}, "time": 1.0},
+        {"config": {"optimize_level": "O2", "block_size": 32}, "time": 0.5, "censored": True},
+        {"summary": {"algorithm": "GridSearch", "total_runtime_sec": 1.0}},
+    ])
+    write_jsonl(str(root / "RandomSearch" / "run2" / "best_config.jsonl"), [
+        {"config": {"optimize_level": "O2", "block_size": 16}, "time": 1.5},
+        {"config": {"optimize_level": "O3", "block_size": 8}, "time": float("inf")},
+    ])
+    return str(root)
+
+
+def test_ingest_is_incremental(tmp_path, results):
+    warehouse = Warehouse(str(tmp_path / "store"))
+    assert warehouse.ingest(results) == (2, 7)
+    assert warehouse.ingest(results) == (0, 0)
+
+    write_jsonl(os.path.join(results, "GridSearch", "run1", "best_config.jsonl"),
+                [{"config": {"optimize_level": "O0", "block_size": 8}, "time": 9.0}])
+    assert warehouse.ingest(results) == (1, 1)
+    header, rows = Warehouse(str(tmp_path / "store")).query(aggregates=("count", "max"))
+    assert rows == [[2, 9.0]]  # 旧分块中被替代的行不再参与查询
+
+
+def test_query_group_by(tmp_path, results):
+    warehouse = Warehouse(str(tmp_path / "store"))
+    warehouse.ingest(results)
+    header, rows = warehouse.query(group_by=("optimize_level",), aggregates=("count", "min", "median", "mean"),
+                                   best="block_size")
+    assert header == ["optimize_level", "count", "min", "median", "mean", "best_block_size"]
+    assert sorted(rows) == [["O0", 2, 3.0, 3.5, 3.5, "16"], ["O2", 3, 1.0, 1.5, 1.5, "16"]]
+
+
+def test_query_where_and_flags(tmp_path, results):
+    warehouse = Warehouse(str(tmp_path / "store"))
+    warehouse.ingest(results)
+    _, rows = warehouse.query(group_by=("algorithm",), aggregates=("count",), where={"block_size": 16})
+    assert sorted(rows) == [["GridSearch", 2], ["RandomSearch", 1]]
+    _, rows = warehouse.query(aggregates=("count", "min"), include_censored=True)
+    assert rows == [[6, 0.5]]  # 失败（inf）的结果始终排除
+    _, rows = warehouse.query(aggregates=("count",), where={"block_size": 128})
+    assert rows == []
+
+
+def test_query_percentile_and_compact(tmp_path, results):
+    warehouse = Warehouse(str(tmp_path / "store"))
+    warehouse.ingest(results)
+    _, rows = warehouse.query(aggregates=("p50", "p100"))
+    assert rows == [[pytest.approx(2.0), 4.0]]
+    assert warehouse.compact() == 7
+    assert warehouse.query(aggregates=("p50", "p100"))[1] == rows
+
+
+def test_query_rejects_unknown_columns(tmp_path, results):
+    warehouse = Warehouse(str(tmp_path / "store"))
+    warehouse.ingest(results)
+    with pytest.raises(ValueError):
+        warehouse.query(group_by=("tile",))
+    with pytest.raises(ValueError):
+        warehouse.query(aggregates=("stddev",))
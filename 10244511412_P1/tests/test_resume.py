@@ -0,0 +1,137 @@
+import json
+import os
+import pickle
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from codes.utils.History import config_key
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILER = shutil.which("gcc") or shutil.which("clang")
+
+# 运行时间由参数决定（可重复），每次运行 sleep 一小段时间，留出中断的窗口
+PROGRAM = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <unistd.h>
+
+int main(int argc, char **argv) {
+    int block_size = atoi(argv[1]);
+    usleep(100000);
+    printf("%f\n", 0.001 * (abs(TILE - 16) + 1) * (abs(block_size - 32) + 1));
+    return 0;
+}
+"""
+
+pytestmark = pytest.mark.skipif(COMPILER is None, reason="requires gcc or clang")
+
+
+def write_input(tmp_path, algorithm, options):
+    (tmp_path / "prog.c").write_text(PROGRAM)
+    lines = [
+        "target_program = prog.c",
+        f"search_algorithm = {algorithm}",
+        f"compiler = {COMPILER}",
+        "tile = pow2(4, 64)",
+        "block_size = pow2(4, 128)",
+        "bind.tile = define:TILE",
+        *options,
+    ]
+    (tmp_path / "input.txt").write_text("\n".join(lines) + "\n")
+
+
+def autotuner(*args):
+    return [sys.executable, os.path.join(ROOT, "autotuner.py"), *args]
+
+
+def read_snapshot(exp_dir):
+    with open(os.path.join(exp_dir, "checkpoint.pkl"), "rb") as f:
+        return pickle.load(f)
+
+
+def read_records(exp_dir):
+    with open(os.path.join(exp_dir, "best_config.jsonl")) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [e for e in entries if "config" in e]
+
+
+def interrupt_and_resume(tmp_path, algorithm, after):
+    """
+    运行到数据库中有 after 条记录时发送 Ctrl-C（整个进程组），再用 --resume 跑完；
+    返回 (中断时的记录, 最终记录, 日志, 中断时的快照, 结束时的快照)
+    """
+    exp_dir = os.path.join(str(tmp_path), "results", algorithm, "x")
+    log_path = os.path.join(exp_dir, "best_config.jsonl")
+    process = subprocess.Popen(autotuner("--input", "input.txt", "--workers", "2", "--exp_name", "x"),
+                               cwd=tmp_path, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline and process.poll() is None:
+        if os.path.exists(log_path) and len(read_records(exp_dir)) >= after:
+            break
+        time.sleep(0.02)
+    assert process.poll() is None, "experiment finished before it could be interrupted"
+    os.killpg(process.pid, signal.SIGINT)
+    process.wait(timeout=60)
+    snapshot = read_snapshot(exp_dir)
+    before = read_records(exp_dir)
+
+    subprocess.run(autotuner("--resume", exp_dir), cwd=tmp_path, check=True, timeout=120,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(os.path.join(exp_dir, "log.txt")) as f:
+        log = f.read()
+    return before, read_records(exp_dir), log, snapshot, read_snapshot(exp_dir)
+
+
+def test_simulated_annealing_resume(tmp_path):
+    write_input(tmp_path, "SimulatedAnnealing", ["option.max_iter = 12"])
+    before, after, log, _, _ = interrupt_and_resume(tmp_path, "SimulatedAnnealing", 4)
+
+    keys = [config_key(rec["config"]) for rec in after]
+    assert after[:len(before)] == before
+    assert len(keys) == len(set(keys)) == 12   # 迭代预算不因中断重复消耗或丢失，也不重复测量
+    assert "Resuming" in log and "Best Configuration" in log
+
+
+def test_parallel_tempering_resume(tmp_path):
+    write_input(tmp_path, "ParallelTempering", ["option.max_iter = 14", "option.chains = 3"])
+    before, after, log, _, _ = interrupt_and_resume(tmp_path, "ParallelTempering", 4)
+
+    keys = [config_key(rec["config"]) for rec in after]
+    assert after[:len(before)] == before
+    assert len(keys) == len(set(keys)) == 14   # 每个配置只测量一次
+    assert "Resuming" in log and "Best Configuration" in log
+
+
+def test_genetic_algorithm_resume_finishes_interrupted_generation(tmp_path):
+    write_input(tmp_path, "GeneticAlgorithm", ["option.population_size = 6", "option.generations = 3"])
+    before, after, log, snapshot, final = interrupt_and_resume(tmp_path, "GeneticAlgorithm", 3)
+
+    keys = [config_key(rec["config"]) for rec in after]
+    assert after[:len(before)] == before
+    assert len(keys) == len(set(keys))
+    # 中断时那一代的个体全部测量完，快照之后写库的结果也都反馈给了算法
+    assert {config_key(c) for c in snapshot["algorithm"].population} <= set(keys)
+    algorithm = final["algorithm"]
+    assert algorithm.generation == 2 and set(algorithm.fitness) == set(keys)
+    assert "Resuming" in log and "Best Configuration" in log
+
+
+def test_bayesian_optimization_resume_reissues_outstanding_batch(tmp_path):
+    write_input(tmp_path, "BayesianOptimization", ["option.max_evals = 10", "option.batch_size = 3",
+                                                   "option.n_init = 4"])
+    before, after, log, snapshot, final = interrupt_and_resume(tmp_path, "BayesianOptimization", 2)
+
+    keys = [config_key(rec["config"]) for rec in after]
+    assert after[:len(before)] == before
+    assert len(keys) == len(set(keys)) == 10
+    # 中断时的批次全部测量完，快照之后写库的结果也都反馈给了算法
+    assert {config_key(c) for c in snapshot["algorithm"].outstanding} <= set(keys)
+    assert len(final["algorithm"].observed) == 10
+    assert "Resuming" in log and "Best Configuration" in log
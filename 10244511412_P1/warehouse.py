@@ -0,0 +1,78 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from codes.utils.Warehouse import Warehouse
+
+
+def print_table(header, rows):
+    """按列宽对齐输出查询结果"""
+    cells = [header] + [[f"{v:.6f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    for k, row in enumerate(cells):
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+        if k == 0:
+            print("  ".join("-" * w for w in widths))
+
+
+def parse_where(items):
+    """解析 --where 列=值[,值...]"""
+    where = {}
+    for item in items or []:
+        column, _, values = item.partition("=")
+        where[column.strip()] = [v.strip() for v in values.split(",")]
+    return where
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar warehouse over all autotuning experiments")
+    parser.add_argument("--store", type=str, default="results/.warehouse", help="Warehouse directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Incrementally import result files from experiment folders")
+    ingest.add_argument("--results", type=str, default="results", help="Root of the experiment folders")
+
+    sub.add_parser("compact", help="Merge all chunks into one and drop superseded rows")
+
+    query = sub.add_parser("query", help="Vectorised group-by / aggregate over all records")
+    query.add_argument("--group-by", type=str, default="", help="Comma-separated columns (parameters, experiment, algorithm, source)")
+    query.add_argument("--agg", type=str, default="count,min,median", help="count, mean, min, max, median, p<q> (e.g. p90)")
+    query.add_argument("--where", type=str, action="append", help="Filter column=value[,value...] (repeatable)")
+    query.add_argument("--best", type=str, default=None, help="Also report the fastest value of this parameter per group")
+    query.add_argument("--sort", type=str, default=None, help="Sort rows by this output column")
+    query.add_argument("--include-censored", action="store_true", help="Include race-censored lower bounds")
+    query.add_argument("--include-screening", action="store_true", help="Include low-fidelity screening results")
+    query.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.store)
+    start = time.perf_counter()
+
+    if args.command == "ingest":
+        files, rows = warehouse.ingest(args.results)
+        print(f"Ingested {rows} records from {files} new or changed files "
+              f"({len(warehouse.manifest['chunks'])} chunks) in {time.perf_counter() - start:.3f}s")
+
+    elif args.command == "compact":
+        rows = warehouse.compact()
+        print(f"Compacted {rows} records into 1 chunk in {time.perf_counter() - start:.3f}s")
+
+    else:
+        group_by = [c.strip() for c in args.group_by.split(",") if c.strip()]
+        aggregates = [a.strip() for a in args.agg.split(",") if a.strip()]
+        header, rows = warehouse.query(group_by, aggregates, parse_where(args.where), args.best,
+                                       args.include_censored, args.include_screening)
+        if args.sort:
+            idx = header.index(args.sort)
+            rows.sort(key=lambda row: (row[idx] is None, row[idx]))
+
+        if args.format == "csv":
+            writer = csv.writer(sys.stdout)
+            writer.writerow(header)
+            writer.writerows(rows)
+        elif args.format == "json":
+            print(json.dumps([dict(zip(header, row)) for row in rows], indent=4))
+        else:
+            print_table(header, rows)
+            print(f"\n{len(rows)} groups in {time.perf_counter() - start:.3f}s")
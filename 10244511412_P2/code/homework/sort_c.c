@@ -23,7 +23,9 @@
 
 #include "./util.h"
 
+#ifndef COARSEN_THRESHOLD
 #define COARSEN_THRESHOLD 16
+#endif
 
 static void merge_c(data_t* A, int p, int q, int r);
 static void copy_c(data_t* source, data_t* dest, int n);
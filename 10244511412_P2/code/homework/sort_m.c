@@ -22,7 +22,9 @@
 
 #include "./util.h"
 
+#ifndef COARSEN_THRESHOLD
 #define COARSEN_THRESHOLD 16
+#endif
 
 static void merge_m(data_t* A, int p, int q, int r);
 static void copy_m(data_t* source, data_t* dest, int n);